@@ -8,8 +8,11 @@ Generates intelligent prompts when items are missed or could be expanded
 import os
 import sys
 import json
+import time
 import asyncio
 import websockets
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
@@ -28,6 +31,7 @@ if env_file.exists():
 
 # Initialize OpenAI client
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+LLM_TIMEOUT_S = float(os.environ.get("REMI_LLM_TIMEOUT_S", "30"))  # a hung call would hold up every later analysis
 
 
 @dataclass
@@ -65,6 +69,187 @@ class TranscriptionChunk:
     text: str
 
 
+class AnalysisScheduler:
+    """Debounced, latest-wins scheduling of the LLM agenda analysis
+    
+    notify() is called for every final chunk. Chunks arriving within debounce_s of
+    each other share one analysis, which never waits more than max_wait_s after the
+    first of them. If the conversation moves on while an analysis is running, that
+    result is stale and dropped in favour of a fresh one (unless max_superseded
+    results in a row were already dropped). The LLM is skipped once every item is
+    covered and called at most max_calls_per_minute times.
+    
+    The scheduler runs on the event loop it was created on; notify() may be called
+    from any thread.
+    """
+    
+    def __init__(self, tracker: 'AgendaTracker',
+                 debounce_s: float = float(os.environ.get("REMI_ANALYSIS_DEBOUNCE_MS", "1500")) / 1000,
+                 max_wait_s: float = float(os.environ.get("REMI_ANALYSIS_MAX_WAIT_MS", "5000")) / 1000,
+                 max_calls_per_minute: int = int(os.environ.get("REMI_ANALYSIS_MAX_PER_MINUTE", "12")),
+                 max_superseded: int = 2,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.tracker = tracker
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None  # created outside a loop: bound by the first notify() made on one
+        self._loop = loop
+        self.debounce_s = debounce_s
+        self.max_wait_s = max_wait_s
+        self.max_calls_per_minute = max_calls_per_minute
+        self.max_superseded = max_superseded
+        self.on_update = None  # coroutine function, awaited after a result is applied
+        self._version = 0  # bumped by every chunk
+        self._first_pending_at: Optional[float] = None  # oldest chunk not analyzed yet
+        self._last_chunk_at = 0.0
+        self._pending_chunks = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._call_times = deque()
+        self._superseded_in_row = 0
+        # The LLM call blocks, so it runs on a worker thread; the result comes back to the loop.
+        # One worker and one call in flight: a call that timed out keeps the worker until it ends
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agenda-llm")
+        self._in_flight = None  # concurrent.futures.Future of the running call
+        # Metrics
+        self.chunks = 0
+        self.llm_calls = 0
+        self.superseded = 0
+        self.skipped = 0
+        self.rate_limited = 0
+        self.timed_out = 0
+        self.coalesced = 0
+        self.latencies_ms = deque(maxlen=200)  # chunk arrival -> result applied
+    
+    def notify(self):
+        """A final transcript chunk arrived (thread-safe)"""
+        now = time.monotonic()
+        if self._loop is None:
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                print("⚠️ Agenda analysis has no event loop yet - chunk not scheduled")
+                return
+        try:
+            self._loop.call_soon_threadsafe(self._notify_on_loop, now)
+        except RuntimeError:
+            pass  # the loop is closed: the server is shutting down
+    
+    def _notify_on_loop(self, now: float):
+        self.chunks += 1
+        self._version += 1
+        self._pending_chunks += 1
+        if self._first_pending_at is None:
+            self._first_pending_at = now
+        self._last_chunk_at = max(self._last_chunk_at, now)
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run())
+        self._wake.set()
+    
+    def _due_at(self) -> float:
+        due = min(self._last_chunk_at + self.debounce_s, self._first_pending_at + self.max_wait_s)
+        while self._call_times and self._call_times[0] < time.monotonic() - 60:
+            self._call_times.popleft()
+        if len(self._call_times) >= self.max_calls_per_minute:
+            due = max(due, self._call_times[0] + 60)
+        return due
+    
+    async def _wait_until_due(self):
+        throttled = False
+        while True:
+            due = self._due_at()
+            now = time.monotonic()
+            if now >= due or (now >= self._last_chunk_at + self.debounce_s and self.tracker.analysis_finished()):
+                return  # nothing left to decide: no need to sit out the rate limit
+            if not throttled and due > self._first_pending_at + self.max_wait_s:
+                throttled = True
+                self.rate_limited += 1
+                print(f"⏱️ Analysis rate limit ({self.max_calls_per_minute}/min): next call in {due - now:.1f}s")
+            settled = self._last_chunk_at + self.debounce_s
+            wake_at = min(due, settled) if now < settled else due
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), wake_at - now)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _worker_busy(self) -> bool:
+        return self._in_flight is not None and not self._in_flight.done()
+    
+    async def _analyze(self, prompt: str) -> Optional[Dict]:
+        # Only the prompt snapshot crosses over; tracker state is touched on the loop alone
+        self._in_flight = self._executor.submit(self.tracker._request_analysis, prompt)
+        try:
+            # Shielded: a thread can't be cancelled, so the call is left to finish on its own
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(self._in_flight)), LLM_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            print(f"⏱️ Analysis gave no answer within {LLM_TIMEOUT_S:g}s - its result will be ignored")
+            return None
+    
+    async def _run(self):
+        while self._first_pending_at is not None:
+            await self._wait_until_due()
+            if self._worker_busy():
+                # A timed-out call still holds the worker: wait for it instead of queueing
+                # another behind it, then analyze everything that arrived meanwhile in one go
+                self.coalesced += 1
+                print("⏳ Previous analysis still running - waiting for it before the next one")
+                await asyncio.wait([asyncio.wrap_future(self._in_flight)])
+                continue
+            first, chunks = self._first_pending_at, self._pending_chunks
+            self._first_pending_at, self._pending_chunks = None, 0
+            
+            if self.tracker.analysis_finished():
+                self.skipped += 1
+                print(f"⏭️ Every agenda item is covered - skipped LLM for {chunks} chunk(s)")
+                continue
+            
+            version = self._version
+            prompt = self.tracker._build_analysis_prompt()
+            self._call_times.append(time.monotonic())
+            self.llm_calls += 1
+            if chunks > 1:
+                print(f"🧩 One analysis for {chunks} chunks")
+            result = await self._analyze(prompt)
+            
+            if self._version != version and self._superseded_in_row < self.max_superseded:
+                # The conversation moved on while the LLM was thinking: only the latest answer counts
+                self._superseded_in_row += 1
+                self.superseded += 1
+                self._first_pending_at = min(first, self._first_pending_at or first)
+                print(f"🗑️ Dropped a superseded analysis ({self._version - version} newer chunk(s))")
+                continue
+            self._superseded_in_row = 0
+            if result is None:
+                continue  # timed out or failed: nothing was decided (timeouts are counted in timed_out)
+            self.tracker._apply_analysis(result)
+            latency_ms = (time.monotonic() - first) * 1000
+            self.latencies_ms.append(latency_ms)
+            print(f"⚡ Analysis #{self.llm_calls} decided {latency_ms:.0f} ms after the first chunk")
+            if self.on_update is not None:
+                await self.on_update()
+    
+    def stats(self) -> Dict:
+        latencies = sorted(self.latencies_ms)
+        
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))]) if latencies else None
+        
+        return {
+            "chunks": self.chunks,
+            "llmCalls": self.llm_calls,
+            "superseded": self.superseded,
+            "skipped": self.skipped,
+            "rateLimited": self.rate_limited,
+            "timedOut": self.timed_out,
+            "coalesced": self.coalesced,
+            "decisionLatencyMs": {"p50": percentile(0.5), "p95": percentile(0.95)},
+        }
+
+
 class AgendaTracker:
     def __init__(self, agenda_file: str = None):
         self.agenda_items: List[AgendaItem] = []
@@ -73,6 +258,9 @@ class AgendaTracker:
         self.meeting_title = ""
         self.meeting_start = datetime.now().isoformat()
         self.prompt_counter = 0  # For generating unique IDs
+        self.partial_transcripts: Dict[str, TranscriptionChunk] = {}  # interim text by item id
+        self.transcriber_status: Dict[str, Dict] = {}  # queue depth / drops by speaker
+        self.scheduler = AnalysisScheduler(self)
         
         if agenda_file and os.path.exists(agenda_file):
             self.load_agenda(agenda_file)
@@ -102,8 +290,45 @@ class AgendaTracker:
         except Exception as e:
             print(f"❌ Error loading agenda: {e}")
     
-    def add_transcription(self, speaker: str, text: str):
+    def add_partial_transcription(self, item_id: str, speaker: str, text: str) -> bool:
+        """Track interim text for an in-progress utterance; returns True if state changed
+        
+        Only the cheap keyword check runs here - the LLM waits for the final text.
+        Empty text withdraws the interim text (its transcription failed).
+        """
+        if not text:
+            return self.partial_transcripts.pop(item_id, None) is not None
+        self.partial_transcripts[item_id] = TranscriptionChunk(
+            timestamp=datetime.now().isoformat(),
+            speaker=speaker,
+            text=text
+        )
+        # Utterances whose final text never arrived shouldn't pile up
+        while len(self.partial_transcripts) > 20:
+            self.partial_transcripts.pop(next(iter(self.partial_transcripts)))
+        
+        mentioned = self._simple_keyword_check(text)
+        if not mentioned:
+            return False
+        
+        # Someone is already talking about it: drop the nudge right away
+        mentioned_titles = {item.title for item in self.agenda_items if item.id in mentioned}
+        before_count = len(self.active_prompts)
+        self.active_prompts = [
+            p for p in self.active_prompts
+            if p.related_item_id not in mentioned_titles
+        ]
+        dismissed = before_count - len(self.active_prompts)
+        if dismissed > 0:
+            print(f"⚡ Dismissed {dismissed} prompt(s) from interim transcript: {mentioned_titles}")
+        return dismissed > 0
+    
+    def add_transcription(self, speaker: str, text: str, item_id: Optional[str] = None):
         """Add new transcription chunk and analyze"""
+        if item_id:
+            # Final text replaces any interim text for this utterance
+            self.partial_transcripts.pop(item_id, None)
+        
         chunk = TranscriptionChunk(
             timestamp=datetime.now().isoformat(),
             speaker=speaker,
@@ -115,8 +340,8 @@ class AgendaTracker:
         if len(self.conversation_history) > 50:
             self.conversation_history = self.conversation_history[-50:]
         
-        # Analyze against agenda
-        self._analyze_conversation()
+        # Analyze against agenda (debounced; several chunks can share one LLM call)
+        self.scheduler.notify()
     
     def _simple_keyword_check(self, text: str) -> set:
         """Simple keyword matching to pre-detect mentioned items"""
@@ -132,12 +357,12 @@ class AgendaTracker:
         
         return mentioned
     
-    def _analyze_conversation(self):
-        """Analyze recent conversation against agenda using LLM"""
-        if not self.agenda_items:
-            return
-        
-        # Analyze after every new chunk for maximum responsiveness
+    def analysis_finished(self) -> bool:
+        """True when there is nothing left for the LLM to track"""
+        return not self.agenda_items or all(item.status == 'covered' for item in self.agenda_items)
+    
+    def _build_analysis_prompt(self) -> str:
+        """Snapshot the agenda and recent conversation into the LLM prompt"""
         print(f"🔍 Analyzing conversation... (Total chunks: {len(self.conversation_history)})")
         
         # Get last 10 chunks for context
@@ -224,7 +449,14 @@ CRITICAL RULES:
 - If only 1-2 items are missed, only generate 1-2 prompts (not 3)
 - Empty prompts array is perfectly fine if nothing is missed
 """
+        return prompt
+    
+    def _request_analysis(self, prompt: str) -> Optional[Dict]:
+        """Ask the LLM for an analysis; returns the parsed JSON or None
         
+        Blocking, and run on the scheduler's worker thread: it must not touch tracker state.
+        """
+        result_text = None
         try:
             print(f"🤖 Calling LLM for analysis...")
             response = client.chat.completions.create(
@@ -234,21 +466,26 @@ CRITICAL RULES:
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=500
+                max_tokens=500,
+                timeout=LLM_TIMEOUT_S
             )
             
             result_text = response.choices[0].message.content
             print(f"📥 LLM Response: {result_text[:200]}...")
             
-            result = json.loads(result_text)
-            self._update_agenda_status(result)
-            self._generate_prompts(result)
+            return json.loads(result_text)
             
         except json.JSONDecodeError as e:
             print(f"⚠️ Failed to parse LLM response: {e}")
             print(f"Raw response: {result_text}")
         except Exception as e:
             print(f"⚠️ Analysis error: {e}")
+        return None
+    
+    def _apply_analysis(self, analysis: Dict):
+        """Fold an LLM analysis into agenda status and prompts"""
+        self._update_agenda_status(analysis)
+        self._generate_prompts(analysis)
     
     def _update_agenda_status(self, analysis: Dict):
         """Update agenda item statuses based on analysis"""
@@ -325,6 +562,15 @@ CRITICAL RULES:
             )
             self.active_prompts = self.active_prompts[:3]
     
+    def update_transcriber_status(self, speaker: str, status: Dict) -> bool:
+        """Record a transcriber's backlog report; returns True if it started or stopped dropping audio"""
+        previous = self.transcriber_status.get(speaker, {})
+        self.transcriber_status[speaker] = status
+        if status.get('dropped', 0) > previous.get('dropped', 0):
+            print(f"⏳ {speaker} transcriber is overloaded: {status.get('depth', 0)} queued, "
+                  f"{status['dropped']} segments dropped ({status.get('policy')})")
+        return previous.get('depth', 0) != status.get('depth', 0) or previous.get('dropped', 0) != status.get('dropped', 0)
+    
     def dismiss_prompt(self, prompt_id: str):
         """Remove a prompt (e.g., when user addresses it)"""
         self.active_prompts = [p for p in self.active_prompts if p.id != prompt_id]
@@ -356,6 +602,16 @@ CRITICAL RULES:
                 }
                 for p in self.active_prompts
             ],
+            "partialTranscripts": [
+                {
+                    "itemId": item_id,
+                    "speaker": chunk.speaker,
+                    "text": chunk.text
+                }
+                for item_id, chunk in self.partial_transcripts.items()
+            ],
+            "transcriberStatus": self.transcriber_status,
+            "analysis": self.scheduler.stats(),
             "conversationCount": len(self.conversation_history)
         }
 
@@ -366,6 +622,8 @@ class AgendaWebSocketServer:
         self.tracker = tracker
         self.port = port
         self.clients = set()
+        # Analysis results land after the message that triggered them, so push them out too
+        tracker.scheduler.on_update = self.broadcast_state
     
     async def handler(self, websocket):
         """Handle WebSocket connections"""
@@ -387,12 +645,32 @@ class AgendaWebSocketServer:
                     # Receive transcription from Swift
                     self.tracker.add_transcription(
                         speaker=data['speaker'],
-                        text=data['text']
+                        text=data['text'],
+                        item_id=data.get('itemId')
                     )
                     
                     # Broadcast updated state to all clients
                     await self.broadcast_state()
                 
+                elif data['type'] == 'partial_transcription':
+                    # Interim text (rate-limited by the transcriber)
+                    changed = self.tracker.add_partial_transcription(
+                        item_id=data['itemId'],
+                        speaker=data['speaker'],
+                        text=data['text']
+                    )
+                    if changed:
+                        await self.broadcast_state()
+                
+                elif data['type'] == 'transcriber_status':
+                    # Backlog report from a transcriber (queue depth, drops)
+                    changed = self.tracker.update_transcriber_status(
+                        speaker=data['speaker'],
+                        status=data.get('status', {})
+                    )
+                    if changed:
+                        await self.broadcast_state()
+                
                 elif data['type'] == 'dismiss_prompt':
                     self.tracker.dismiss_prompt(data['promptId'])
                     await self.broadcast_state()
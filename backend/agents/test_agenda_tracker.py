@@ -0,0 +1,180 @@
+"""Tests for AnalysisScheduler: debouncing, superseded results, the rate limit and timeouts"""
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "test")  # the module builds its client at import
+
+from agents import agenda_tracker  # noqa: E402
+from agents.agenda_tracker import AnalysisScheduler  # noqa: E402
+
+
+class FakeTracker:
+    """Stands in for AgendaTracker: the LLM call sleeps, then answers with the prompt it got"""
+
+    def __init__(self, delay_s=0.0, answer=True):
+        self.delay_s = delay_s
+        self.answer = answer
+        self.prompts = []
+        self.applied = []
+        self.finished = False
+        self.version = 0
+
+    def analysis_finished(self):
+        return self.finished
+
+    def _build_analysis_prompt(self):
+        return f"prompt {self.version}"
+
+    def _request_analysis(self, prompt):
+        self.prompts.append(prompt)
+        time.sleep(self.delay_s)
+        return {"prompt": prompt} if self.answer else None
+
+    def _apply_analysis(self, result):
+        self.applied.append(result["prompt"])
+
+
+def scheduler_for(tracker, **kwargs):
+    options = dict(debounce_s=0.05, max_wait_s=0.2, max_calls_per_minute=100)
+    options.update(kwargs)
+    return AnalysisScheduler(tracker, **options)
+
+
+async def settle(scheduler, seconds=0.5):
+    await asyncio.sleep(seconds)
+    if scheduler._task is not None:
+        scheduler._task.cancel()
+        await asyncio.gather(scheduler._task, return_exceptions=True)
+
+
+def test_chunks_within_the_debounce_share_one_call():
+    async def run():
+        tracker = FakeTracker()
+        scheduler = scheduler_for(tracker)
+        for _ in range(5):
+            scheduler.notify()
+            await asyncio.sleep(0.01)
+        await settle(scheduler)
+        return tracker, scheduler.stats()
+
+    tracker, stats = asyncio.run(run())
+    assert stats["chunks"] == 5 and stats["llmCalls"] == 1
+    assert len(tracker.applied) == 1
+    assert stats["decisionLatencyMs"]["p50"] is not None
+
+
+def test_max_wait_bounds_a_steady_stream_of_chunks():
+    async def run():
+        tracker = FakeTracker()
+        scheduler = scheduler_for(tracker, debounce_s=0.1, max_wait_s=0.15)
+        for _ in range(20):
+            scheduler.notify()
+            await asyncio.sleep(0.03)
+        await settle(scheduler)
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    # The debounce never settles while chunks keep coming, max_wait still forces calls
+    assert stats["llmCalls"] >= 3
+
+
+def test_result_overtaken_by_new_chunks_is_dropped():
+    async def run():
+        tracker = FakeTracker(delay_s=0.1)
+        scheduler = scheduler_for(tracker)
+        scheduler.notify()
+        await asyncio.sleep(0.1)    # the first call is running now
+        tracker.version = 1
+        scheduler.notify()
+        await settle(scheduler, 0.6)
+        return tracker, scheduler.stats()
+
+    tracker, stats = asyncio.run(run())
+    assert stats["superseded"] == 1
+    assert tracker.applied == ["prompt 1"]
+
+
+def test_rate_limit_defers_the_next_call():
+    async def run():
+        tracker = FakeTracker()
+        scheduler = scheduler_for(tracker, max_calls_per_minute=1)
+        scheduler.notify()
+        await asyncio.sleep(0.2)
+        scheduler.notify()
+        await settle(scheduler, 0.4)
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["llmCalls"] == 1 and stats["rateLimited"] == 1
+
+
+def test_covered_agenda_skips_the_llm():
+    async def run():
+        tracker = FakeTracker()
+        tracker.finished = True
+        scheduler = scheduler_for(tracker, max_calls_per_minute=1)
+        scheduler.notify()
+        await settle(scheduler, 0.3)
+        return tracker, scheduler.stats()
+
+    tracker, stats = asyncio.run(run())
+    assert tracker.prompts == [] and stats["skipped"] == 1
+
+
+def test_failed_call_records_no_latency():
+    async def run():
+        tracker = FakeTracker(answer=False)
+        scheduler = scheduler_for(tracker)
+        scheduler.notify()
+        await settle(scheduler, 0.3)
+        return tracker, scheduler.stats()
+
+    tracker, stats = asyncio.run(run())
+    assert stats["llmCalls"] == 1 and tracker.applied == []
+    assert stats["decisionLatencyMs"] == {"p50": None, "p95": None}
+
+
+def test_notify_from_another_thread():
+    async def run():
+        tracker = FakeTracker()
+        scheduler = scheduler_for(tracker)
+        await asyncio.to_thread(scheduler.notify)
+        await settle(scheduler, 0.3)
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["chunks"] == 1 and stats["llmCalls"] == 1
+
+
+def test_timed_out_call_is_not_stacked_behind(monkeypatch):
+    monkeypatch.setattr(agenda_tracker, "LLM_TIMEOUT_S", 0.05)
+
+    async def run():
+        tracker = FakeTracker(delay_s=0.3)
+        scheduler = scheduler_for(tracker)
+        scheduler.notify()
+        await asyncio.sleep(0.15)   # the first call has timed out but its thread still runs
+        tracker.version, tracker.delay_s = 1, 0.0
+        for _ in range(3):
+            scheduler.notify()
+            await asyncio.sleep(0.02)
+        await settle(scheduler, 0.8)
+        return tracker, scheduler.stats()
+
+    tracker, stats = asyncio.run(run())
+    # One call at a time: the later chunks waited for the worker and went out together
+    assert tracker.prompts == ["prompt 0", "prompt 1"]
+    assert tracker.applied == ["prompt 1"]
+    assert stats["timedOut"] == 1 and stats["coalesced"] == 1
+
+
+def test_empty_partial_withdraws_interim_text():
+    tracker = agenda_tracker.AgendaTracker()
+    tracker.add_partial_transcription("item_1", "mic", "so about the budget")
+    assert "item_1" in tracker.partial_transcripts
+    assert tracker.add_partial_transcription("item_1", "mic", "") is True
+    assert tracker.partial_transcripts == {}
+    # Nothing left to withdraw
+    assert tracker.add_partial_transcription("item_1", "mic", "") is False
@@ -1,7 +1,7 @@
 # --- SQLAlchemy ORM Base + Types ---
 from sqlalchemy import (
-    Column, String, Text, DateTime, Float, Boolean, ForeignKey,
-    CheckConstraint, JSON, ARRAY
+    Column, String, Text, DateTime, Float, Boolean, ForeignKey, Integer,
+    CheckConstraint, JSON, ARRAY, Index, UniqueConstraint
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -85,4 +85,28 @@ class MeetingNote(Base):
     related_projects = Column(ARRAY(UUID(as_uuid=True)), ForeignKey("projects.id"))
     sentiment_overall = Column(Text)
     ai_metadata = Column(JSON)
+    session_id = Column(Text, unique=True)  # one note per meeting; its meeting_segments rows
+    transcript_archive = Column(Text)      # full transcript, zlib-compressed NDJSON (base64), see core/transcript_store.py
+    segment_count = Column(Integer)        # segments the transcription was built from
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class MeetingSegment(Base):
+    __tablename__ = "meeting_segments"
+    __table_args__ = (
+        # Time-offset index: range reads and "last N" never scan a whole meeting
+        Index("ix_meeting_segments_session_offset", "session_id", "start_offset_ms"),
+        Index("ix_meeting_segments_session_stream_offset", "session_id", "stream", "start_offset_ms"),
+        # One row per transcript line, however often it is uploaded
+        UniqueConstraint("session_id", "stream", "start_offset_ms", "seq", name="uq_meeting_segments_line"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    session_id = Column(Text, nullable=False)  # shared by every stream of one meeting
+    stream = Column(Text)   # "mic", "system", ...
+    speaker = Column(Text)
+    seq = Column(Integer)   # line number within the stream's transcript
+    start_offset_ms = Column(Integer, nullable=False)  # from the meeting start
+    ts = Column(DateTime)   # when the line was transcribed
+    text = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
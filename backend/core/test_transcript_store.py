@@ -0,0 +1,157 @@
+"""Tests for transcript_store.finalize_session against an in-memory meeting_segments/meeting_notes"""
+
+import sys
+import types
+
+import pytest
+
+from core import transcript_store
+
+
+class FakeQuery:
+    """The slice of the supabase query builder transcript_store uses, over a list of dicts"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.action = ("select", None)
+        self.filters = []
+        self.orders = []
+        self.window = None
+
+    def select(self, columns):
+        self.action = ("select", columns)
+        return self
+
+    def upsert(self, rows, on_conflict, ignore_duplicates=False):
+        self.action = ("upsert", (rows if isinstance(rows, list) else [rows], on_conflict.split(",")))
+        return self
+
+    def update(self, fields):
+        self.action = ("update", fields)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def or_(self, condition):
+        # Only the segment_count guard: "segment_count.is.null,segment_count.lt.<n>"
+        limit = int(condition.rsplit(".", 1)[1])
+        self.filters.append(lambda row: row.get("segment_count") is None or row["segment_count"] < limit)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, n):
+        self.window = (0, n)
+        return self
+
+    def execute(self):
+        action, argument = self.action
+        if action == "upsert":
+            rows, key = argument
+            added = []
+            for row in rows:
+                if not any(all(old.get(k) == row.get(k) for k in key) for old in self.rows):
+                    self.rows.append(dict(row, id=len(self.rows) + 1))
+                    added.append(row)
+            return types.SimpleNamespace(data=added)
+        matched = [row for row in self.rows if all(f(row) for f in self.filters)]
+        if action == "update":
+            for row in matched:
+                row.update(argument)
+            return types.SimpleNamespace(data=matched)
+        for column, desc in reversed(self.orders):
+            matched.sort(key=lambda row: row[column], reverse=desc)
+        if self.window:
+            matched = matched[self.window[0]:self.window[1]]
+        return types.SimpleNamespace(data=[dict(row) for row in matched])
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name):
+        return FakeQuery(self.tables.setdefault(name, []))
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    client = FakeSupabase()
+    module = types.ModuleType("core.supabase_client")
+    module.supabase = client
+    monkeypatch.setitem(sys.modules, "core.supabase_client", module)
+    return client
+
+
+SESSION = "20250301T100000_standup"
+
+
+def record(second, stream, text):
+    return {"ts": f"2025-03-01T10:00:{second:02d}", "stream": stream, "speaker": stream, "text": text}
+
+
+def store(records):
+    start = transcript_store.session_start(SESSION)
+    transcript_store.upsert_segments(
+        [transcript_store.segment_row(SESSION, start, r, seq) for seq, r in enumerate(records)])
+
+
+def notes(supabase):
+    return supabase.tables[transcript_store.NOTES_TABLE]
+
+
+def test_streams_are_merged_in_time_order(supabase):
+    # Each stream uploads its own lines, in whatever order they reach the server
+    store([record(5, "system", "second"), record(20, "system", "fourth")])
+    store([record(1, "mic", "first"), record(9, "mic", "third")])
+
+    note_id = transcript_store.finalize_session(SESSION)
+
+    [note] = notes(supabase)
+    assert note["id"] == note_id
+    assert note["session_id"] == SESSION
+    assert note["created_at"] == "2025-03-01T10:00:00"
+    assert note["segment_count"] == 4
+    assert note["transcription"] == "[mic] first\n[system] second\n[mic] third\n[system] fourth"
+    archive = transcript_store.decompress_archive(note["transcript_archive"])
+    assert [r["text"] for r in archive] == ["first", "second", "third", "fourth"]
+    assert note["ai_metadata"]["segments"]["streams"] == ["mic", "system"]
+
+
+def test_every_stream_finalizes_the_same_row(supabase):
+    store([record(1, "mic", "first")])
+    first = transcript_store.finalize_session(SESSION)
+    store([record(2, "system", "second")])
+    second = transcript_store.finalize_session(SESSION)
+
+    assert first == second
+    [note] = notes(supabase)
+    assert note["segment_count"] == 2
+
+
+def test_an_older_view_never_overwrites_a_more_complete_one(supabase):
+    store([record(1, "mic", "first"), record(2, "system", "second")])
+    transcript_store.finalize_session(SESSION)
+    # A stream that closes late sees fewer segments (here: some were removed)
+    segments = supabase.tables[transcript_store.SEGMENTS_TABLE]
+    del segments[1:]
+
+    transcript_store.finalize_session(SESSION)
+    assert notes(supabase)[0]["segment_count"] == 2
+
+    transcript_store.finalize_session(SESSION, rebuild=True)
+    assert notes(supabase)[0]["segment_count"] == 1
+    assert notes(supabase)[0]["transcription"] == "[mic] first"
+
+
+def test_session_without_segments_writes_nothing(supabase):
+    assert transcript_store.finalize_session(SESSION) is None
+    assert transcript_store.NOTES_TABLE not in supabase.tables
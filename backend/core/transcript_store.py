@@ -0,0 +1,252 @@
+# core/transcript_store.py
+"""
+Segment-addressed transcript storage.
+
+Transcript lines live in meeting_segments, keyed by (session_id, stream, start_offset_ms),
+so readers can ask for a time range or the last few segments instead of pulling the
+whole meeting. Each meeting (session) has exactly one meeting_notes row, built from
+its segments: the plain transcription for the briefing and the UI, plus the full
+transcript as a compressed archival blob (zlib-compressed NDJSON, base64 so it
+travels through the REST API).
+"""
+import base64
+import json
+import zlib
+from datetime import datetime
+from typing import List, Optional
+
+SEGMENTS_TABLE = "meeting_segments"
+NOTES_TABLE = "meeting_notes"
+SEGMENT_COLUMNS = "stream,speaker,seq,start_offset_ms,text"
+# One row per transcript line, so the live upload and push_transcripts.py never duplicate one
+SEGMENT_KEY = "session_id,stream,start_offset_ms,seq"
+
+
+def session_start(session_id: str) -> Optional[datetime]:
+    """Meeting start encoded in a session id (YYYYmmddTHHMMSS), or None for custom ids."""
+    try:
+        return datetime.strptime(session_id[:15], "%Y%m%dT%H%M%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def start_offset_ms(ts: str, meeting_start: datetime) -> int:
+    """Milliseconds from the meeting start to an ISO timestamp (never negative)."""
+    moment = datetime.fromisoformat(ts)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return max(0, round((moment - meeting_start).total_seconds() * 1000))
+
+
+def segment_row(session_id: str, meeting_start: datetime, record: dict, seq: int) -> dict:
+    """meeting_segments row for one transcript record ({"ts", "stream", "speaker", "text"})."""
+    return {
+        "session_id": session_id,
+        "stream": record.get("stream"),
+        "speaker": record.get("speaker"),
+        "seq": seq,
+        "start_offset_ms": start_offset_ms(record["ts"], meeting_start),
+        "ts": record["ts"],
+        "text": record["text"],
+    }
+
+
+class ArchiveBuilder:
+    """Compresses transcript records as they arrive; finish() returns the archival blob."""
+
+    def __init__(self, level: int = 9):
+        self._compressor = zlib.compressobj(level)
+        self._chunks = []
+        self.records = 0
+        self.raw_bytes = 0
+
+    def add(self, record: dict):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self.raw_bytes += len(line)
+        self.records += 1
+        chunk = self._compressor.compress(line)
+        if chunk:
+            self._chunks.append(chunk)
+
+    def finish(self) -> str:
+        self._chunks.append(self._compressor.flush())
+        return base64.b64encode(b"".join(self._chunks)).decode("ascii")
+
+
+def decompress_archive(blob: str) -> List[dict]:
+    """Records of a transcript_archive blob, in the order they were written."""
+    if not blob:
+        return []
+    data = zlib.decompress(base64.b64decode(blob)).decode("utf-8")
+    return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+
+def format_transcript(segments: List[dict]) -> str:
+    """Plain "[speaker] text" transcript of segments, one line each."""
+    return "\n".join(f"[{segment.get('speaker')}] {segment.get('text')}" for segment in segments)
+
+
+def upsert_segments(rows: List[dict]) -> Optional[List[dict]]:
+    """Store segment rows, skipping lines already stored; returns the new rows (None on error)."""
+    from .supabase_client import supabase
+    try:
+        result = supabase.table(SEGMENTS_TABLE).upsert(rows, on_conflict=SEGMENT_KEY, ignore_duplicates=True).execute()
+        return result.data or []
+    except Exception as e:
+        print(f"❌ Error storing {len(rows)} segments: {e}")
+        return None
+
+
+def delete_segments(session_id: str) -> bool:
+    """Remove every segment of a meeting (before it is rebuilt); returns False on error."""
+    from .supabase_client import supabase
+    try:
+        supabase.table(SEGMENTS_TABLE).delete().eq("session_id", session_id).execute()
+        return True
+    except Exception as e:
+        print(f"❌ Error deleting segments for {session_id}: {e}")
+        return False
+
+
+def fetch_all_segments(session_id: str, page_size: int = 1000) -> Optional[List[dict]]:
+    """Every segment of a meeting in time order, with ts (None on error)."""
+    from .supabase_client import supabase
+    segments = []
+    try:
+        while True:
+            result = (
+                supabase.table(SEGMENTS_TABLE)
+                .select(SEGMENT_COLUMNS + ",ts")
+                .eq("session_id", session_id)
+                .order("start_offset_ms")
+                .order("seq")
+                .range(len(segments), len(segments) + page_size - 1)
+                .execute()
+            )
+            page = result.data or []
+            segments.extend(page)
+            if len(page) < page_size:
+                return segments
+    except Exception as e:
+        print(f"❌ Error fetching segments for {session_id}: {e}")
+        return None
+
+
+def ensure_session_note(session_id: str, fields: dict):
+    """Id of the session's meeting_notes row, creating it with fields if there is none yet.
+
+    An existing row is left untouched, so callers can never clobber what a stream wrote.
+    """
+    from .supabase_client import supabase
+    try:
+        supabase.table(NOTES_TABLE).upsert(
+            dict(fields, session_id=session_id), on_conflict="session_id", ignore_duplicates=True
+        ).execute()
+        result = supabase.table(NOTES_TABLE).select("id").eq("session_id", session_id).limit(1).execute()
+        return result.data[0]["id"] if result.data else None
+    except Exception as e:
+        print(f"❌ Error creating the meeting note for {session_id}: {e}")
+        return None
+
+
+def build_archive(segments: List[dict]) -> str:
+    """transcript_archive blob of a meeting's segments, kept in the order given."""
+    archive = ArchiveBuilder()
+    for segment in segments:
+        archive.add({key: segment.get(key) for key in ("ts", "stream", "speaker", "text")})
+    return archive.finish()
+
+
+def finalize_session(session_id: str, rebuild: bool = False):
+    """Write the meeting_notes row of a session from all of its segments; returns the row id.
+
+    Every stream of a meeting (and push_transcripts.py) calls this for the same row,
+    keyed on session_id. The transcription and the archive both come from the merged
+    segments of every stream in start_offset_ms order. A build only replaces one that
+    covered fewer segments, so a stream that closes late with an older view never
+    overwrites a more complete one; rebuild=True (the segments were replaced) skips that check.
+    """
+    from .supabase_client import supabase
+    segments = fetch_all_segments(session_id)
+    if not segments:
+        return None
+    meeting_start = session_start(session_id)
+    timestamps = sorted(segment["ts"] for segment in segments if segment.get("ts"))
+    fields = {
+        "transcription": format_transcript(segments),
+        "transcript_archive": build_archive(segments),
+        "segment_count": len(segments),
+        "ai_metadata": {
+            "segments": {
+                "table": SEGMENTS_TABLE,
+                "session_id": session_id,
+                "count": len(segments),
+                "streams": sorted({s["stream"] for s in segments if s.get("stream")}),
+                "speakers": sorted({s["speaker"] for s in segments if s.get("speaker")}),
+                "first_ts": timestamps[0] if timestamps else None,
+                "last_ts": timestamps[-1] if timestamps else None,
+            }
+        },
+    }
+    created_at = meeting_start.isoformat() if meeting_start else fields["ai_metadata"]["segments"]["first_ts"]
+    note_id = ensure_session_note(session_id, {"created_at": created_at})
+    if note_id is None:
+        return None
+    try:
+        query = supabase.table(NOTES_TABLE).update(fields).eq("id", note_id)
+        if not rebuild:
+            query = query.or_(f"segment_count.is.null,segment_count.lt.{len(segments)}")
+        query.execute()
+        return note_id
+    except Exception as e:
+        print(f"❌ Error writing the meeting note for {session_id}: {e}")
+        return None
+
+
+def fetch_segments(session_id: str, start_ms: int = 0, end_ms: Optional[int] = None,
+                   stream: Optional[str] = None, limit: int = 500) -> List[dict]:
+    """Segments starting in [start_ms, end_ms) of a meeting, in time order."""
+    from .supabase_client import supabase
+    try:
+        query = (
+            supabase.table(SEGMENTS_TABLE)
+            .select(SEGMENT_COLUMNS)
+            .eq("session_id", session_id)
+            .gte("start_offset_ms", start_ms)
+        )
+        if end_ms is not None:
+            query = query.lt("start_offset_ms", end_ms)
+        if stream:
+            query = query.eq("stream", stream)
+        result = query.order("start_offset_ms").limit(limit).execute()
+        return result.data or []
+    except Exception as e:
+        print(f"❌ Error fetching segments for {session_id}: {e}")
+        return []
+
+
+def fetch_last_segments(session_id: str, n: int = 20, stream: Optional[str] = None) -> List[dict]:
+    """The last n segments of a meeting, oldest first."""
+    from .supabase_client import supabase
+    try:
+        query = supabase.table(SEGMENTS_TABLE).select(SEGMENT_COLUMNS).eq("session_id", session_id)
+        if stream:
+            query = query.eq("stream", stream)
+        result = query.order("start_offset_ms", desc=True).limit(n).execute()
+        return list(reversed(result.data or []))
+    except Exception as e:
+        print(f"❌ Error fetching last segments for {session_id}: {e}")
+        return []
+
+
+def fetch_transcript_archive(note_id) -> List[dict]:
+    """Full transcript of one meeting note from its archival blob ([] if it has none)."""
+    from .supabase_client import supabase
+    try:
+        result = supabase.table(NOTES_TABLE).select("transcript_archive").eq("id", note_id).limit(1).execute()
+        if not result.data:
+            return []
+        return decompress_archive(result.data[0].get("transcript_archive"))
+    except Exception as e:
+        print(f"❌ Error fetching transcript archive for note {note_id}: {e}")
+        return []
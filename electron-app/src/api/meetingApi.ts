@@ -2,6 +2,17 @@ import { supabase } from './supabaseClient';
 import { startOfDay, endOfDay } from 'date-fns';
 import { Meeting } from 'src/types';
 
+const NOTE_COLUMNS = 'id, meeting_id, session_id, summary, notes, preparation_notes, action_items, created_at';
+const SEGMENT_COLUMNS = 'stream, speaker, seq, start_offset_ms, text';
+
+export type TranscriptSegment = {
+  stream: string;
+  speaker: string;
+  seq: number;
+  start_offset_ms: number;
+  text: string;
+};
+
 export async function fetchTodaysMeetings(): Promise<Meeting[]> {
   const todayStart = startOfDay(new Date()).toISOString();
   const todayEnd = endOfDay(new Date()).toISOString();
@@ -21,9 +32,10 @@ export async function fetchTodaysMeetings(): Promise<Meeting[]> {
   }
 
   const eventIds = events.map(e => e.id);
+  // Only the fields the list shows: transcripts stay in meeting_segments / transcript_archive
   const { data: notes, error: notesError } = await supabase
     .from('meeting_notes')
-    .select('*')
+    .select(NOTE_COLUMNS)
     .in('meeting_id', eventIds);
 
   if (notesError) {
@@ -61,3 +73,45 @@ export async function fetchTodaysMeetings(): Promise<Meeting[]> {
     };
   });
 }
+
+/**
+ * Transcript segments of one meeting that start within [fromMs, toMs), in time order.
+ */
+export async function fetchTranscriptRange(
+  sessionId: string,
+  fromMs = 0,
+  toMs?: number,
+  limit = 500
+): Promise<TranscriptSegment[]> {
+  let query = supabase
+    .from('meeting_segments')
+    .select(SEGMENT_COLUMNS)
+    .eq('session_id', sessionId)
+    .gte('start_offset_ms', fromMs);
+  if (toMs !== undefined) {
+    query = query.lt('start_offset_ms', toMs);
+  }
+  const { data, error } = await query.order('start_offset_ms', { ascending: true }).limit(limit);
+  if (error) {
+    console.error('Error fetching transcript segments:', error);
+    return [];
+  }
+  return data ?? [];
+}
+
+/**
+ * The last `count` transcript segments of one meeting (oldest first), e.g. for a snippet.
+ */
+export async function fetchTranscriptTail(sessionId: string, count = 5): Promise<TranscriptSegment[]> {
+  const { data, error } = await supabase
+    .from('meeting_segments')
+    .select(SEGMENT_COLUMNS)
+    .eq('session_id', sessionId)
+    .order('start_offset_ms', { ascending: false })
+    .limit(count);
+  if (error) {
+    console.error('Error fetching transcript tail:', error);
+    return [];
+  }
+  return (data ?? []).reverse();
+}
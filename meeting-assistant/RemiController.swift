@@ -210,6 +210,14 @@ class MicrophoneManager: NSObject, ObservableObject {
     private var systemTranscriptionProcess: Process?
     private var systemTranscriptionPipe: Pipe?
     
+    // One id per meeting, shared by the mic and system transcribers (REMI_SESSION_ID),
+    // so both write to the same meeting_segments session and meeting_notes row
+    private var sessionId = ""
+    
+    // Send length-prefixed float32 frames instead of comma-separated text
+    // (must match the --format flag passed to the transcriber)
+    private let useBinaryAudioFrames = true
+    
     // System audio capture
     private var screenRecorder: SCStream?
     private var systemAudioFormat: AVAudioFormat?
@@ -248,6 +256,14 @@ class MicrophoneManager: NSObject, ObservableObject {
         }
     }
     
+    static func makeSessionId() -> String {
+        // Same yyyyMMdd'T'HHmmss local-time form the transcribers fall back to
+        let formatter = DateFormatter()
+        formatter.locale = Locale(identifier: "en_US_POSIX")
+        formatter.dateFormat = "yyyyMMdd'T'HHmmss"
+        return formatter.string(from: Date())
+    }
+    
     func startTranscriptionProcess(streamType: String) -> (Process?, Pipe?) {
         // Get the path to the shell wrapper script (using Realtime API)
         let executablePath = Bundle.main.executablePath ?? ""
@@ -257,7 +273,11 @@ class MicrophoneManager: NSObject, ObservableObject {
         let pipe = Pipe()
         let process = Process()
         process.executableURL = URL(fileURLWithPath: "/bin/bash")
-        process.arguments = [scriptPath, streamType]  // Pass stream type as argument
+        process.arguments = [scriptPath, streamType,  // Pass stream type as argument
+                             "--format", useBinaryAudioFrames ? "f32le" : "csv"]
+        var environment = ProcessInfo.processInfo.environment
+        environment["REMI_SESSION_ID"] = sessionId
+        process.environment = environment
         process.standardInput = pipe
         
         // Capture output
@@ -286,15 +306,24 @@ class MicrophoneManager: NSObject, ObservableObject {
     func sendAudioToTranscription(_ samples: [Float], pipe: Pipe?) {
         guard let pipe = pipe else { return }
         
-        // Convert samples to comma-separated string
-        let sampleString = samples.map { String($0) }.joined(separator: ",") + "\n"
+        let data: Data
+        if useBinaryAudioFrames {
+            // uint32 little-endian byte length, then raw float32 little-endian samples
+            var length = UInt32(samples.count * MemoryLayout<Float>.size).littleEndian
+            var frame = Data(bytes: &length, count: MemoryLayout<UInt32>.size)
+            samples.withUnsafeBufferPointer { frame.append($0) }
+            data = frame
+        } else {
+            // Convert samples to comma-separated string
+            let sampleString = samples.map { String($0) }.joined(separator: ",") + "\n"
+            guard let text = sampleString.data(using: .utf8) else { return }
+            data = text
+        }
         
-        if let data = sampleString.data(using: .utf8) {
-            do {
-                try pipe.fileHandleForWriting.write(contentsOf: data)
-            } catch {
-                // Silently handle write errors (pipe might be closed)
-            }
+        do {
+            try pipe.fileHandleForWriting.write(contentsOf: data)
+        } catch {
+            // Silently handle write errors (pipe might be closed)
         }
     }
     
@@ -356,6 +385,7 @@ class MicrophoneManager: NSObject, ObservableObject {
         }
         
         // Start separate transcription processes for mic and system audio
+        sessionId = Self.makeSessionId()
         let (micProc, micPipe) = startTranscriptionProcess(streamType: "mic")
         micTranscriptionProcess = micProc
         micTranscriptionPipe = micPipe
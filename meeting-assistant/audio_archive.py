@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Compressed raw-audio archive for a transcription session
+Incoming PCM is written as rolling FLAC/Opus segments by a worker thread, with a
+sidecar index mapping sample offsets to segment files and transcript lines
+
+Layout (next to the session's NDJSON transcript):
+    transcripts/audio/<session>/000000.flac, 000001.flac, ...
+    transcripts/audio/<session>/index.jsonl
+Index records:
+    {"type": "segment", "file": ..., "start_sample": ...}       segment opened
+    {"type": "segment_end", "file": ..., "end_sample": ...}     segment closed
+    {"type": "line", "line": n, "sample": ..., "item_id": ...}  transcript line n was
+        written when the archive had reached `sample` (i.e. at the end of its utterance)
+    {"type": "gap", "start_sample": ..., "samples": ...}        dropped audio, zero-filled
+"""
+
+import json
+import queue
+import threading
+from pathlib import Path
+import numpy as np
+
+CODECS = {
+    # codec: (file extension, libsndfile format, subtype)
+    "flac": ("flac", "FLAC", "PCM_16"),
+    "opus": ("opus", "OGG", "OPUS"),
+}
+
+_STOP = object()
+
+
+class AudioArchiver:
+    """Rolling compressed audio segments written off the capture path
+
+    write() and mark_line() never block: blocks are handed to a bounded queue
+    and dropped (and later zero-filled, so offsets stay aligned) if the worker
+    can't keep up.
+    """
+
+    def __init__(self, directory, sample_rate=16000, codec="flac", segment_seconds=300,
+                 max_queue_blocks=512, log=print):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown archive codec '{codec}' (expected one of {', '.join(CODECS)})")
+        try:
+            import soundfile
+        except ImportError as e:
+            raise RuntimeError("Audio archiving needs soundfile: pip install soundfile") from e
+        self._soundfile = soundfile
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.codec = codec
+        self.segment_samples = int(sample_rate * segment_seconds)
+        self.log = log
+        self._queue = queue.Queue(maxsize=max_queue_blocks)
+        self._position = 0          # samples submitted by the caller (including dropped ones)
+        self._closed = False
+        self._index = open(self.directory / "index.jsonl", "a", encoding="utf-8")
+        self._file = None
+        self._file_name = None
+        self._file_samples = 0
+        self._written = 0           # samples the worker has accounted for
+        # Stats
+        self.segments = 0
+        self.samples_archived = 0
+        self.samples_dropped = 0
+        self.bytes_written = 0
+        self._thread = threading.Thread(target=self._run, name="audio-archiver", daemon=True)
+        self._thread.start()
+
+    @property
+    def position(self):
+        """Sample offset of the next block passed to write()"""
+        return self._position
+
+    def write(self, samples):
+        """Queue float32 mono samples; the array must not be modified afterwards"""
+        if self._closed or not len(samples):
+            return
+        start = self._position
+        self._position += len(samples)
+        try:
+            self._queue.put_nowait(("audio", start, samples))
+        except queue.Full:
+            self.samples_dropped += len(samples)
+
+    def mark_line(self, line, item_id=None):
+        """Record that transcript line `line` was written at the current position"""
+        if self._closed:
+            return
+        record = {"type": "line", "line": line, "sample": self._position}
+        if item_id:
+            record["item_id"] = item_id
+        try:
+            self._queue.put_nowait(("index", None, record))
+        except queue.Full:
+            pass
+
+    def _index_record(self, record):
+        self._index.write(json.dumps(record) + "\n")
+        self._index.flush()
+
+    def _open_segment(self):
+        ext, fmt, subtype = CODECS[self.codec]
+        self._file_name = f"{self.segments:06d}.{ext}"
+        self._file = self._soundfile.SoundFile(
+            self.directory / self._file_name, mode="w", samplerate=self.sample_rate,
+            channels=1, format=fmt, subtype=subtype
+        )
+        self._file_samples = 0
+        self.segments += 1
+        self._index_record({"type": "segment", "file": self._file_name, "start_sample": self._written})
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self.bytes_written += (self.directory / self._file_name).stat().st_size
+        self._index_record({"type": "segment_end", "file": self._file_name, "end_sample": self._written})
+        self._file = None
+
+    def _write_samples(self, samples):
+        while len(samples):
+            if self._file is None:
+                self._open_segment()
+            room = self.segment_samples - self._file_samples
+            chunk = samples[:room]
+            self._file.write(chunk)
+            self._file_samples += len(chunk)
+            self._written += len(chunk)
+            samples = samples[room:]
+            if self._file_samples >= self.segment_samples:
+                self._close_segment()
+
+    def _write_block(self, start, samples):
+        if start > self._written:
+            # Blocks were dropped while the queue was full: keep offsets aligned
+            missing = start - self._written
+            self._index_record({"type": "gap", "start_sample": self._written, "samples": missing})
+            self._write_samples(np.zeros(missing, dtype=np.float32))
+        self._write_samples(np.asarray(samples, dtype=np.float32))
+        self.samples_archived += len(samples)
+
+    def _run(self):
+        while True:
+            kind, start, payload = self._queue.get()
+            if kind is _STOP:
+                break
+            try:
+                if kind == "audio":
+                    self._write_block(start, payload)
+                else:
+                    self._index_record(payload)
+            except Exception as e:
+                self.log(f"⚠️ Audio archive write failed: {e}")
+        try:
+            self._close_segment()
+        except Exception as e:
+            self.log(f"⚠️ Audio archive close failed: {e}")
+        self._index.close()
+
+    def close(self):
+        """Drain the queue, finish the current segment and stop the worker"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put((_STOP, None, None))
+        self._thread.join()
+
+    def summary(self):
+        seconds = self.samples_archived / self.sample_rate
+        return (f"{seconds:.0f}s in {self.segments} {self.codec} segments, "
+                f"{self.bytes_written / 1024:.0f} KB, {self.samples_dropped / self.sample_rate:.1f}s dropped")
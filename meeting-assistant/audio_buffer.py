@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fixed-capacity float32 ring buffer for chunked transcription
+Hands out zero-copy, always-contiguous windows (with optional overlap)
+"""
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Preallocated ring buffer of float32 samples
+
+    Storage is mirrored (every sample is written at i and i + capacity), so any
+    window of up to `capacity` samples is a contiguous slice and can be returned
+    as a view without copying. Views stay valid until the next write().
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        if self.capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._data = np.zeros(2 * self.capacity, dtype=np.float32)
+        self._start = 0       # index of the oldest sample
+        self._size = 0        # number of buffered samples
+        self.total_written = 0
+        self.dropped = 0      # samples overwritten before they were consumed
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def free(self):
+        return self.capacity - self._size
+
+    def write(self, samples):
+        """Append samples, overwriting the oldest ones if the buffer is full"""
+        samples = np.asarray(samples, dtype=np.float32)
+        n = len(samples)
+        if n == 0:
+            return
+        self.total_written += n
+        if n > self.capacity:
+            # Only the newest `capacity` samples can survive anyway
+            self.dropped += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        overflow = n - self.free
+        if overflow > 0:
+            self.consume(overflow)
+            self.dropped += overflow
+
+        end = (self._start + self._size) % self.capacity
+        first = min(n, self.capacity - end)
+        self._data[end:end + first] = samples[:first]
+        self._data[end + self.capacity:end + self.capacity + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[self.capacity:self.capacity + rest] = samples[first:]
+        self._size += n
+
+    def peek(self, n):
+        """Zero-copy view of the oldest n samples"""
+        if n > self._size:
+            raise ValueError(f"Only {self._size} samples buffered, asked for {n}")
+        return self._data[self._start:self._start + n]
+
+    def consume(self, n):
+        """Drop the oldest n samples"""
+        n = min(n, self._size)
+        self._start = (self._start + n) % self.capacity
+        self._size -= n
+
+    def windows(self, size, hop=None):
+        """Yield views of `size` samples while enough audio is buffered
+
+        After each window the read position advances by `hop` (defaults to
+        `size`, i.e. no overlap); hop < size gives overlapping windows.
+        """
+        hop = size if hop is None else hop
+        if not 0 < hop <= size <= self.capacity:
+            raise ValueError("need 0 < hop <= size <= capacity")
+        while self._size >= size:
+            yield self.peek(size)
+            self.consume(hop)
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
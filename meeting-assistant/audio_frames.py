@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Audio frame decoding for the transcriber stdin protocol
+Supports the legacy comma-separated float lines and length-prefixed binary PCM frames
+
+Binary frame layout (all little-endian):
+    uint32 payload_length_in_bytes | payload (int16 or float32 samples)
+"""
+
+import os
+import struct
+import numpy as np
+
+FORMAT_CSV = "csv"
+FORMAT_F32 = "f32le"
+FORMAT_S16 = "s16le"
+FORMATS = (FORMAT_CSV, FORMAT_F32, FORMAT_S16)
+
+# Environment fallback so wrapper scripts don't need to change their argv
+FORMAT_ENV_VAR = "REMI_AUDIO_FORMAT"
+
+_HEADER = struct.Struct("<I")
+_DTYPES = {
+    FORMAT_F32: np.dtype("<f4"),
+    FORMAT_S16: np.dtype("<i2"),
+}
+
+# Anything bigger than this is almost certainly a desynced stream, not audio
+MAX_FRAME_BYTES = 4 * 1024 * 1024
+
+
+class FrameError(ValueError):
+    """Raised when the binary stream is truncated or out of sync"""
+
+
+def parse_flag(argv, name, default=None):
+    """Return the value of --<name> <value> / --<name>=<value> in argv, or default
+
+    A bare --<name> (last in argv, or followed by another --flag) also gives default.
+    """
+    flag = f"--{name}"
+    value = default
+    for i, arg in enumerate(argv):
+        if arg == flag:
+            has_value = i + 1 < len(argv) and not argv[i + 1].startswith("--")
+            value = argv[i + 1] if has_value else default
+        elif arg.startswith(flag + "="):
+            value = arg.split("=", 1)[1]
+    return value
+
+
+def parse_format_arg(argv):
+    """Find --format <fmt> / --format=<fmt> in argv, falling back to $REMI_AUDIO_FORMAT"""
+    fmt = parse_flag(argv, "format", os.environ.get(FORMAT_ENV_VAR, FORMAT_CSV)).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown audio format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    return fmt
+
+
+def parse_csv_line(line):
+    """Parse one comma-separated line of float samples into a float32 array"""
+    if isinstance(line, bytes):
+        line = line.decode("ascii", errors="ignore")
+    samples = [float(x) for x in line.strip().split(',') if x]
+    return np.asarray(samples, dtype=np.float32)
+
+
+def decode_pcm(payload, fmt):
+    """Decode a binary frame payload into float32 samples in [-1, 1]"""
+    samples = np.frombuffer(payload, dtype=_DTYPES[fmt])
+    if fmt == FORMAT_S16:
+        return samples.astype(np.float32) * (1.0 / 32768.0)
+    return samples.astype(np.float32, copy=False)
+
+
+def encode_frame(samples, fmt=FORMAT_F32):
+    """Encode float samples as one binary frame (used by tests and replay tools)"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if fmt == FORMAT_S16:
+        payload = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    elif fmt == FORMAT_F32:
+        payload = samples.astype("<f4").tobytes()
+    else:
+        return (",".join(repr(float(x)) for x in samples) + "\n").encode("ascii")
+    return _HEADER.pack(len(payload)) + payload
+
+
+class FrameReader:
+    """Reads audio frames from a binary stream (normally sys.stdin.buffer)
+
+    read() returns a float32 array per frame/line, an empty array for blank
+    lines, and None once the stream is closed.
+    """
+
+    def __init__(self, stream, fmt=FORMAT_CSV):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown audio format '{fmt}'")
+        self.stream = stream
+        self.format = fmt
+        self.frames_read = 0
+        self.bytes_read = 0
+
+    def _read_exact(self, n):
+        buf = self.stream.read(n)
+        if not buf or len(buf) == n:
+            return buf
+        # Pipes may return short reads; keep going until we have the full frame
+        chunks = [buf]
+        remaining = n - len(buf)
+        while remaining:
+            more = self.stream.read(remaining)
+            if not more:
+                raise FrameError(f"Truncated frame: expected {n} bytes, got {n - remaining}")
+            chunks.append(more)
+            remaining -= len(more)
+        return b"".join(chunks)
+
+    def read(self):
+        """Read the next frame; None on EOF"""
+        if self.format == FORMAT_CSV:
+            line = self.stream.readline()
+            if not line:
+                return None
+            self.bytes_read += len(line)
+            self.frames_read += 1
+            return parse_csv_line(line)
+
+        header = self._read_exact(_HEADER.size)
+        if not header:
+            return None
+        if len(header) != _HEADER.size:
+            raise FrameError("Truncated frame header")
+        (length,) = _HEADER.unpack(header)
+        if length > MAX_FRAME_BYTES or length % _DTYPES[self.format].itemsize:
+            raise FrameError(f"Invalid frame length {length} for {self.format}")
+        payload = self._read_exact(length) if length else b""
+        self.bytes_read += _HEADER.size + length
+        self.frames_read += 1
+        return decode_pcm(payload, self.format)
+
+    def __iter__(self):
+        while True:
+            samples = self.read()
+            if samples is None:
+                return
+            yield samples
+
+
+class AsyncFrameReader:
+    """FrameReader counterpart for an asyncio.StreamReader (pipes/sockets on the event loop)"""
+
+    def __init__(self, reader, fmt=FORMAT_CSV):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown audio format '{fmt}'")
+        self.reader = reader
+        self.format = fmt
+        self.frames_read = 0
+        self.bytes_read = 0
+
+    async def _read_exact(self, n, what):
+        import asyncio  # already loaded by the caller's event loop; kept off the sync import path
+        try:
+            return await self.reader.readexactly(n)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial and what == "header":
+                return b""
+            raise FrameError(f"Truncated frame {what}: expected {n} bytes, got {len(e.partial)}")
+
+    async def read(self):
+        """Read the next frame; None on EOF"""
+        if self.format == FORMAT_CSV:
+            line = await self.reader.readline()
+            if not line:
+                return None
+            self.bytes_read += len(line)
+            self.frames_read += 1
+            return parse_csv_line(line)
+
+        header = await self._read_exact(_HEADER.size, "header")
+        if not header:
+            return None
+        (length,) = _HEADER.unpack(header)
+        if length > MAX_FRAME_BYTES or length % _DTYPES[self.format].itemsize:
+            raise FrameError(f"Invalid frame length {length} for {self.format}")
+        payload = await self._read_exact(length, "payload") if length else b""
+        self.bytes_read += _HEADER.size + length
+        self.frames_read += 1
+        return decode_pcm(payload, self.format)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Pluggable transcription engines
+Every engine turns a float32 mono segment into text; the Realtime engine streams instead
+
+Engines are selected per stream with --engine <name>, $REMI_ENGINE_<STREAM>
+(e.g. REMI_ENGINE_SYSTEM=local) or $REMI_ENGINE.
+"""
+
+import io
+import os
+import random
+import threading
+import time
+import wave
+import numpy as np
+from audio_frames import parse_flag
+
+
+def audio_to_wav_bytes(audio_array, sample_rate=16000):
+    """Convert numpy audio array to WAV format bytes"""
+    audio_int16 = (np.clip(audio_array, -1.0, 1.0) * 32767).astype(np.int16)
+    wav_io = io.BytesIO()
+    with wave.open(wav_io, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(audio_int16.tobytes())
+    wav_io.seek(0)
+    return wav_io
+
+
+class TranscriptionEngine:
+    """Base class: transcribe(audio) -> text or None
+
+    transcribe() is blocking and may be called from worker threads.
+    """
+
+    name = "base"
+    streaming = False          # True for engines that consume a live audio stream
+    requires_api_key = False
+    sample_rate = 16000
+
+    def transcribe(self, audio_array):
+        raise NotImplementedError(f"{self.name} engine does not transcribe segments")
+
+    def describe(self):
+        return self.name
+
+    def close(self):
+        pass
+
+
+class WhisperAPIEngine(TranscriptionEngine):
+    """OpenAI Whisper API (one HTTP request per segment)"""
+
+    name = "whisper-api"
+    requires_api_key = True
+
+    def __init__(self, model="whisper-1", language="en", temperature=0.2, api_key=None):
+        self.model = model
+        self.language = language
+        self.temperature = temperature
+        self._api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self._client = None
+        self._client_error = None
+        # Importing the SDK takes most of a second; do it while the first segment is spoken
+        self._loader = threading.Thread(target=self._load_client, name="openai-import", daemon=True)
+        self._loader.start()
+
+    def _load_client(self):
+        try:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self._api_key)
+        except Exception as e:
+            self._client_error = e
+
+    @property
+    def client(self):
+        self._loader.join()
+        if self._client is None:
+            raise RuntimeError(f"OpenAI client unavailable: {self._client_error}")
+        return self._client
+
+    def transcribe(self, audio_array):
+        wav_bytes = audio_to_wav_bytes(audio_array, self.sample_rate)
+        wav_bytes.name = "audio.wav"  # Required by OpenAI API
+        transcription = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=wav_bytes,
+            language=self.language,
+            temperature=self.temperature  # Lower temperature for more consistent output
+        )
+        return transcription.text.strip()
+
+    def describe(self):
+        return f"OpenAI Whisper API ({self.model})"
+
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """On-device CPU transcription with a quantized Whisper model (faster-whisper)
+
+    No network round trip per segment, works offline and is deterministic
+    (greedy decoding), which makes it the engine to use for benchmarks.
+    """
+
+    name = "local"
+
+    def __init__(self, model_size=None, compute_type="int8", cpu_threads=0, language="en"):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "Local engine needs faster-whisper: pip install faster-whisper"
+            ) from e
+        self.model_size = model_size or os.environ.get("REMI_LOCAL_MODEL", "base.en")
+        self.language = language
+        self.model = WhisperModel(
+            self.model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads
+        )
+        # The model is CPU-bound; running requests side by side only thrashes the cores
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_array):
+        audio_array = np.ascontiguousarray(audio_array, dtype=np.float32)
+        with self._lock:
+            segments, _info = self.model.transcribe(
+                audio_array,
+                language=self.language,
+                beam_size=1,
+                temperature=0.0,
+                condition_on_previous_text=False,
+            )
+            return " ".join(s.text.strip() for s in segments).strip()
+
+    def describe(self):
+        return f"local Whisper ({self.model_size}, CPU)"
+
+
+class RealtimeAPIEngine(TranscriptionEngine):
+    """OpenAI Realtime websocket; audio is streamed rather than sent per segment"""
+
+    name = "realtime"
+    streaming = True
+    requires_api_key = True
+    sample_rate = 24000  # pcm16 input expected by the Realtime API
+
+    URL = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
+    # Transcription-only session: the server never generates model responses
+    TRANSCRIPTION_URL = "wss://api.openai.com/v1/realtime?intent=transcription"
+
+    def __init__(self, url=None, api_key=None, transcription_only=False):
+        self.transcription_only = transcription_only
+        self.url = url or (self.TRANSCRIPTION_URL if transcription_only else self.URL)
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+
+    def headers(self):
+        # Build headers as list of tuples for websockets library
+        return [
+            ("Authorization", f"Bearer {self.api_key}"),
+            ("OpenAI-Beta", "realtime=v1")
+        ]
+
+    async def connect(self):
+        import websockets
+        return await websockets.connect(self.url, additional_headers=self.headers())
+
+    def describe(self):
+        if self.transcription_only:
+            return "OpenAI Realtime API (transcription session)"
+        return "OpenAI Realtime API"
+
+
+class StubEngine(TranscriptionEngine):
+    """Canned text after a fixed (optionally jittered) delay, for benchmarks and dry runs"""
+
+    name = "stub"
+
+    def __init__(self, latency_ms=None, jitter_ms=0, lines=None):
+        if latency_ms is None:
+            latency_ms = float(os.environ.get("REMI_STUB_LATENCY_MS", "300"))
+        self.latency_s = latency_ms / 1000
+        self.jitter_s = jitter_ms / 1000
+        self.lines = list(lines) if lines else None
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_array):
+        with self._lock:
+            n = self._count
+            self._count += 1
+        time.sleep(max(0.0, self.latency_s + random.uniform(-self.jitter_s, self.jitter_s)))
+        if self.lines:
+            return self.lines[n % len(self.lines)]
+        return f"segment {n} ({len(audio_array) / self.sample_rate:.1f}s)"
+
+    def describe(self):
+        return f"stub engine ({self.latency_s * 1000:.0f} ms)"
+
+
+ENGINES = {
+    WhisperAPIEngine.name: WhisperAPIEngine,
+    LocalWhisperEngine.name: LocalWhisperEngine,
+    RealtimeAPIEngine.name: RealtimeAPIEngine,
+    StubEngine.name: StubEngine,
+}
+
+
+def parse_engine_arg(argv, stream_type, default="whisper-api"):
+    """Engine name for a stream: --engine, then $REMI_ENGINE_<STREAM>, then $REMI_ENGINE"""
+    env_default = os.environ.get(
+        f"REMI_ENGINE_{stream_type.upper()}", os.environ.get("REMI_ENGINE", default)
+    )
+    name = parse_flag(argv, "engine", env_default).lower()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}' (expected one of {', '.join(ENGINES)})")
+    return name
+
+
+def create_engine(name, **kwargs):
+    """Instantiate an engine by name"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}' (expected one of {', '.join(ENGINES)})")
+    return ENGINES[name](**kwargs)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Streaming n-gram hallucination filter
+Rolling hashes over word n-grams catch in-chunk loops ("thank you thank you ...")
+and the same sentence coming back in consecutive chunks, in linear time
+"""
+
+import re
+from collections import Counter, deque
+
+_WORD = re.compile(r"[\w']+")
+_MASK = (1 << 64) - 1   # hashes wrap at 64 bits
+_BASE = 1_000_003
+
+
+def tokenize(text):
+    """Lower-cased words without punctuation, so 'Thanks.' and 'thanks' match"""
+    return _WORD.findall(text.lower())
+
+
+def token_ids(tokens):
+    return [hash(token) & _MASK for token in tokens]
+
+
+def ngram_hash_levels(ids, max_n):
+    """Yield (n, hashes of every n-gram) for n = 1..max_n
+
+    Each level extends the previous one by a token (h * base + id), so every
+    level costs O(len(ids)) and no n-gram string is ever built.
+    """
+    hashes = ids
+    for n in range(1, max_n + 1):
+        if n > 1:
+            hashes = [(h * _BASE + token) & _MASK for h, token in zip(hashes, ids[n - 1:])]
+        if not hashes:
+            return
+        yield n, hashes
+
+
+def ngram_hashes(ids, n):
+    for level, hashes in ngram_hash_levels(ids, n):
+        if level == n:
+            return hashes
+    return []
+
+
+def has_ngram_loop(ids, min_n=3, max_n=6, max_repetition=8, max_consecutive=5):
+    """True if a word repeats max_consecutive times in a row or an n-gram > max_repetition times"""
+    run = 1
+    for i in range(1, len(ids)):
+        run = run + 1 if ids[i] == ids[i - 1] else 1
+        if run >= max_consecutive:
+            return True
+    for n, hashes in ngram_hash_levels(ids, max_n):
+        if n >= min_n and max(Counter(hashes).values()) > max_repetition:
+            return True
+    return False
+
+
+class HallucinationFilter:
+    """Per-stream filter over a bounded window of recently accepted chunks
+
+    check(text) returns "repetitive" for an in-chunk loop, "duplicate" when at
+    least repeat_overlap of the chunk's word trigrams already appeared in one
+    of the last window_chunks chunks, or None to keep it. Very short chunks
+    ("Yes.", "Okay.") are never treated as duplicates.
+
+    Not thread-safe, and order-sensitive: call it from one place, in segment order.
+    """
+
+    def __init__(self, window_chunks=6, repeat_overlap=0.8, min_duplicate_words=5,
+                 min_loop_words=10, max_repetition=8):
+        self.repeat_overlap = repeat_overlap
+        self.min_duplicate_words = min_duplicate_words
+        self.min_loop_words = min_loop_words
+        self.max_repetition = max_repetition
+        self._recent = deque(maxlen=window_chunks)   # trigram hash sets of accepted chunks
+        self.checked = 0
+        self.dropped = Counter()
+
+    def _is_duplicate(self, shingles):
+        for previous in self._recent:
+            overlap = sum(1 for h in shingles if h in previous)
+            if overlap >= self.repeat_overlap * len(shingles):
+                return True
+        return False
+
+    def check(self, text):
+        self.checked += 1
+        ids = token_ids(tokenize(text))
+        if len(ids) >= self.min_loop_words and has_ngram_loop(ids, max_repetition=self.max_repetition):
+            self.dropped["repetitive"] += 1
+            return "repetitive"
+        shingles = set(ngram_hashes(ids, 3))
+        if len(ids) >= self.min_duplicate_words and self._is_duplicate(shingles):
+            self.dropped["duplicate"] += 1
+            return "duplicate"
+        if shingles:
+            self._recent.append(shingles)
+        return None
+
+    def summary(self):
+        dropped = sum(self.dropped.values())
+        return (f"{dropped}/{self.checked} segments dropped "
+                f"({self.dropped['repetitive']} looping, {self.dropped['duplicate']} repeated)")
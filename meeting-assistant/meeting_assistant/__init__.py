@@ -0,0 +1 @@
+"""Remi meeting assistant (Python side)"""
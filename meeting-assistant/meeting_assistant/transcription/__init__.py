@@ -0,0 +1,55 @@
+"""
+Transcription package: one entry point for every transcriber, lazily imported
+The implementation modules live flat in meeting-assistant/ (so the scripts there
+keep working when run directly); attributes below resolve on first access only
+
+    from meeting_assistant.transcription import SpeechSegmenter, create_engine
+    python3 -m meeting_assistant.transcription realtime mic --format f32le
+"""
+
+import importlib
+import os
+import sys
+
+# meeting-assistant/ holds the flat modules the transcribers import by bare name
+_SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPT_DIR)
+
+# public name -> flat module that defines it
+_EXPORTS = {
+    "FrameReader": "audio_frames",
+    "AsyncFrameReader": "audio_frames",
+    "FrameError": "audio_frames",
+    "encode_frame": "audio_frames",
+    "AudioRingBuffer": "audio_buffer",
+    "SpeechSegmenter": "vad",
+    "SpeechSegment": "vad",
+    "SilenceGate": "vad",
+    "ENGINES": "engines",
+    "create_engine": "engines",
+    "parse_engine_arg": "engines",
+    "TranscriptionPipeline": "pipeline",
+    "prepare_segment": "segment_processing",
+    "filter_transcript": "segment_processing",
+    "SpectralNoiseSuppressor": "noise_suppression",
+    "HallucinationFilter": "hallucination_filter",
+    "AgendaTrackerClient": "tracker_client",
+    "TranscriptWriter": "transcript_writer",
+    "AudioArchiver": "audio_archive",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+"""python3 -m meeting_assistant.transcription <mode> [stream] [flags]"""
+
+from meeting_assistant.transcription.cli import main
+
+main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point for every transcriber
+Only the module for the chosen mode (and the backend it selects) is ever imported
+
+Usage:
+    python3 -m meeting_assistant.transcription <mode> [stream] [flags]
+    python3 -m meeting_assistant.transcription startup-bench [mode ...] [--runs 5]
+"""
+
+import os
+import sys
+import time
+
+# mode -> (flat module, description)
+MODES = {
+    "agenda": ("transcribe_audio_with_agenda", "segment + transcribe, forward to the agenda tracker"),
+    "whisper": ("transcribe_audio", "segment + transcribe, log only"),
+    "openai": ("transcribe_audio", "segment + transcribe with shorter segments, log only"),
+    "realtime": ("transcribe_realtime", "stream to the OpenAI Realtime API"),
+    "host": ("transcription_host", "every --stream in one process"),
+}
+# Flags a mode passes before the caller's own (which, coming later, win)
+MODE_DEFAULTS = {
+    "openai": ["--max-segment-s", "5"],
+}
+BENCH_MODES = ("agenda", "whisper", "realtime", "host")
+READY_MARKER = "Ready to"
+
+
+def usage():
+    lines = ["Usage: python3 -m meeting_assistant.transcription <mode> [stream] [flags]", "", "Modes:"]
+    lines += [f"  {mode:<14}{description}" for mode, (_module, description) in MODES.items()]
+    lines.append(f"  {'startup-bench':<14}time from launch to \"{READY_MARKER} ...\" for each mode")
+    return "\n".join(lines)
+
+
+def run_mode(mode, argv):
+    """Run a transcriber module as __main__, exactly as if its script had been started"""
+    import runpy
+    module_name = MODES[mode][0]
+    defaults = MODE_DEFAULTS.get(mode)
+    if defaults:
+        # The transcribers read the stream from sys.argv[1] (mic when it is left out)
+        has_stream = bool(argv) and not argv[0].startswith("--")
+        argv = [argv[0] if has_stream else "mic", *defaults, *argv[has_stream:]]
+    sys.argv = [module_name, *argv]
+    runpy.run_module(module_name, run_name="__main__", alter_sys=True)
+
+
+def _time_to_ready(mode, env, timeout_s):
+    """Launch one mode and return seconds until its ready line (None on failure)"""
+    import subprocess
+    import threading
+    args = ["--stream", "mic=-"] if mode == "host" else ["mic"]
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "meeting_assistant.transcription", mode, *args],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        env=env, text=True
+    )
+    timer = threading.Timer(timeout_s, process.kill)
+    timer.start()
+    elapsed = None
+    try:
+        for line in process.stdout:
+            if READY_MARKER in line:
+                elapsed = time.perf_counter() - started
+                break
+    finally:
+        timer.cancel()
+        process.kill()
+        process.wait()
+    return elapsed
+
+
+def startup_bench(argv):
+    """Median/min/max launch-to-ready time per mode, measured from outside the process"""
+    import statistics
+    import tempfile
+    from audio_frames import parse_flag
+    runs = int(parse_flag(argv, "runs", "5"))
+    modes = [arg for arg in argv if arg in MODES] or list(BENCH_MODES)
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    with tempfile.TemporaryDirectory() as transcripts_dir:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+        # Nothing is sent anywhere: every process is killed as soon as it is ready
+        env.setdefault("OPENAI_API_KEY", "startup-bench")
+        env["REMI_TRANSCRIPTS_DIR"] = transcripts_dir
+        print(f"⏱️ Launch to \"{READY_MARKER} ...\" over {runs} runs")
+        for mode in modes:
+            times = [_time_to_ready(mode, env, timeout_s=30) for _ in range(runs)]
+            ok = [t * 1000 for t in times if t is not None]
+            if not ok:
+                print(f"  {mode:<10}never became ready")
+                continue
+            print(f"  {mode:<10}median {statistics.median(ok):6.0f} ms   "
+                  f"min {min(ok):6.0f} ms   max {max(ok):6.0f} ms"
+                  + (f"   ({runs - len(ok)} failed)" if len(ok) < runs else ""))
+
+
+def main(argv=None):
+    from startup import LAUNCHED_AT_ENV_VAR  # flat module; the package __init__ put it on sys.path
+    os.environ[LAUNCHED_AT_ENV_VAR] = str(time.time())
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        sys.exit(0 if argv else 2)
+    mode, rest = argv[0], argv[1:]
+    if mode == "startup-bench":
+        startup_bench(rest)
+    elif mode in MODES:
+        run_mode(mode, rest)
+    else:
+        print(f"❌ Unknown mode '{mode}'\n\n{usage()}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
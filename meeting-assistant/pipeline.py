@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Pipelined transcription: capture keeps running while up to N requests are in flight
+Results are re-sequenced by segment index before they are delivered
+"""
+
+import asyncio
+from segment_queue import OverloadQueue
+
+
+class Resequencer:
+    """Buffers out-of-order results and releases them in index order"""
+
+    def __init__(self, first_index=0):
+        self.next_index = first_index
+        self._pending = {}
+
+    def add(self, index, result):
+        """Store a result; returns the (index, result) pairs now deliverable in order"""
+        self._pending[index] = result
+        ready = []
+        while self.next_index in self._pending:
+            ready.append((self.next_index, self._pending.pop(self.next_index)))
+            self.next_index += 1
+        return ready
+
+    def skip(self, index):
+        """Mark an index that will never produce a result (its segment was dropped)"""
+        self._pending[index] = None
+
+    @property
+    def waiting(self):
+        return len(self._pending)
+
+
+class TranscriptionPipeline:
+    """Bounded queue of segments feeding a pool of transcription workers
+
+    transcribe(segment) is a blocking callable run in a worker thread and
+    returns text (or None to skip). deliver(segment, text) is a coroutine
+    called on the event loop strictly in segment order, so stateful
+    post-processing (the hallucination filter's duplicate window) belongs
+    there rather than in transcribe. submit() never makes
+    the reader wait: a backlog is handled by the queue's overload policy and
+    reported to the log and, every status_interval_s while it lasts, to
+    report(stats) if one is given.
+    """
+
+    def __init__(self, transcribe, deliver, max_in_flight=3, log=print, overload=None,
+                 sample_rate=16000, report=None, status_interval_s=5.0):
+        self.transcribe = transcribe
+        self.deliver = deliver
+        self.max_in_flight = max(1, max_in_flight)
+        self._resequencer = Resequencer()
+        self.queue = OverloadQueue(sample_rate=sample_rate, on_drop=self._on_drop, **(overload or {}))
+        self.log = log
+        self.report = report
+        self.status_interval_s = status_interval_s
+        self._segments = {}
+        self._deliver_lock = asyncio.Lock()
+        self._workers = []
+        self._monitor = None
+        self.submitted = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_in_flight)
+        ]
+        self._monitor = asyncio.create_task(self._watch_backlog())
+
+    async def submit(self, segment):
+        """Queue a segment; returns at once, overload is handled by the queue policy"""
+        self.submitted += 1
+        self.queue.put_nowait(segment)
+
+    async def close(self):
+        """Drain the queue, wait for in-flight requests and deliver the rest"""
+        self.queue.close()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+            if self.submitted:
+                # Final numbers; an idle session has nothing to report (and maybe no tracker)
+                await self._report_status()
+
+    def stats(self):
+        return dict(self.queue.stats(), inFlight=self.in_flight,
+                    completed=self.completed, failed=self.failed)
+
+    def _on_drop(self, segment):
+        # Later results must not wait for a segment that will never be transcribed
+        self._resequencer.skip(segment.index)
+
+    async def _watch_backlog(self):
+        """Log and report queue depth and drops while the workers are behind"""
+        last = self.queue.stats()
+        while True:
+            await asyncio.sleep(self.status_interval_s)
+            stats = self.queue.stats()
+            if stats["depth"] >= self.max_in_flight or stats["dropped"] != last["dropped"]:
+                self.log(f"⏳ Transcription backlog: {stats['depth']} segments ({stats['queuedSeconds']}s) waiting, "
+                         f"{self.queue.summary()}")
+            if stats != last:
+                await self._report_status()
+            last = stats
+
+    async def _report_status(self):
+        if self.report is None:
+            return
+        try:
+            await self.report(self.stats())
+        except Exception as e:
+            self.log(f"⚠️ Could not report transcriber status: {e}")
+
+    async def _worker(self, worker_id):
+        while True:
+            segment = await self.queue.get()
+            if segment is None:
+                return
+            self.in_flight += 1
+            try:
+                text = await asyncio.to_thread(self.transcribe, segment)
+                self.completed += 1
+            except Exception as e:
+                self.log(f"❌ Transcription failed for segment {segment.index}: {e}")
+                self.failed += 1
+                text = None
+            finally:
+                self.in_flight -= 1
+            await self._complete(segment, text)
+
+    async def _complete(self, segment, text):
+        self._segments[segment.index] = segment
+        # Deliveries must not interleave, or a later send could overtake an earlier one
+        async with self._deliver_lock:
+            for index, result in self._resequencer.add(segment.index, text):
+                ready_segment = self._segments.pop(index, None)
+                if result:
+                    try:
+                        await self.deliver(ready_segment, result)
+                    except Exception as e:
+                        self.log(f"⚠️ Could not deliver segment {index}: {e}")
@@ -1,59 +1,305 @@
 #!/usr/bin/env python3
 """
-Automate merging mic and system transcripts for each meeting session and insert unified transcript into Supabase.
+Automate merging the per-stream transcripts (mic, system, restarts) of each meeting session and upload them to Supabase.
+
+Streams are merged lazily with a heap on parsed timestamps and written out as they are
+merged, so memory stays flat however long the meeting. Runs are incremental: a manifest
+next to the transcripts keeps each file's size, mtime, content fingerprint, and the offset
+and line count already pushed, so only new bytes are read and only sessions that changed
+are uploaded. New lines go to meeting_segments under the same keys the live upload uses,
+so lines it already stored are skipped server-side; the session's meeting_notes row is
+only rebuilt when that added something. A run with nothing new touches no file contents.
 """
 import os
 import json
+import heapq
+import hashlib
 from pathlib import Path
 from datetime import datetime
 import sys
 from dotenv import load_dotenv
 sys.path.append(str(Path(__file__).parent.parent))
 load_dotenv()
-from backend.core.supabase_client import insert_record
+from backend.core.transcript_store import (
+    session_start, segment_row, upsert_segments, delete_segments, finalize_session,
+)
+from transcript_writer import session_of
+
+MANIFEST_NAME = ".push_manifest.json"
+MERGED_DIR = "merged"     # merged transcript per session, next to the stream files
+FINGERPRINT_BYTES = 4096  # hashed at the start of a file and just before the pushed offset
+UPLOAD_BATCH = 500        # segment rows per upsert
+SESSION_GAP_S = 300       # legacy files only: streams further apart than this are separate meetings
+
+def stream_start(file):
+    """Start time encoded in a transcript file name ({ts}_{stream}_{id}[--{session}].ndjson)."""
+    return datetime.strptime(file.name.split("_")[0], "%Y%m%dT%H%M%S")
 
 def find_session_files(transcripts_dir):
-    """Return list of (mic_file, system_file) tuples for each session."""
-    files = list(Path(transcripts_dir).glob("*.ndjson"))
+    """Return {session_id: [files]} for every session.
+
+    Files carrying a session id in their name (every stream of a meeting gets the same
+    one) are grouped by it. Older files without one fall back to timing: streams written
+    at overlapping times (or within SESSION_GAP_S of each other) belong to one session,
+    so extra streams and streams restarted mid-meeting join the session they were part of.
+    """
     sessions = {}
-    for f in files:
-        parts = f.name.split("_")
-        if len(parts) < 3:
+    legacy = []
+    for f in Path(transcripts_dir).glob("*.ndjson"):
+        session_id = session_of(f)
+        if session_id is not None:
+            sessions.setdefault(session_id, []).append(f)
             continue
-        session_key = parts[0]  # timestamp
-        stream_type = parts[1]
-        sessions.setdefault(session_key, {})[stream_type] = f
-    # Only sessions with both mic and system
-    return [ (v.get("mic"), v.get("system")) for v in sessions.values() if v.get("mic") and v.get("system") ]
+        try:
+            legacy.append((stream_start(f), f))
+        except ValueError:
+            continue
+    for files in sessions.values():
+        files.sort(key=lambda f: f.name)
+    legacy.sort()
+    session_files, session_end = None, None
+    for start, f in legacy:
+        if session_files is None or start.timestamp() > session_end + SESSION_GAP_S:
+            # The earliest file names the session, so the id stays put as files join it
+            session_files = sessions.setdefault(f.name.split("_")[0], [])
+            session_end = start.timestamp()
+        session_files.append(f)
+        session_end = max(session_end, f.stat().st_mtime)
+    return sessions
 
 def read_transcript_lines(file):
+    """Lazily yield the records of one NDJSON transcript."""
     if not file or not file.exists():
-        return []
+        return
     with open(file, "r", encoding="utf-8") as f:
-        return [json.loads(line) for line in f if line.strip()]
-
-def merge_transcripts(mic_lines, system_lines):
-    all_lines = mic_lines + system_lines
-    all_lines.sort(key=lambda x: x["ts"])
-    return all_lines
-
-def push_all_sessions(transcripts_dir):
-    sessions = find_session_files(transcripts_dir)
-    for mic_file, system_file in sessions:
-        mic_lines = read_transcript_lines(mic_file)
-        system_lines = read_transcript_lines(system_file)
-        merged = merge_transcripts(mic_lines, system_lines)
-        full_text = "\n".join(f"[{l['speaker']}] {l['text']}" for l in merged)
-        created_at = merged[0]["ts"] if merged else datetime.now().isoformat()
-        session_id = mic_file.stem.split("_mic_")[0] if mic_file else "unknown"
-        record = {
-            "transcription": full_text,
-            "created_at": created_at,
-        }
-        print(f"Uploading session {session_id}...")
-        insert_record("meeting_notes", record)
-        print(f"✅ Uploaded: {session_id}")
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def parse_ts(value):
+    """Line timestamp as a naive local datetime (unparseable ones sort first)."""
+    try:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return datetime.min
+    if ts.tzinfo is not None:
+        ts = ts.astimezone().replace(tzinfo=None)
+    return ts
+
+def merge_transcripts(*streams):
+    """Lazily merge any number of per-stream line iterators, each already in time order.
+
+    Only one pending line per stream is held at a time, however long the meeting.
+    """
+    return heapq.merge(*streams, key=lambda line: parse_ts(line.get("ts")))
+
+def format_line(line):
+    return f"[{line['speaker']}] {line['text']}"
+
+def write_merged(lines, out):
+    """Write merged lines to a binary file as they are produced; returns (count, first ts)."""
+    count, first_ts = 0, None
+    for line in lines:
+        if first_ts is None:
+            first_ts = line.get("ts")
+        out.write((format_line(line) + "\n").encode("utf-8"))
+        count += 1
+    return count, first_ts
+
+def load_manifest(path):
+    """Manifest of what was already pushed ({"files": ..., "sessions": ...})."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest.setdefault("files", {})
+        manifest.setdefault("sessions", {})
+        return manifest
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable manifest {path}: {e}")
+    return {"files": {}, "sessions": {}}
+
+def save_manifest(path, manifest):
+    """Write the manifest atomically so an interrupted run never leaves it half-written."""
+    tmp_path = Path(path).with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def _digest(f, start, end):
+    f.seek(start)
+    return hashlib.sha256(f.read(end - start)).hexdigest()
+
+def fingerprint(f, offset):
+    """Hashes of the first bytes of the file and of the bytes just before offset.
+
+    Enough to tell an appended file from a rewritten one without hashing all of it.
+    """
+    return {
+        "head": _digest(f, 0, min(FINGERPRINT_BYTES, offset)),
+        "tail": _digest(f, max(0, offset - FINGERPRINT_BYTES), offset),
+    }
+
+class StreamCursor:
+    """Lazily reads the complete lines of one stream file past its pushed offset."""
+
+    def __init__(self, file, entry):
+        self.file = file
+        self.entry = entry
+        # Taken before reading: lines appended meanwhile then show up as a change next run
+        self.stat = stat = file.stat()
+        self.unchanged = bool(entry) and stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+        self.rewritten = False
+        self.offset = entry["offset"] if self.unchanged else 0
+        self.line = entry.get("lines", 0) if self.unchanged else 0
+        if entry and not self.unchanged:
+            with open(file, "rb") as f:
+                if stat.st_size >= entry["offset"] and fingerprint(f, entry["offset"]) == {
+                    "head": entry["head"], "tail": entry["tail"]
+                }:
+                    if "lines" in entry:
+                        self.offset, self.line = entry["offset"], entry["lines"]
+                    # else: pushed before line counts were kept, so read it again from the
+                    # start to number its lines; lines already stored are skipped
+                else:
+                    # The file no longer starts with what was pushed
+                    self.rewritten = True
+
+    def restart(self):
+        """Read the whole file again (the session is being rebuilt)."""
+        self.offset = 0
+        self.line = 0
+        self.unchanged = False
+
+    def lines(self):
+        """Yield (seq, record) for each new line; seq is the line number in the file."""
+        if self.unchanged:
+            return
+        with open(self.file, "rb") as f:
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # a line still being written is picked up by the next run
+                self.offset += len(raw)
+                seq = self.line
+                self.line += 1
+                if not raw.strip():
+                    continue
+                try:
+                    yield seq, json.loads(raw)
+                except ValueError:
+                    print(f"⚠️ Skipping malformed line in {self.file.name}")
+
+    def first_ts(self):
+        """Timestamp of the file's first line (None if it has none yet)."""
+        with open(self.file, "rb") as f:
+            try:
+                return json.loads(f.readline()).get("ts")
+            except ValueError:
+                return None
+
+    def manifest_entry(self):
+        if self.unchanged:
+            return self.entry
+        stat = self.stat
+        with open(self.file, "rb") as f:
+            return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offset": self.offset,
+                    "lines": self.line, **fingerprint(f, self.offset)}
+
+def upload_segments(rows):
+    """Store segment rows in batches; returns how many were new, or None if a batch failed."""
+    added = 0
+    for i in range(0, len(rows), UPLOAD_BATCH):
+        stored = upsert_segments(rows[i:i + UPLOAD_BATCH])
+        if stored is None:
+            return None
+        added += len(stored)
+    return added
+
+def push_session(session_id, stream_files, manifest, merged_dir):
+    """Push whatever is new in one session; returns True if the manifest changed."""
+    files = manifest["files"]
+    session = manifest["sessions"].get(session_id, {})
+    cursors = [StreamCursor(f, files.get(f.name)) for f in stream_files]
+    replace = any(cursor.rewritten for cursor in cursors)
+    if replace:
+        # Already-pushed text can't be trusted any more: rebuild the session from scratch
+        for cursor in cursors:
+            cursor.restart()
+    if all(cursor.unchanged for cursor in cursors):
+        return False
+
+    # Offsets are counted the way the live upload counts them, so both produce the same keys
+    meeting_start = session_start(session_id)
+    rows = []
+
+    def stream_rows(cursor):
+        origin = meeting_start
+        for seq, record in cursor.lines():
+            if origin is None:
+                # Custom session ids carry no start time: offsets count from the stream's first line
+                origin = datetime.fromisoformat(cursor.first_ts() or record["ts"])
+            rows.append(segment_row(session_id, origin, record, seq))
+            yield record
+
+    # New merged lines go to the session's merged transcript as they are produced
+    merged_dir.mkdir(exist_ok=True)
+    merged_path = merged_dir / f"{session_id}.txt"
+    start = 0 if replace else session.get("merged_bytes", 0)
+    with open(merged_path, "ab") as out:
+        start = min(start, out.tell())
+        out.truncate(start)  # drops lines from a run whose upload failed
+        count, _first_ts = write_merged(merge_transcripts(*(stream_rows(cursor) for cursor in cursors)), out)
+        end = out.tell()
+
+    if count == 0 and not replace:
+        # Only partial lines or blank writes: remember the stat so the next run skips them
+        for cursor in cursors:
+            files[cursor.file.name] = cursor.manifest_entry()
+        return True
+
+    print(f"Uploading session {session_id} ({count} new lines from {len(cursors)} streams)...")
+    if replace and not delete_segments(session_id):
+        print(f"❌ Could not upload {session_id}, will retry next run")
+        return False
+    added = upload_segments(rows)
+    if added is None:
+        # Offsets stay where they were, so the next run retries these lines
+        print(f"❌ Could not upload {session_id}, will retry next run")
+        return False
+    record_id = session.get("record_id")
+    if added or replace or record_id is None:
+        # Only lines the live upload missed change the meeting_notes row
+        record_id = finalize_session(session_id, rebuild=replace)
+        if record_id is None:
+            # The segments are stored; forgetting the row makes the next run rebuild it
+            print(f"❌ Could not update the meeting note of {session_id}, will retry next run")
+            manifest["sessions"][session_id] = dict(session, record_id=None)
+            return True
+    for cursor in cursors:
+        files[cursor.file.name] = cursor.manifest_entry()
+    manifest["sessions"][session_id] = {
+        "record_id": record_id,
+        "merged_bytes": end,
+        "pushed_at": datetime.now().isoformat(),
+    }
+    print(f"✅ Uploaded: {session_id} ({added} new segments)")
+    return True
+
+def push_all_sessions(transcripts_dir, manifest_path=None):
+    transcripts_dir = Path(transcripts_dir)
+    manifest_path = Path(manifest_path or transcripts_dir / MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    changed = 0
+    for session_id, stream_files in find_session_files(transcripts_dir).items():
+        if push_session(session_id, stream_files, manifest, transcripts_dir / MERGED_DIR):
+            # Saved after every session so a crash never re-pushes what already went out
+            save_manifest(manifest_path, manifest)
+            changed += 1
+    if not changed:
+        print("✅ Nothing new to push")
 
 if __name__ == "__main__":
-    transcripts_dir = Path(__file__).parent / "transcripts"
+    transcripts_dir = Path(os.environ.get("REMI_TRANSCRIPTS_DIR", Path(__file__).parent / "transcripts"))
     push_all_sessions(transcripts_dir)
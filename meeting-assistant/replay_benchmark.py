@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Audio replay harness for end-to-end transcription latency benchmarks
+Plays a WAV/FLAC file through the transcriber stdin frame protocol into the real
+segmenter / pipeline / tracker client, with a stub engine and a local stand-in
+for the agenda tracker, and reports per-stage latency percentiles
+
+Usage:
+    python3 replay_benchmark.py meeting.wav [--speed 4] [--engine stub] [--format csv]
+    python3 replay_benchmark.py --synthetic 60 --speed 0
+
+Stages (per segment, all on one clock):
+    segmentation   end of speech (segment end minus VAD hangover) -> segment emitted
+    transcription  emitted -> text back (includes waiting for a free worker)
+    tracker send   text back -> message received by the tracker (includes reordering)
+    broadcast      received by the tracker -> state_update seen by a UI client
+--speed 0 plays as fast as possible. The stub engine cycles through the lines of
+--script (default: <audio>.txt next to the file, else lines built from the agenda).
+--overload-policy / --max-buffered-s / --spill-dir work as in the transcribers; a slow
+--stub-latency-ms with --speed 0 shows what each policy gives up.
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import bisect
+import wave
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import websockets
+from audio_frames import AsyncFrameReader, encode_frame, parse_flag, FORMAT_F32, FORMATS
+from vad import SpeechSegmenter
+from engines import create_engine, ENGINES
+from pipeline import TranscriptionPipeline
+from segment_queue import parse_overload_args
+from segment_processing import prepare_segment, filter_transcript
+from tracker_client import AgendaTrackerClient
+from hallucination_filter import HallucinationFilter
+from noise_suppression import SpectralNoiseSuppressor
+from resample import InputConverter
+
+SAMPLE_RATE = 16000
+MAX_SEGMENT_DURATION = 8.0
+STAGES = ("segmentation", "transcription", "tracker send", "broadcast", "end-to-end")
+
+
+def log_message(message):
+    """Print timestamped log message"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    print(f"[{timestamp}] {message}", flush=True)
+
+
+def load_audio(path):
+    """Read a WAV/FLAC file as mono float32 at SAMPLE_RATE"""
+    try:
+        import soundfile
+        audio, rate = soundfile.read(path, dtype="float32", always_2d=True)
+    except ImportError:
+        if not str(path).lower().endswith(".wav"):
+            raise RuntimeError("Reading non-WAV files needs soundfile: pip install soundfile")
+        with wave.open(str(path), "rb") as wav_file:
+            rate = wav_file.getframerate()
+            channels = wav_file.getnchannels()
+            if wav_file.getsampwidth() != 2:
+                raise RuntimeError("Only 16-bit WAV is supported without soundfile")
+            pcm = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
+        audio = (pcm.astype(np.float32) / 32768.0).reshape(-1, channels)
+    converter = InputConverter(rate, audio.shape[1], SAMPLE_RATE)
+    return converter.process(audio.reshape(-1))
+
+
+def synthetic_audio(seconds, seed=0):
+    """Alternating 'speech' bursts and quiet gaps (no fixture files needed)"""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    total = 0
+    while total < seconds * SAMPLE_RATE:
+        talk = int(rng.uniform(1.0, 4.0) * SAMPLE_RATE)
+        t = np.arange(talk) / SAMPLE_RATE
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)  # syllable-ish modulation
+        chunks.append((0.1 * envelope * np.sin(2 * np.pi * 220 * t)
+                       + 0.02 * rng.standard_normal(talk)).astype(np.float32))
+        gap = int(rng.uniform(0.8, 1.5) * SAMPLE_RATE)
+        chunks.append((0.001 * rng.standard_normal(gap)).astype(np.float32))
+        total += talk + gap
+    return np.concatenate(chunks)[: int(seconds * SAMPLE_RATE)]
+
+
+def load_agenda(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def default_script(agenda):
+    """One line per agenda item, so the stand-in tracker covers them as segments arrive"""
+    return [f"Let's talk about the {item['keywords'][0]} next" for item in agenda.get("items", [])
+            if item.get("keywords")] or ["Nothing on the agenda yet"]
+
+
+class StandInTracker:
+    """Minimal local agenda tracker: keyword coverage plus the real state_update broadcast
+
+    Speaks the same websocket protocol as backend/agents/agenda_tracker.py but
+    never calls an LLM, so the broadcast stage measures transport only.
+    """
+
+    def __init__(self, agenda):
+        self.title = agenda.get("meetingTitle", "Benchmark")
+        self.items = [dict(item, status="not-started") for item in agenda.get("items", [])]
+        self.conversation_count = 0
+        self.received_at = []       # perf_counter of every transcription, in arrival order
+        self.clients = set()
+        self.port = None
+        self._server = None
+
+    def state(self):
+        return {
+            "meetingTitle": self.title,
+            "items": [{"id": i["id"], "title": i["title"], "status": i["status"]} for i in self.items],
+            "prompts": [],
+            "conversationCount": self.conversation_count,
+        }
+
+    async def broadcast_state(self):
+        message = json.dumps({"type": "state_update", "data": self.state()})
+        await asyncio.gather(*[client.send(message) for client in self.clients], return_exceptions=True)
+
+    async def handler(self, websocket):
+        self.clients.add(websocket)
+        try:
+            await websocket.send(json.dumps({"type": "initial_state", "data": self.state()}))
+            async for message in websocket:
+                data = json.loads(message)
+                if data.get("type") != "transcription":
+                    continue
+                self.received_at.append(time.perf_counter())
+                self.conversation_count += 1
+                text = data["text"].lower()
+                for item in self.items:
+                    if item["status"] != "covered" and any(k.lower() in text for k in item.get("keywords", [])):
+                        item["status"] = "covered"
+                await self.broadcast_state()
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(websocket)
+
+    async def start(self):
+        self._server = await websockets.serve(self.handler, "localhost", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return f"ws://localhost:{self.port}"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+class LatencyRecorder:
+    """Per-segment timestamps keyed by segment index"""
+
+    def __init__(self):
+        self.segments = {}
+        self.delivered = []     # segment indexes in delivery (= conversationCount) order
+        self.broadcast_at = {}  # conversationCount -> perf_counter at the UI client
+        self.covered_by = {}    # agenda item id -> conversationCount that covered it
+
+    def mark(self, index, stage, when=None):
+        self.segments.setdefault(index, {})[stage] = time.perf_counter() if when is None else when
+
+    def stage_latencies(self, received_at):
+        latencies = {stage: [] for stage in STAGES}
+        for n, index in enumerate(self.delivered, start=1):
+            t = self.segments[index]
+            if n > len(received_at) or n not in self.broadcast_at:
+                continue
+            received, broadcast = received_at[n - 1], self.broadcast_at[n]
+            latencies["segmentation"].append(t["emitted"] - t["speech_end"])
+            latencies["transcription"].append(t["transcribed"] - t["emitted"])
+            latencies["tracker send"].append(received - t["transcribed"])
+            latencies["broadcast"].append(broadcast - received)
+            latencies["end-to-end"].append(broadcast - t["speech_end"])
+        return latencies
+
+
+def percentile_table(latencies):
+    lines = [f"{'stage':<15}{'n':>5}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}   (ms)"]
+    for stage in STAGES:
+        values = np.array(latencies[stage]) * 1000
+        if not len(values):
+            lines.append(f"{stage:<15}{0:>5}")
+            continue
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        lines.append(f"{stage:<15}{len(values):>5}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}{values.max():>9.1f}")
+    return "\n".join(lines)
+
+
+async def observe_state(url, recorder, ready):
+    """UI stand-in: timestamps every state_update broadcast"""
+    covered = set()
+    async with websockets.connect(url) as ws:
+        ready.set()
+        async for message in ws:
+            now = time.perf_counter()
+            data = json.loads(message)
+            if data.get("type") != "state_update":
+                continue
+            count = data["data"]["conversationCount"]
+            recorder.broadcast_at.setdefault(count, now)
+            for item in data["data"]["items"]:
+                if item["status"] == "covered" and item["id"] not in covered:
+                    covered.add(item["id"])
+                    recorder.covered_by[item["id"]] = count
+
+
+async def play(audio, stream_reader, fmt, frame_samples, speed, feed_log):
+    """Feed audio into the frame protocol in real time / speed (0 = unpaced)"""
+    start = time.perf_counter()
+    for offset in range(0, len(audio), frame_samples):
+        block = audio[offset:offset + frame_samples]
+        if speed > 0:
+            due = start + (offset + len(block)) / (SAMPLE_RATE * speed)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        stream_reader.feed_data(encode_frame(block, fmt))
+        feed_log.append((offset + len(block), time.perf_counter()))
+        if speed <= 0:
+            await asyncio.sleep(0)  # let the consumer run
+    stream_reader.feed_eof()
+
+
+async def run_benchmark(audio, engine, fmt, speed, frame_ms, max_in_flight, agenda, overload=None):
+    tracker_server = StandInTracker(agenda)
+    url = await tracker_server.start()
+    recorder = LatencyRecorder()
+    observer_ready = asyncio.Event()
+    observer = asyncio.create_task(observe_state(url, recorder, observer_ready))
+    await observer_ready.wait()
+
+    tracker = AgendaTrackerClient(url, log=log_message)
+    segmenter = SpeechSegmenter(SAMPLE_RATE, threshold=0.008, max_segment_s=MAX_SEGMENT_DURATION)
+    hangover_samples = segmenter.hangover_frames * segmenter.frame_len
+    # Scripted stub lines repeat by design, so only the in-chunk loop check applies to them
+    hallucinations = HallucinationFilter(window_chunks=0 if engine.name == "stub" else 6)
+    suppressor = SpectralNoiseSuppressor(SAMPLE_RATE)
+    feed_log = []   # (samples fed so far, perf_counter), for mapping samples to wall time
+
+    def fed_at(sample):
+        i = bisect.bisect_left(feed_log, (sample, 0.0))
+        return feed_log[min(i, len(feed_log) - 1)][1]
+
+    def transcribe(segment):
+        text = engine.transcribe(prepare_segment(segment.audio, suppressor))
+        recorder.mark(segment.index, "transcribed")
+        return text
+
+    async def deliver(segment, text):
+        # In segment order on the loop, like the transcribers' duplicate filtering
+        text, _reason = filter_transcript(text, hallucinations)
+        if not text:
+            return
+        recorder.delivered.append(segment.index)
+        await tracker.send_transcription("Other", text)
+
+    pipeline = TranscriptionPipeline(transcribe, deliver, max_in_flight=max_in_flight, log=log_message,
+                                     overload=overload, sample_rate=SAMPLE_RATE)
+    pipeline.start()
+
+    def emitted(segment):
+        speech_end = segment.end_sample - (0 if segment.forced else hangover_samples)
+        recorder.mark(segment.index, "speech_end", fed_at(max(speech_end, segment.start_sample + 1)))
+        recorder.mark(segment.index, "emitted")
+
+    stream_reader = asyncio.StreamReader()
+    reader = AsyncFrameReader(stream_reader, fmt)
+    frame_samples = SAMPLE_RATE * frame_ms // 1000
+    player = asyncio.create_task(play(audio, stream_reader, fmt, frame_samples, speed, feed_log))
+    started = time.perf_counter()
+    while True:
+        samples = await reader.read()
+        if samples is None:
+            break
+        for segment in segmenter.push(samples):
+            emitted(segment)
+            await pipeline.submit(segment)
+    for segment in segmenter.flush():
+        emitted(segment)
+        await pipeline.submit(segment)
+    await player
+    await pipeline.close()
+
+    # Wait for the last broadcasts to land
+    deadline = time.perf_counter() + 2.0
+    while len(recorder.broadcast_at) < len(recorder.delivered) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+
+    await tracker.close()
+    observer.cancel()
+    await asyncio.gather(observer, return_exceptions=True)
+    await tracker_server.stop()
+    return recorder, tracker_server, segmenter, pipeline, elapsed
+
+
+def main():
+    argv = sys.argv[1:]
+    # --synthetic on its own replays a minute of generated audio
+    synthetic = parse_flag(argv, "synthetic", "60" if "--synthetic" in argv else None)
+    paths = argv[:1] if argv and not argv[0].startswith("--") else []
+    if not paths and synthetic is None:
+        log_message("❌ Usage: replay_benchmark.py <audio.wav|flac> [--speed N] | --synthetic [seconds]")
+        sys.exit(2)
+
+    speed = float(parse_flag(argv, "speed", "1"))
+    # Default to what RemiController sends; --format csv measures the legacy protocol
+    fmt = parse_flag(argv, "format", FORMAT_F32).lower()
+    if fmt not in FORMATS:
+        log_message(f"❌ Unknown audio format '{fmt}' (expected one of {', '.join(FORMATS)})")
+        sys.exit(2)
+    frame_ms = int(parse_flag(argv, "frame-ms", "100"))
+    max_in_flight = int(parse_flag(argv, "max-in-flight", os.environ.get("REMI_MAX_IN_FLIGHT", "3")))
+    engine_name = parse_flag(argv, "engine", "stub").lower()
+    if engine_name not in ENGINES:
+        log_message(f"❌ Unknown engine '{engine_name}' (expected one of {', '.join(ENGINES)})")
+        sys.exit(2)
+    agenda = load_agenda(parse_flag(argv, "agenda", str(Path(__file__).parent / "example_agenda.json")))
+
+    if paths:
+        audio = load_audio(paths[0])
+        source = paths[0]
+    else:
+        audio = synthetic_audio(float(synthetic))
+        source = f"synthetic {float(synthetic):.0f}s"
+
+    if engine_name == "stub":
+        script = parse_flag(argv, "script", None)
+        if script is None and paths and Path(paths[0]).with_suffix(".txt").exists():
+            script = str(Path(paths[0]).with_suffix(".txt"))
+        lines = ([line.strip() for line in open(script) if line.strip()] if script
+                 else default_script(agenda))
+        engine = create_engine("stub", latency_ms=float(parse_flag(argv, "stub-latency-ms", "300")),
+                               jitter_ms=float(parse_flag(argv, "stub-jitter-ms", "100")), lines=lines)
+    else:
+        engine = create_engine(engine_name)
+
+    duration = len(audio) / SAMPLE_RATE
+    log_message(f"▶️ Replaying {source} ({duration:.1f}s) at "
+                f"{'max' if speed <= 0 else f'{speed:g}x'} speed through {engine.describe()} ({fmt})")
+    recorder, tracker_server, segmenter, pipeline, elapsed = asyncio.run(
+        run_benchmark(audio, engine, fmt, speed, frame_ms, max_in_flight, agenda, parse_overload_args(argv))
+    )
+
+    latencies = recorder.stage_latencies(tracker_server.received_at)
+    print(percentile_table(latencies), flush=True)
+    log_message(f"📊 {segmenter.segments_emitted} segments ({segmenter.segments_discarded} discarded), "
+                f"{pipeline.completed} transcribed, {pipeline.failed} failed, "
+                f"{len(recorder.delivered)} delivered in {elapsed:.1f}s")
+    log_message(f"📦 Overload ({pipeline.queue.policy}): {pipeline.queue.summary()}")
+    for item in tracker_server.items:
+        count = recorder.covered_by.get(item["id"])
+        if count is None:
+            log_message(f"⚪ {item['title']}: not covered")
+            continue
+        t = recorder.segments[recorder.delivered[count - 1]]
+        log_message(f"✅ {item['title']}: covered {1000 * (recorder.broadcast_at[count] - t['speech_end']):.0f} ms "
+                    f"after the words were spoken")
+
+    report = parse_flag(argv, "json", None)
+    if report:
+        with open(report, "w") as f:
+            json.dump({stage: list(values) for stage, values in latencies.items()}, f)
+        log_message(f"💾 Raw latencies written to {report}")
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
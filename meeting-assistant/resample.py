@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Vectorized polyphase resampling and channel downmix
+Lets capture send native-rate (44.1/48 kHz) interleaved audio and each engine get
+the rate it needs: 16 kHz for Whisper, 24 kHz pcm16 for the Realtime API
+
+Input rate / channels come from --input-rate / --channels ($REMI_INPUT_RATE,
+$REMI_INPUT_CHANNELS); the defaults (16 kHz mono) match what capture sends today.
+"""
+
+import os
+from math import gcd
+import numpy as np
+from audio_frames import parse_flag
+
+
+def downmix(samples, channels):
+    """Interleaved multi-channel float32 -> mono (channel average)"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if channels == 1:
+        return samples
+    usable = len(samples) - len(samples) % channels
+    return samples[:usable].reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+
+def design_lowpass(up, down, zero_crossings=8, rolloff=0.9, beta=8.0):
+    """Kaiser-windowed sinc for an up/down polyphase resampler, shaped (taps_per_phase, up)"""
+    # Cutoff at the lower Nyquist of the two rates, in units of the upsampled rate
+    cutoff = rolloff * 0.5 / max(up, down)
+    taps_per_phase = int(np.ceil(2 * zero_crossings * max(1.0, down / up)))
+    n = taps_per_phase * up
+    m = np.arange(n) - (n - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * m) * np.kaiser(n, beta)
+    h *= up / h.sum()   # unity DC gain after zero-stuffing
+    # Phase p uses taps p, p + up, p + 2 * up, ...
+    return h.reshape(taps_per_phase, up).astype(np.float32)
+
+
+class PolyphaseResampler:
+    """Stateful rational resampler: process() can be fed arbitrary-sized blocks
+
+    Output sample n sits at input position n * down / up. Only the taps of its
+    phase are evaluated (no zero-stuffed multiplies), for all outputs of a block
+    at once, and the last taps_per_phase - 1 inputs carry over to the next block.
+    """
+
+    def __init__(self, in_rate, out_rate, zero_crossings=8):
+        g = gcd(int(in_rate), int(out_rate))
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        self.passthrough = self.up == self.down
+        self._poly = design_lowpass(self.up, self.down, zero_crossings)
+        self.taps = self._poly.shape[0]
+        # Flip so that tap k of a phase lines up with history offset k
+        self._poly_by_phase = np.ascontiguousarray(self._poly.T[:, ::-1])
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._inputs = 0     # input samples consumed so far
+        self._outputs = 0    # output samples produced so far
+
+    def process(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.passthrough:
+            return samples
+        total = self._inputs + len(samples)
+        # Outputs whose newest input sample has arrived: n * down <= total * up - 1
+        last = (total * self.up - 1) // self.down
+        n = np.arange(self._outputs, last + 1, dtype=np.int64)
+        buffer = np.concatenate((self._history, samples))
+        if len(n):
+            positions = n * self.down
+            newest = positions // self.up - (self._inputs - len(self._history))
+            window = newest[:, None] - np.arange(self.taps - 1, -1, -1)
+            out = np.einsum("nk,nk->n", buffer[window], self._poly_by_phase[positions % self.up])
+        else:
+            out = np.empty(0, dtype=np.float32)
+        self._history = buffer[len(buffer) - (self.taps - 1):].copy()
+        self._inputs = total
+        self._outputs = last + 1
+        return out.astype(np.float32, copy=False)
+
+    def reset(self):
+        self._history[:] = 0
+        self._inputs = 0
+        self._outputs = 0
+
+    def process_buffer(self, samples):
+        """Resample one complete buffer on its own (resets the stream state)
+
+        Unlike process(), the filter delay is compensated and the tail flushed, so
+        output n lines up with input n * down / up and nothing is cut off the end.
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.passthrough:
+            return samples
+        self.reset()
+        # Centre of the lowpass, in input samples behind the newest one
+        delay = (self.taps * self.up - 1) / (2 * self.up)
+        out = self.process(np.concatenate((samples, np.zeros(int(np.ceil(delay)) + 1, dtype=np.float32))))
+        self.reset()
+        skip = int(round(delay * self.up / self.down))
+        return out[skip:skip + -(-len(samples) * self.up // self.down)]
+
+
+class InputConverter:
+    """Capture format -> mono float32 at the rate an engine wants"""
+
+    def __init__(self, in_rate, channels, out_rate):
+        self.in_rate = in_rate
+        self.channels = channels
+        self.out_rate = out_rate
+        self.resampler = PolyphaseResampler(in_rate, out_rate)
+
+    @property
+    def passthrough(self):
+        return self.channels == 1 and self.resampler.passthrough
+
+    def process(self, samples):
+        if self.passthrough:
+            return samples
+        return self.resampler.process(downmix(samples, self.channels))
+
+    def describe(self):
+        if self.passthrough:
+            return f"{self.out_rate} Hz mono"
+        return f"{self.in_rate} Hz x{self.channels} -> {self.out_rate} Hz mono"
+
+
+def parse_input_args(argv):
+    """(input rate, channel count) from --input-rate / --channels or the environment"""
+    rate = int(parse_flag(argv, "input-rate", os.environ.get("REMI_INPUT_RATE", "16000")))
+    channels = int(parse_flag(argv, "channels", os.environ.get("REMI_INPUT_CHANNELS", "1")))
+    if rate <= 0 or channels <= 0:
+        raise ValueError(f"Bad input format: {rate} Hz, {channels} channels")
+    return rate, channels
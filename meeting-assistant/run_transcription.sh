@@ -15,4 +15,6 @@ fi
 export OPENAI_API_KEY="${OPENAI_API_KEY}"
 
 # Run the transcription script with agenda tracking
-python3 "$SCRIPT_DIR/transcribe_audio_with_agenda.py" "$STREAM_TYPE"
+# Extra args (e.g. --format s16le) are passed through to the transcriber
+export PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}"
+python3 -m meeting_assistant.transcription agenda "$STREAM_TYPE" "${@:2}"
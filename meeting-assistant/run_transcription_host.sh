@@ -0,0 +1,19 @@
+#!/bin/bash
+
+# Wrapper script to run every stream in one transcription host process
+# Example: ./run_transcription_host.sh --stream mic=unix:/tmp/remi_mic.sock --stream system=unix:/tmp/remi_system.sock
+
+SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
+
+# Load .env file if it exists
+if [ -f "$SCRIPT_DIR/.env" ]; then
+    export $(grep -v '^#' "$SCRIPT_DIR/.env" | xargs)
+fi
+
+# Activate virtual environment if it exists
+if [ -d "$SCRIPT_DIR/venv" ]; then
+    source "$SCRIPT_DIR/venv/bin/activate"
+fi
+
+export PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}"
+python3 -m meeting_assistant.transcription host "$@"
@@ -16,4 +16,6 @@ if [ -d "$SCRIPT_DIR/venv" ]; then
 fi
 
 # Run the Realtime API transcription script
-python3 "$SCRIPT_DIR/transcribe_realtime.py" "$STREAM_TYPE"
+# Extra args (e.g. --format s16le) are passed through to the transcriber
+export PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}"
+python3 -m meeting_assistant.transcription realtime "$STREAM_TYPE" "${@:2}"
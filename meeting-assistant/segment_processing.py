@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Audio clean-up and transcript filtering shared by the chunked transcribers
+"""
+
+import numpy as np
+
+# Whisper likes to "hear" the prompt-ish intro on near-silent audio
+HALLUCINATION_PREFIXES = ("This is a meeting",)
+
+
+def normalize(audio_array):
+    """Scale to peak 1.0 (no-op for all-zero audio)"""
+    peak = np.max(np.abs(audio_array)) if len(audio_array) else 0
+    if peak > 0:
+        return audio_array / peak
+    return audio_array
+
+
+def prepare_segment(audio_array, suppressor):
+    """Noise reduction + normalization before a segment goes to an engine
+
+    suppressor is the stream's own SpectralNoiseSuppressor (its noise profile persists across calls).
+    """
+    return normalize(suppressor.process(audio_array))
+
+
+def filter_transcript(text, hallucination_filter):
+    """Return (text, reason): text is None if the transcript should be dropped
+
+    hallucination_filter is the stream's own HallucinationFilter, so one stream's
+    recent-chunk window never suppresses another's lines.
+
+    reason is "empty", "hallucination", "repetitive" (loops within the chunk)
+    or "duplicate" (repeats a recent chunk).
+    """
+    text = (text or "").strip()
+    if not text:
+        return None, "empty"
+    if text.startswith(HALLUCINATION_PREFIXES):
+        return None, "hallucination"
+    reason = hallucination_filter.check(text)
+    if reason:
+        return None, reason
+    return text, None
+
+
+def filter_summary(hallucination_filter):
+    """Drop counts for the log, e.g. at the end of a session"""
+    return hallucination_filter.summary()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Bounded segment queue between capture and transcription
+The reader never waits on it: when the transcription API falls behind, an
+overload policy keeps the backlog within budget instead of letting stdin fill up
+
+Policies (--overload-policy / $REMI_OVERLOAD_POLICY):
+    drop-silence   trim pauses out of the oldest queued segments, then drop the oldest ones
+    downsample     hold the oldest queued segments at half rate (speech band only), then drop
+    spill          move the oldest queued segments to disk, then drop once the disk budget is used
+"""
+
+import os
+import asyncio
+import tempfile
+from collections import deque
+import numpy as np
+from audio_frames import parse_flag
+from resample import PolyphaseResampler
+from vad import frame_rms
+
+POLICIES = ("drop-silence", "downsample", "spill")
+
+
+def trim_silence(audio, sample_rate, frame_ms=30, threshold=0.008, noise_ratio=3.0, keep_ms=150):
+    """Drop frames more than keep_ms away from speech; returns the (possibly shorter) audio"""
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame_len
+    if n_frames < 3:
+        return audio
+    levels = frame_rms(audio[:n_frames * frame_len].reshape(n_frames, frame_len))
+    floor = np.percentile(levels, 20)
+    voiced = levels > max(threshold, floor * noise_ratio)
+    if not voiced.any():
+        # Nothing stands out from the floor: all silence, or sound without a single pause
+        return audio if floor > threshold else audio[:0]
+    # Keep a little context on both sides of every voiced run
+    keep_frames = max(1, int(keep_ms / frame_ms))
+    keep = np.convolve(voiced, np.ones(2 * keep_frames + 1), mode="same") > 0
+    if keep.all():
+        return audio
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)[keep].reshape(-1)
+    if keep[-1]:
+        frames = np.concatenate((frames, audio[n_frames * frame_len:]))
+    return frames
+
+
+class _Entry:
+    """A queued segment plus how it is currently held"""
+
+    __slots__ = ("segment", "seconds", "length", "trimmed", "downsampled", "spill_path")
+
+    def __init__(self, segment, sample_rate):
+        self.segment = segment
+        self.length = len(segment.audio)    # samples at the stream rate
+        self.seconds = self.length / sample_rate
+        self.trimmed = False
+        self.downsampled = False
+        self.spill_path = None
+
+
+class OverloadQueue:
+    """FIFO of speech segments with a memory budget and an overload policy
+
+    put_nowait() always returns immediately; on_drop(segment) is called for
+    every segment the policy gives up on. max_buffered_s bounds the audio
+    held in memory (in seconds at the stream rate); max_spill_s bounds what the
+    spill policy may keep on disk. get() hands segments back at full rate.
+    """
+
+    def __init__(self, policy="drop-silence", sample_rate=16000, max_buffered_s=30.0,
+                 spill_dir=None, max_spill_s=600.0, on_drop=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.max_buffered_samples = int(max_buffered_s * sample_rate)
+        self.max_spill_samples = int(max_spill_s * sample_rate)
+        self.spill_dir = spill_dir
+        self.on_drop = on_drop
+        self._spill_path = None
+        self._entries = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._buffered = 0      # samples held in memory
+        self._spilled = 0       # samples held on disk
+        self._down = PolyphaseResampler(sample_rate, sample_rate // 2)
+        self._up = PolyphaseResampler(sample_rate // 2, sample_rate)
+        self.peak_depth = 0
+        self.dropped = 0
+        self.dropped_s = 0.0
+        self.silent = 0         # segments with nothing left once their silence was trimmed
+        self.trimmed_s = 0.0
+        self.downsampled = 0
+        self.spilled = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def queued_s(self):
+        """Seconds of audio waiting to be transcribed"""
+        return sum(entry.seconds for entry in self._entries)
+
+    def put_nowait(self, segment):
+        entry = _Entry(segment, self.sample_rate)
+        self._entries.append(entry)
+        self._buffered += len(segment.audio)
+        self._enforce_budget()
+        self.peak_depth = max(self.peak_depth, len(self._entries))
+        self._ready.set()
+
+    async def get(self):
+        """Next segment in order, or None once the queue is closed and empty"""
+        while not self._entries:
+            if self._closed:
+                self._remove_spill_dir()
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        entry = self._entries.popleft()
+        return self._restore(entry)
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    def _remove_spill_dir(self):
+        if self._spill_path is not None:
+            try:
+                os.rmdir(self._spill_path)
+            except OSError:
+                pass
+            self._spill_path = None
+
+    # --- overload handling -------------------------------------------------
+
+    def _enforce_budget(self):
+        if self._buffered <= self.max_buffered_samples:
+            return
+        relieve = {"drop-silence": self._trim, "downsample": self._downsample, "spill": self._spill}[self.policy]
+        while True:
+            # Oldest first: it is the audio least likely to still matter to the conversation
+            for entry in list(self._entries):
+                if self._buffered <= self.max_buffered_samples:
+                    return
+                relieve(entry)
+                if entry.length == 0:
+                    self._drop_silent(entry)
+            if self._buffered <= self.max_buffered_samples or not self._entries:
+                return
+            # Dropping the oldest may also free disk budget for the next spill
+            self._drop_oldest()
+
+    def _trim(self, entry):
+        if entry.trimmed:
+            return
+        entry.trimmed = True
+        audio = entry.segment.audio
+        trimmed = trim_silence(audio, self.sample_rate)
+        removed = len(audio) - len(trimmed)
+        if removed:
+            entry.segment.audio = trimmed
+            entry.length = len(trimmed)
+            entry.seconds = entry.length / self.sample_rate
+            self._buffered -= removed
+            self.trimmed_s += removed / self.sample_rate
+
+    def _drop_silent(self, entry):
+        """Nothing but silence: not worth a request (engines tend to hallucinate on it)"""
+        self._entries.remove(entry)
+        self.silent += 1
+        if self.on_drop is not None:
+            self.on_drop(entry.segment)
+
+    def _downsample(self, entry):
+        if entry.downsampled or entry.spill_path:
+            return
+        audio = entry.segment.audio
+        # Whole-buffer resample: delay-compensated, so the end of the segment survives
+        entry.segment.audio = self._down.process_buffer(audio)
+        entry.downsampled = True
+        self._buffered -= len(audio) - len(entry.segment.audio)
+        self.downsampled += 1
+
+    def _spill(self, entry):
+        if entry.spill_path:
+            return
+        size = len(entry.segment.audio)
+        if self._spilled + size > self.max_spill_samples:
+            return
+        if self._spill_path is None:
+            # A directory of its own, so streams sharing --spill-dir never collide
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            self._spill_path = tempfile.mkdtemp(prefix="remi-spill-", dir=self.spill_dir or None)
+        path = os.path.join(self._spill_path, f"segment_{entry.segment.index:06d}.npy")
+        np.save(path, entry.segment.audio)
+        entry.segment.audio = None
+        entry.spill_path = path
+        self._buffered -= size
+        self._spilled += size
+        self.spilled += 1
+
+    def _drop_oldest(self):
+        entry = self._entries.popleft()
+        self._release(entry)
+        self.dropped += 1
+        self.dropped_s += entry.seconds
+        if self.on_drop is not None:
+            self.on_drop(entry.segment)
+
+    def _release(self, entry):
+        if entry.spill_path:
+            self._spilled -= entry.length
+            try:
+                os.unlink(entry.spill_path)
+            except OSError:
+                pass
+            entry.spill_path = None
+        else:
+            self._buffered -= len(entry.segment.audio)
+
+    def _restore(self, entry):
+        """Bring a segment back to full rate in memory"""
+        segment = entry.segment
+        if entry.spill_path:
+            audio = np.load(entry.spill_path)
+            self._release(entry)
+            segment.audio = audio
+            return segment
+        self._release(entry)
+        if entry.downsampled:
+            segment.audio = self._up.process_buffer(segment.audio)[:entry.length]
+        return segment
+
+    def stats(self):
+        return {
+            "policy": self.policy,
+            "depth": len(self._entries),
+            "queuedSeconds": round(self.queued_s, 1),
+            "peakDepth": self.peak_depth,
+            "dropped": self.dropped,
+            "droppedSeconds": round(self.dropped_s, 1),
+            "silentDropped": self.silent,
+            "trimmedSeconds": round(self.trimmed_s, 1),
+            "downsampled": self.downsampled,
+            "spilled": self.spilled,
+        }
+
+    def summary(self):
+        line = f"peak {self.peak_depth} queued, {self.dropped} dropped ({self.dropped_s:.1f}s)"
+        if self.policy == "drop-silence":
+            return line + f", {self.trimmed_s:.1f}s of silence trimmed, {self.silent} all-silent segments skipped"
+        if self.policy == "downsample":
+            return line + f", {self.downsampled} downsampled"
+        return line + f", {self.spilled} spilled to disk"
+
+
+def parse_overload_args(argv):
+    """OverloadQueue keyword arguments from --overload-policy / --max-buffered-s / --spill-dir"""
+    policy = parse_flag(argv, "overload-policy", os.environ.get("REMI_OVERLOAD_POLICY", "drop-silence")).lower()
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown overload policy '{policy}' (expected one of {', '.join(POLICIES)})")
+    return {
+        "policy": policy,
+        "max_buffered_s": float(parse_flag(argv, "max-buffered-s", os.environ.get("REMI_MAX_BUFFERED_S", "30"))),
+        "spill_dir": parse_flag(argv, "spill-dir", os.environ.get("REMI_SPILL_DIR")),
+    }
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Live transcript upload in time-windowed batches
+Transcript lines go to the meeting_segments table (keyed by session, stream and start
+offset, see backend/core/transcript_store.py) while the meeting is running, so the end of
+the meeting only has to (re)build the session's one meeting_notes row from them
+"""
+
+import sys
+import importlib
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+def _backend():
+    """The transcript_store module; raises if Supabase isn't configured"""
+    sys.path.append(str(Path(__file__).parent.parent))
+    # Fails fast without SUPABASE_URL / SUPABASE_KEY (transcript_store connects lazily)
+    importlib.import_module("backend.core.supabase_client")
+    from backend.core import transcript_store
+    return transcript_store
+
+
+class SegmentUploader:
+    """Uploads transcript lines from a background thread every window_s
+
+    add() only queues a row. Each window everything queued (up to max_batch rows)
+    goes out as one insert; a failed batch stays queued and is retried with the
+    next window, so the local NDJSON file remains the source of truth. close()
+    sends the rest and writes the session's meeting_notes row, shared with the
+    other streams of the meeting (same session_id).
+    """
+
+    def __init__(self, session_id, stream, window_s=10.0, max_batch=200, max_pending=10000,
+                 backend=None, log=print):
+        self.session_id = session_id
+        self.stream = stream
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.log = log
+        self._backend = backend     # transcript_store module; loaded on the thread if None
+        self._meeting_start = None
+        self._pending = []          # (record, seq), turned into rows on the uploader thread
+        self._cond = threading.Condition()
+        self._closed = False
+        self.disabled = False
+        self.first_ts = None
+        self.last_ts = None
+        self.speakers = set()
+        # Counters
+        self.uploaded = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.note_id = None
+        self._thread = threading.Thread(target=self._run, name="segment-uploader", daemon=True)
+        self._thread.start()
+
+    def add(self, record, seq):
+        """Queue one transcript record ({"ts", "stream", "speaker", "text"}) as segment seq"""
+        record = dict(record, stream=record.get("stream", self.stream))
+        with self._cond:
+            if self._closed or self.disabled:
+                return
+            if self.first_ts is None:
+                self.first_ts = record["ts"]
+            self.last_ts = record["ts"]
+            self.speakers.add(record.get("speaker"))
+            self._pending.append((record, seq))
+            if len(self._pending) > self.max_pending:
+                # Supabase has been unreachable for a long time: keep the newest rows
+                del self._pending[0]
+                self.dropped += 1
+
+    def _load_backend(self):
+        if self._backend is None:
+            try:
+                self._backend = _backend()
+            except Exception as e:
+                self.log(f"⚠️ Live transcript upload disabled: {e}")
+                with self._cond:
+                    self.disabled = True
+                    self._pending = []
+                return False
+        return True
+
+    def _send(self, batch):
+        store = self._backend
+        if self._meeting_start is None:
+            # Custom session ids carry no start time: offsets count from the first line
+            self._meeting_start = store.session_start(self.session_id) or datetime.fromisoformat(batch[0][0]["ts"])
+        rows = [store.segment_row(self.session_id, self._meeting_start, record, seq) for record, seq in batch]
+        if store.upsert_segments(rows) is None:
+            self.failures += 1
+            return False
+        self.uploaded += len(batch)
+        self.batches += 1
+        return True
+
+    def _run(self):
+        if not self._load_backend():
+            return
+        deadline = time.monotonic() + self.window_s
+        while True:
+            with self._cond:
+                while not self._closed and time.monotonic() < deadline:
+                    self._cond.wait(timeout=max(0.0, deadline - time.monotonic()))
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                closed = self._closed
+            sent = bool(batch) and self._send(batch)
+            with self._cond:
+                if batch and not sent:
+                    # Back in front of whatever add() queued meanwhile, to be retried
+                    self._pending[:0] = batch
+                backlog = bool(self._pending)
+            if sent and backlog and not closed:
+                continue        # a backlog goes out without waiting for the next window
+            if batch and not sent and closed:
+                return          # don't keep retrying a failing upload at shutdown
+            if closed and not backlog:
+                return
+            deadline = time.monotonic() + self.window_s
+
+    def close(self):
+        """Send what is still queued and (re)build the session's meeting_notes row from its segments"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        if self.disabled or self.first_ts is None:
+            return
+        # Whichever stream closes last sees the whole meeting
+        self.note_id = self._backend.finalize_session(self.session_id)
+
+    def summary(self):
+        if self.disabled:
+            return "disabled"
+        line = f"{self.uploaded} segments in {self.batches} batches"
+        if self.failures:
+            line += f", {self.failures} failed attempts"
+        if self._pending or self.dropped:
+            line += f", {len(self._pending) + self.dropped} not uploaded (run push_transcripts.py)"
+        if self.note_id is not None:
+            line += f", note {self.note_id}"
+        return line
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Process startup timing
+The transcription CLI stamps $REMI_LAUNCHED_AT as its first action; scripts started
+directly fall back to the moment this module was imported
+"""
+
+import os
+import time
+
+LAUNCHED_AT_ENV_VAR = "REMI_LAUNCHED_AT"
+_IMPORTED_AT = time.time()
+
+
+def startup_ms():
+    """Milliseconds since launch, for the "Ready to transcribe" log line"""
+    launched = float(os.environ.get(LAUNCHED_AT_ENV_VAR, _IMPORTED_AT))
+    return (time.time() - launched) * 1000
@@ -30,7 +30,7 @@ CONVERSATION = [
 ]
 
 
-async def test_agenda_tracker():
+async def simulate_meeting():
     """Send simulated conversation to agenda tracker"""
     uri = "ws://localhost:8765"
     
@@ -129,4 +129,4 @@ async def test_agenda_tracker():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_agenda_tracker())
+    asyncio.run(simulate_meeting())
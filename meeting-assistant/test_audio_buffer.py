@@ -0,0 +1,35 @@
+"""Tests for AudioRingBuffer"""
+
+import numpy as np
+import pytest
+from audio_buffer import AudioRingBuffer
+
+
+def test_windows_are_contiguous_across_the_wrap():
+    buffer = AudioRingBuffer(8)
+    buffer.write(np.arange(6))
+    buffer.consume(5)
+    buffer.write(np.arange(6, 12))
+    window = buffer.peek(7)
+    np.testing.assert_array_equal(window, np.arange(5, 12))
+    assert window.base is not None  # a view, not a copy
+
+
+def test_overflow_drops_the_oldest_samples():
+    buffer = AudioRingBuffer(4)
+    buffer.write(np.arange(6))
+    assert len(buffer) == 4 and buffer.dropped == 2
+    np.testing.assert_array_equal(buffer.peek(4), [2, 3, 4, 5])
+
+
+def test_overlapping_windows():
+    buffer = AudioRingBuffer(16)
+    buffer.write(np.arange(10))
+    starts = [int(window[0]) for window in buffer.windows(4, hop=2)]
+    assert starts == [0, 2, 4, 6]
+    assert len(buffer) == 2
+
+
+def test_invalid_window_is_rejected():
+    with pytest.raises(ValueError):
+        list(AudioRingBuffer(4).windows(5))
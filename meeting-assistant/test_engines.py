@@ -0,0 +1,53 @@
+"""Tests for engine selection: --engine, the per-stream and global env vars, and create_engine"""
+
+import sys
+import pytest
+
+import engines
+
+
+@pytest.fixture(autouse=True)
+def no_engine_env(monkeypatch):
+    for var in ("REMI_ENGINE", "REMI_ENGINE_MIC", "REMI_ENGINE_SYSTEM"):
+        monkeypatch.delenv(var, raising=False)
+
+
+def test_default_engine():
+    assert engines.parse_engine_arg(["transcribe.py", "mic"], "mic") == "whisper-api"
+    assert engines.parse_engine_arg(["transcribe.py", "mic"], "mic", default="realtime") == "realtime"
+
+
+def test_flag_beats_stream_env_beats_global_env(monkeypatch):
+    monkeypatch.setenv("REMI_ENGINE", "stub")
+    assert engines.parse_engine_arg(["transcribe.py", "mic"], "mic") == "stub"
+    monkeypatch.setenv("REMI_ENGINE_SYSTEM", "local")
+    assert engines.parse_engine_arg(["transcribe.py", "system"], "system") == "local"
+    # Only the named stream is affected
+    assert engines.parse_engine_arg(["transcribe.py", "mic"], "mic") == "stub"
+    assert engines.parse_engine_arg(["transcribe.py", "system", "--engine", "Whisper-API"], "system") == "whisper-api"
+    assert engines.parse_engine_arg(["transcribe.py", "system", "--engine=stub"], "system") == "stub"
+
+
+def test_unknown_engine_is_rejected(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown engine 'nope'"):
+        engines.parse_engine_arg(["transcribe.py", "mic", "--engine", "nope"], "mic")
+    monkeypatch.setenv("REMI_ENGINE_MIC", "nope")
+    with pytest.raises(ValueError):
+        engines.parse_engine_arg(["transcribe.py", "mic"], "mic")
+    with pytest.raises(ValueError):
+        engines.create_engine("nope")
+
+
+def test_create_engine_passes_options():
+    engine = engines.create_engine("stub", latency_ms=0, lines=["hello"])
+    assert isinstance(engine, engines.StubEngine)
+    assert engine.transcribe([0.0] * 16000) == "hello"
+    realtime = engines.create_engine("realtime", transcription_only=True, api_key="test")
+    assert realtime.streaming and realtime.sample_rate == 24000
+    assert realtime.url == engines.RealtimeAPIEngine.TRANSCRIPTION_URL
+
+
+def test_local_engine_without_faster_whisper(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", None)
+    with pytest.raises(RuntimeError, match="faster-whisper"):
+        engines.create_engine("local")
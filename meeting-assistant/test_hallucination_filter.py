@@ -0,0 +1,31 @@
+"""Tests for HallucinationFilter"""
+
+from hallucination_filter import HallucinationFilter
+
+
+def test_repeated_chunk_is_a_duplicate():
+    hallucinations = HallucinationFilter()
+    text = "let's move the launch to the second week of March"
+    assert hallucinations.check(text) is None
+    assert hallucinations.check(text) == "duplicate"
+
+
+def test_short_chunks_are_never_duplicates():
+    hallucinations = HallucinationFilter()
+    assert hallucinations.check("Okay.") is None
+    assert hallucinations.check("Okay.") is None
+
+
+def test_looping_chunk_is_repetitive():
+    hallucinations = HallucinationFilter()
+    assert hallucinations.check("thank you for watching " * 12) == "repetitive"
+
+
+def test_window_forgets_old_chunks():
+    hallucinations = HallucinationFilter(window_chunks=2)
+    text = "we agreed the budget stays at one hundred and fifty thousand"
+    assert hallucinations.check(text) is None
+    assert hallucinations.check("next item is hiring for the mobile team this quarter") is None
+    assert hallucinations.check("then the dashboard timeline which slipped by two weeks") is None
+    assert hallucinations.check(text) is None
+    assert "1/4" not in hallucinations.summary()
@@ -0,0 +1,95 @@
+"""Tests for Resequencer and in-order delivery in TranscriptionPipeline"""
+
+import asyncio
+import random
+import time
+import numpy as np
+from pipeline import Resequencer, TranscriptionPipeline
+from vad import SpeechSegment
+
+
+def test_resequencer_releases_results_in_index_order():
+    resequencer = Resequencer()
+    assert resequencer.add(1, "b") == []
+    assert resequencer.add(2, "c") == []
+    assert resequencer.waiting == 2
+    assert resequencer.add(0, "a") == [(0, "a"), (1, "b"), (2, "c")]
+    assert resequencer.waiting == 0
+
+
+def test_resequencer_skip_unblocks_later_results():
+    resequencer = Resequencer()
+    assert resequencer.add(1, "b") == []
+    resequencer.skip(0)
+    assert resequencer.add(2, "c") == [(0, None), (1, "b"), (2, "c")]
+
+
+def test_pipeline_delivers_in_segment_order():
+    delivered = []
+
+    def transcribe(segment):
+        time.sleep(random.uniform(0, 0.02))  # requests finish out of order
+        return f"text {segment.index}"
+
+    async def deliver(segment, text):
+        delivered.append((segment.index, text))
+
+    async def run():
+        pipeline = TranscriptionPipeline(transcribe, deliver, max_in_flight=4, log=lambda message: None)
+        pipeline.start()
+        for i in range(20):
+            await pipeline.submit(SpeechSegment(i, i * 1600, np.zeros(1600, dtype=np.float32)))
+        await pipeline.close()
+        return pipeline.stats()
+
+    stats = asyncio.run(run())
+    assert delivered == [(i, f"text {i}") for i in range(20)]
+    assert stats["completed"] == 20 and stats["failed"] == 0
+
+
+def test_pipeline_failure_does_not_block_later_segments():
+    delivered = []
+
+    def transcribe(segment):
+        if segment.index == 1:
+            raise RuntimeError("API error")
+        return f"text {segment.index}"
+
+    async def deliver(segment, text):
+        delivered.append(segment.index)
+
+    async def run():
+        pipeline = TranscriptionPipeline(transcribe, deliver, max_in_flight=2, log=lambda message: None)
+        pipeline.start()
+        for i in range(4):
+            await pipeline.submit(SpeechSegment(i, 0, np.zeros(1600, dtype=np.float32)))
+        await pipeline.close()
+        return pipeline.stats()
+
+    stats = asyncio.run(run())
+    assert delivered == [0, 2, 3]
+    assert stats["failed"] == 1
+
+
+def test_idle_pipeline_reports_nothing_at_close():
+    reports = []
+
+    async def report(stats):
+        reports.append(stats)
+
+    async def run(segments):
+        pipeline = TranscriptionPipeline(lambda segment: "text", deliver_nothing, log=lambda message: None,
+                                         report=report)
+        pipeline.start()
+        for i in range(segments):
+            await pipeline.submit(SpeechSegment(i, 0, np.zeros(1600, dtype=np.float32)))
+        await pipeline.close()
+
+    asyncio.run(run(0))
+    assert reports == []
+    asyncio.run(run(2))
+    assert len(reports) == 1 and reports[0]["completed"] == 2
+
+
+async def deliver_nothing(segment, text):
+    pass
@@ -0,0 +1,125 @@
+"""Tests for StreamCursor and session grouping in push_transcripts"""
+
+import json
+import os
+from push_transcripts import StreamCursor, find_session_files, stream_start
+
+
+def write_lines(path, texts, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        for text in texts:
+            f.write(json.dumps({"ts": "2026-01-01T10:00:00", "speaker": "You", "text": text}) + "\n")
+
+
+def read_all(cursor):
+    return [(seq, record["text"]) for seq, record in cursor.lines()]
+
+
+def test_first_read_returns_every_line(tmp_path):
+    path = tmp_path / "20260101T100000_mic_aa.ndjson"
+    write_lines(path, ["a", "b"])
+    cursor = StreamCursor(path, None)
+    assert read_all(cursor) == [(0, "a"), (1, "b")]
+    entry = cursor.manifest_entry()
+    assert entry["offset"] == path.stat().st_size and entry["lines"] == 2
+
+
+def test_unchanged_file_is_not_read(tmp_path):
+    path = tmp_path / "20260101T100000_mic_aa.ndjson"
+    write_lines(path, ["a"])
+    cursor = StreamCursor(path, None)
+    read_all(cursor)
+    again = StreamCursor(path, cursor.manifest_entry())
+    assert again.unchanged and read_all(again) == []
+
+
+def test_appended_lines_continue_from_the_pushed_offset(tmp_path):
+    path = tmp_path / "20260101T100000_mic_aa.ndjson"
+    write_lines(path, ["a", "b"])
+    cursor = StreamCursor(path, None)
+    read_all(cursor)
+    entry = cursor.manifest_entry()
+    write_lines(path, ["c"])
+    again = StreamCursor(path, entry)
+    assert not again.rewritten
+    assert read_all(again) == [(2, "c")]
+
+
+def test_lines_appended_during_a_run_are_not_skipped(tmp_path):
+    path = tmp_path / "20260101T100000_mic_aa.ndjson"
+    write_lines(path, ["a"])
+    cursor = StreamCursor(path, None)
+    read_all(cursor)
+    write_lines(path, ["b"])  # the transcriber is still writing
+    again = StreamCursor(path, cursor.manifest_entry())
+    assert not again.unchanged
+    assert read_all(again) == [(1, "b")]
+
+
+def test_partial_line_waits_for_the_next_run(tmp_path):
+    path = tmp_path / "20260101T100000_mic_aa.ndjson"
+    write_lines(path, ["a"])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"ts": "2026-01-01T10:00:01", "text": "half')
+    cursor = StreamCursor(path, None)
+    assert read_all(cursor) == [(0, "a")]
+    assert cursor.manifest_entry()["lines"] == 1
+
+
+def test_rewritten_file_is_detected(tmp_path):
+    path = tmp_path / "20260101T100000_mic_aa.ndjson"
+    write_lines(path, ["a", "b"])
+    cursor = StreamCursor(path, None)
+    read_all(cursor)
+    entry = cursor.manifest_entry()
+    write_lines(path, ["x", "b", "c"], mode="w")
+    again = StreamCursor(path, entry)
+    assert again.rewritten
+    again.restart()
+    assert read_all(again) == [(0, "x"), (1, "b"), (2, "c")]
+
+
+def test_truncated_file_is_detected(tmp_path):
+    path = tmp_path / "20260101T100000_mic_aa.ndjson"
+    write_lines(path, ["a", "b"])
+    cursor = StreamCursor(path, None)
+    read_all(cursor)
+    entry = cursor.manifest_entry()
+    write_lines(path, ["a"], mode="w")
+    assert StreamCursor(path, entry).rewritten
+
+
+def test_entry_without_line_count_is_read_again_from_the_start(tmp_path):
+    path = tmp_path / "20260101T100000_mic_aa.ndjson"
+    write_lines(path, ["a"])
+    cursor = StreamCursor(path, None)
+    read_all(cursor)
+    entry = dict(cursor.manifest_entry())
+    del entry["lines"]
+    write_lines(path, ["b"])
+    again = StreamCursor(path, entry)
+    assert not again.rewritten
+    assert read_all(again) == [(0, "a"), (1, "b")]
+
+
+def test_sessions_are_grouped_by_session_id_then_by_time(tmp_path):
+    names = [
+        "20260101T100000_mic_aa--S1.ndjson",
+        "20260101T103000_system_bb--S1.ndjson",
+        "20260101T100001_mic_cc--S2.ndjson",
+        "20250101T100000_mic_x.ndjson",
+        "20250101T100100_system_y.ndjson",
+        "20250102T100000_mic_z.ndjson",
+    ]
+    for name in names:
+        path = tmp_path / name
+        write_lines(path, ["a"])
+        written = stream_start(path).timestamp() + 60
+        os.utime(path, (written, written))
+    sessions = {session: sorted(f.name for f in files) for session, files in find_session_files(tmp_path).items()}
+    assert sessions == {
+        "S1": ["20260101T100000_mic_aa--S1.ndjson", "20260101T103000_system_bb--S1.ndjson"],
+        "S2": ["20260101T100001_mic_cc--S2.ndjson"],
+        "20250101T100000": ["20250101T100000_mic_x.ndjson", "20250101T100100_system_y.ndjson"],
+        "20250102T100000": ["20250102T100000_mic_z.ndjson"],
+    }
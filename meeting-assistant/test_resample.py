@@ -0,0 +1,38 @@
+"""Tests for PolyphaseResampler"""
+
+import numpy as np
+from resample import PolyphaseResampler, downmix
+
+
+def tone(rate, seconds=0.5, freq=440):
+    t = np.arange(int(rate * seconds)) / rate
+    return np.sin(2 * np.pi * freq * t).astype(np.float32)
+
+
+def test_block_size_does_not_change_the_output():
+    samples = tone(48000)
+    whole = PolyphaseResampler(48000, 16000).process(samples)
+    streamed = PolyphaseResampler(48000, 16000)
+    blocks = np.concatenate([streamed.process(samples[i:i + 997]) for i in range(0, len(samples), 997)])
+    np.testing.assert_allclose(blocks, whole, atol=1e-5)
+
+
+def test_process_buffer_keeps_length_and_timing():
+    samples = tone(16000)
+    down = PolyphaseResampler(16000, 8000).process_buffer(samples)
+    assert len(down) == len(samples) // 2
+    # Delay-compensated: output n lines up with input 2n (within the filter's half-sample centre)
+    reference = samples[::2]
+    interior = np.arange(50, len(down) - 50)
+    errors = {shift: np.abs(down[interior] - reference[interior + shift]).max() for shift in (-1, 0, 1)}
+    assert min(errors, key=errors.get) == 0
+    assert errors[0] < 0.1
+
+
+def test_process_buffer_rounds_odd_lengths_up():
+    assert len(PolyphaseResampler(16000, 8000).process_buffer(np.zeros(101, dtype=np.float32))) == 51
+    assert len(PolyphaseResampler(8000, 16000).process_buffer(np.zeros(51, dtype=np.float32))) == 102
+
+
+def test_downmix_averages_channels():
+    np.testing.assert_array_equal(downmix([1.0, 3.0, -1.0, 1.0], 2), [2.0, 0.0])
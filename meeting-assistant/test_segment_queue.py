@@ -0,0 +1,87 @@
+"""Tests for OverloadQueue and its overload policies"""
+
+import asyncio
+import numpy as np
+from segment_queue import OverloadQueue, trim_silence
+from vad import SpeechSegment
+
+RATE = 16000
+
+
+def speech(index, seconds=0.6):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return SpeechSegment(index, 0, (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32))
+
+
+def silence(index, seconds=0.6):
+    return SpeechSegment(index, 0, np.zeros(int(seconds * RATE), dtype=np.float32))
+
+
+def drain(queue):
+    async def collect():
+        queue.close()
+        segments = []
+        while (segment := await queue.get()) is not None:
+            segments.append(segment)
+        return segments
+    return asyncio.run(collect())
+
+
+def test_segments_come_back_in_order():
+    queue = OverloadQueue(sample_rate=RATE)
+    for i in range(3):
+        queue.put_nowait(speech(i))
+    assert [segment.index for segment in drain(queue)] == [0, 1, 2]
+
+
+def test_trim_silence_keeps_speech_and_empties_silence():
+    assert len(trim_silence(speech(0).audio, RATE)) == int(0.6 * RATE)
+    assert len(trim_silence(silence(0).audio, RATE)) == 0
+
+
+def test_all_silent_segment_is_dropped_and_counted():
+    dropped = []
+    queue = OverloadQueue(sample_rate=RATE, max_buffered_s=1.0, on_drop=lambda s: dropped.append(s.index))
+    queue.put_nowait(silence(0))
+    queue.put_nowait(speech(1))
+    assert dropped == [0]
+    stats = queue.stats()
+    assert stats["silentDropped"] == 1 and stats["dropped"] == 0
+    assert "1 all-silent segments skipped" in queue.summary()
+    assert [segment.index for segment in drain(queue)] == [1]
+
+
+def test_oldest_segments_are_dropped_when_nothing_else_helps():
+    dropped = []
+    queue = OverloadQueue(sample_rate=RATE, max_buffered_s=1.0, on_drop=lambda s: dropped.append(s.index))
+    for i in range(3):
+        queue.put_nowait(speech(i))
+    assert dropped == [0, 1]
+    assert queue.stats()["dropped"] == 2
+    assert [segment.index for segment in drain(queue)] == [2]
+
+
+def test_downsampled_segment_is_restored_to_full_length():
+    queue = OverloadQueue(policy="downsample", sample_rate=RATE, max_buffered_s=1.0)
+    original = speech(0)
+    reference = original.audio.copy()
+    queue.put_nowait(original)
+    queue.put_nowait(speech(1))
+    assert queue.stats()["downsampled"] == 1
+    restored = drain(queue)[0].audio
+    assert len(restored) == len(reference)
+    # A 440 Hz tone is well inside the band kept at half rate
+    rms = np.sqrt(np.mean(restored ** 2)) / np.sqrt(np.mean(reference ** 2))
+    assert 0.9 < rms < 1.1
+
+
+def test_spilled_segment_is_restored_and_spill_dir_removed(tmp_path):
+    queue = OverloadQueue(policy="spill", sample_rate=RATE, max_buffered_s=1.0, spill_dir=str(tmp_path))
+    first = speech(0)
+    reference = first.audio.copy()
+    queue.put_nowait(first)
+    queue.put_nowait(speech(1))
+    assert queue.stats()["spilled"] == 1
+    segments = drain(queue)
+    np.testing.assert_array_equal(segments[0].audio, reference)
+    assert list(tmp_path.iterdir()) == []
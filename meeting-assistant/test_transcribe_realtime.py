@@ -0,0 +1,122 @@
+"""Tests for transcribe_realtime: interim transcripts and replay after a reconnect"""
+
+import asyncio
+import base64
+import importlib
+import json
+import sys
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def realtime(tmp_path_factory):
+    """The script module, imported as a mic stream writing its transcript to a temp dir"""
+    patch = pytest.MonkeyPatch()
+    patch.setattr(sys, "argv", ["transcribe_realtime.py", "mic"])
+    patch.setenv("REMI_TRANSCRIPTS_DIR", str(tmp_path_factory.mktemp("transcripts")))
+    module = importlib.import_module("transcribe_realtime")
+    yield module
+    module.close_transcript_file()
+    patch.undo()
+
+
+class FakeTracker:
+    def __init__(self):
+        self.partials = []
+
+    async def send_partial_transcription(self, speaker, text, item_id):
+        self.partials.append((item_id, text))
+
+
+def test_failed_transcription_withdraws_its_interim_text(realtime, monkeypatch):
+    tracker = FakeTracker()
+    monkeypatch.setattr(realtime, "tracker", tracker)
+    monkeypatch.setattr(realtime, "partials", realtime.PartialTranscripts(min_interval_s=0.001))
+
+    async def run():
+        await realtime.handle_transcript_delta({"item_id": "item_1", "delta": "we should"})
+        await realtime.handle_transcript_failed({"item_id": "item_1", "error": {"message": "timeout"}})
+        # An item that never had interim text has nothing to withdraw
+        await realtime.handle_transcript_failed({"item_id": "item_2"})
+
+    asyncio.run(run())
+    assert tracker.partials == [("item_1", "we should"), ("item_1", "")]
+    assert realtime.partials.finish("item_1") == ""
+
+
+def test_partials_are_rate_limited_per_item(realtime):
+    partials = realtime.PartialTranscripts(min_interval_s=60)
+    assert partials.add("a", "hello") == "hello"
+    assert partials.add("a", " there") is None
+    assert partials.add("b", "hi") == "hi"
+    assert partials.finish("a") == "hello there"
+
+
+class FakeSocket:
+    """Records what was sent: sample counts for appends, "commit" for commits"""
+
+    def __init__(self):
+        self.sent = []
+        self.samples = []
+
+    async def send(self, message):
+        event = json.loads(message)
+        if event["type"] == "input_audio_buffer.append":
+            pcm = np.frombuffer(base64.b64decode(event["audio"]), dtype="<i2")
+            self.sent.append(len(pcm))
+            self.samples.append(pcm)
+        else:
+            self.sent.append("commit")
+
+
+def ramp(start, stop):
+    """Samples that encode their own position, so the replayed range can be checked"""
+    return (np.arange(start, stop) / 1000).astype(np.float32)
+
+
+def test_replay_resumes_from_the_last_transcribed_utterance(realtime):
+    async def run():
+        connection = realtime.RealtimeConnection(engine=None, block_samples=100)
+        connection.ws = FakeSocket()
+        await connection.send_audio(ramp(0, 300))
+        await connection.commit()
+        await connection.send_audio(ramp(300, 500))
+        await connection.commit()
+        await connection.send_audio(ramp(500, 650))
+        connection.track_event({"type": "input_audio_buffer.committed", "item_id": "a"})
+        connection.track_event({"type": "conversation.item.input_audio_transcription.completed", "item_id": "a"})
+        connection.track_event({"type": "input_audio_buffer.committed", "item_id": "b"})
+
+        # The socket dies before "b" is transcribed
+        connection._mark_down()
+        await connection.send_audio(ramp(650, 700))
+        replacement = FakeSocket()
+        await connection._replay_unconfirmed(replacement)
+        return connection, replacement
+
+    connection, replacement = asyncio.run(run())
+    assert connection.confirmed_until == 300
+    # "b" again with its original commit, then the uncommitted tail in blocks
+    assert replacement.sent == [100, 100, "commit", 100, 100]
+    replayed = np.concatenate(replacement.samples) / 32767 * 1000
+    assert np.allclose(replayed, np.arange(300, 700), atol=0.1)
+    assert connection.samples_replayed == 400
+    assert connection.samples_lost == 0
+    assert connection.sent_until == 700
+    assert list(connection._commits) == [500]
+
+
+def test_replay_counts_audio_that_fell_out_of_the_buffer(realtime):
+    async def run():
+        connection = realtime.RealtimeConnection(engine=None, replay_seconds=0.01, block_samples=100)
+        await connection.send_audio(ramp(0, 600))
+        replacement = FakeSocket()
+        await connection._replay_unconfirmed(replacement)
+        return connection, replacement
+
+    connection, replacement = asyncio.run(run())
+    capacity = len(connection.replay)
+    assert connection.samples_lost == 600 - capacity
+    assert sum(replacement.sent) == capacity
+    assert "commit" not in replacement.sent
@@ -0,0 +1,91 @@
+"""Tests for TranscriptWriter, including write failures"""
+
+import errno
+import json
+import time
+from transcript_writer import TranscriptWriter, session_of, transcript_name
+
+
+class FlakyFile:
+    """Wraps the writer's file: the first write is cut short, the next `failures` ones raise ENOSPC"""
+
+    def __init__(self, fh, failures):
+        self._fh = fh
+        self.failures = failures
+        self.partial = True
+
+    def write(self, data):
+        if self.partial:
+            self.partial = False
+            return self._fh.write(data[:10])
+        if self.failures:
+            self.failures -= 1
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return self._fh.write(data)
+
+    def fileno(self):
+        return self._fh.fileno()
+
+    def close(self):
+        self._fh.close()
+
+
+def records(n):
+    return [{"ts": f"2026-01-01T10:00:{i:02d}", "speaker": "You", "text": f"line {i}"} for i in range(n)]
+
+
+def read_lines(path):
+    with open(path, "rb") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def test_lines_and_offsets_match_the_file(tmp_path):
+    path = tmp_path / "t.ndjson"
+    writer = TranscriptWriter(str(path), flush_interval_s=0.01)
+    assert [writer.append(record) for record in records(5)] == [0, 1, 2, 3, 4]
+    writer.close()
+    lines = read_lines(path)
+    assert [json.loads(line) for line in lines] == records(5)
+    assert writer.offsets == [sum(len(line) for line in lines[:i]) for i in range(5)]
+    assert writer.stats()["records"] == 5
+
+
+def test_failed_batch_is_kept_and_retried(tmp_path):
+    path = tmp_path / "t.ndjson"
+    logged = []
+    writer = TranscriptWriter(str(path), flush_interval_s=0.01, log=logged.append)
+    writer._fh = FlakyFile(writer._fh, failures=3)
+    for record in records(3):
+        writer.append(record)
+    time.sleep(0.2)
+    for record in records(5)[3:]:
+        writer.append(record)
+    writer.close()
+
+    lines = read_lines(path)
+    # The partial line from the short write was cut off, nothing was lost or duplicated
+    assert [json.loads(line) for line in lines] == records(5)
+    assert writer.offsets == [sum(len(line) for line in lines[:i]) for i in range(5)]
+    assert writer.stats()["errors"] == 3
+    assert len([message for message in logged if "write failed" in message]) == 1
+    assert len([message for message in logged if "recovered" in message]) == 1
+
+
+def test_unwritable_lines_are_reported_at_close(tmp_path):
+    path = tmp_path / "t.ndjson"
+    logged = []
+    writer = TranscriptWriter(str(path), flush_interval_s=0.01, log=logged.append)
+    writer._fh = FlakyFile(writer._fh, failures=10 ** 6)
+    for record in records(2):
+        writer.append(record)
+    writer.close()
+    assert read_lines(path) == []
+    assert writer.offsets == []
+    assert any("2 transcript lines could not be written" in message for message in logged)
+
+
+def test_session_id_round_trips_through_the_file_name():
+    name = transcript_name("20260101T100000", "mic", "ab12", "team sync/2026--01")
+    assert name.startswith("20260101T100000_mic_ab12--")
+    assert session_of(name) == "team-sync-2026-01"
+    assert session_of("20260101T100000_mic_ab12.ndjson") is None
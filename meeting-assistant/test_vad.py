@@ -0,0 +1,90 @@
+"""Tests for the energy VAD: SpeechSegmenter, SilenceGate and NoiseFloor"""
+
+import numpy as np
+from vad import NoiseFloor, SilenceGate, SpeechSegmenter
+
+RATE = 16000
+
+
+def speech(seconds, rate=RATE):
+    t = np.arange(int(seconds * rate)) / rate
+    # A voiced tone with a syllable-rate envelope
+    return (0.2 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))).astype(np.float32)
+
+
+def silence(seconds, rate=RATE):
+    return (0.001 * np.random.default_rng(0).standard_normal(int(seconds * rate))).astype(np.float32)
+
+
+def segments_of(audio, block=1600):
+    segmenter = SpeechSegmenter(RATE)
+    segments = []
+    for i in range(0, len(audio), block):
+        segments.extend(segmenter.push(audio[i:i + block]))
+    segments.extend(segmenter.flush())
+    return [(segment.start_sample / RATE, len(segment.audio) / RATE) for segment in segments]
+
+
+def test_floor_never_starts_above_the_threshold():
+    floor = NoiseFloor(threshold=0.008)
+    assert floor.is_speech(0.2)
+    assert floor.level == 0.008
+
+
+def test_floor_follows_quiet_input():
+    floor = NoiseFloor(threshold=0.008)
+    for _ in range(20):
+        assert not floor.is_speech(0.001)
+    assert floor.level < 0.002
+
+
+def test_speech_from_the_first_sample_is_a_segment():
+    segments = segments_of(np.concatenate([speech(3), silence(1.5), speech(2), silence(1)]))
+    assert len(segments) == 2
+    start, length = segments[0]
+    assert start == 0 and length >= 3
+
+
+def test_pauses_split_segments():
+    segments = segments_of(np.concatenate([silence(1), speech(2), silence(1.5), speech(2), silence(1)]))
+    assert len(segments) == 2
+    assert 0.5 < segments[0][0] < 1.0
+    assert all(length >= 2 for _start, length in segments)
+
+
+def test_silence_alone_produces_no_segment():
+    assert segments_of(silence(3)) == []
+
+
+def test_long_speech_is_cut_at_max_length():
+    segmenter = SpeechSegmenter(RATE, max_segment_s=2.0)
+    segments = segmenter.push(speech(5)) + segmenter.flush()
+    assert len(segments) == 3
+    # Cut on a frame boundary
+    assert segments[0].forced and len(segments[0].audio) <= 2 * RATE + segmenter.frame_len
+
+
+def gate_actions(gate, audio, block):
+    actions = []
+    for i in range(0, len(audio), block):
+        actions.extend(gate.process(audio[i:i + block]))
+    return actions + gate.flush()
+
+
+def test_gate_sends_speech_from_the_first_chunk():
+    rate = 24000
+    gate = SilenceGate(sample_rate=rate)
+    audio = np.concatenate([speech(3, rate), silence(1.5, rate), speech(2, rate), silence(1, rate)])
+    actions = gate_actions(gate, audio, block=rate // 10)
+    first = actions[0]
+    assert first[0] == "audio"
+    np.testing.assert_array_equal(first[1], audio[:rate // 10])
+    assert [kind for kind, _ in actions].count("commit") == 2
+    # Everything spoken went out; only silence beyond the hangover was held back
+    assert gate.samples_sent >= 5 * rate
+
+
+def test_gate_holds_back_silence():
+    gate = SilenceGate(sample_rate=RATE)
+    assert gate_actions(gate, silence(2), block=RATE // 10) == []
+    assert gate.suppressed_pct == 100.0
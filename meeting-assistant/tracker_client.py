@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+WebSocket client for the agenda tracker (backend/agents/agenda_tracker.py)
+One connection can be shared by every stream running on the same event loop
+"""
+
+import asyncio
+import json
+from datetime import datetime
+
+AGENDA_TRACKER_URL = "ws://localhost:8765"
+
+
+class AgendaTrackerClient:
+    """Lazily connected, auto-reconnecting agenda tracker connection"""
+
+    def __init__(self, url=AGENDA_TRACKER_URL, log=print):
+        self.url = url
+        self.log = log
+        self._ws = None
+        self._lock = asyncio.Lock()
+        self.messages_sent = 0
+        self.send_failures = 0
+
+    async def _connect(self, reconnect=False):
+        import websockets  # imported on first use so it stays off the startup path
+        self._ws = await websockets.connect(self.url)
+        self.log("🔌 Reconnected to agenda tracker" if reconnect else "🔌 Connected to agenda tracker")
+
+    async def send(self, payload):
+        """Send a JSON message; returns False if the tracker is unreachable"""
+        from websockets.exceptions import ConnectionClosed
+        message = json.dumps(payload)
+        # The lock keeps streams from racing to (re)connect or interleaving sends
+        async with self._lock:
+            try:
+                if self._ws is None:
+                    await self._connect()
+                await self._ws.send(message)
+            except ConnectionClosed:
+                # Connection was closed, reconnect and retry once
+                try:
+                    await self._connect(reconnect=True)
+                    await self._ws.send(message)
+                except Exception as retry_error:
+                    self.log(f"⚠️ Could not send to agenda tracker: {retry_error}")
+                    self._ws = None
+                    self.send_failures += 1
+                    return False
+            except Exception as e:
+                self.log(f"⚠️ Could not send to agenda tracker: {e}")
+                self._ws = None
+                self.send_failures += 1
+                return False
+        self.messages_sent += 1
+        return True
+
+    async def send_transcription(self, speaker, text, item_id=None):
+        message = {
+            "type": "transcription",
+            "speaker": speaker,
+            "text": text,
+            "timestamp": datetime.now().isoformat()
+        }
+        if item_id:
+            # Lets the tracker replace the interim text it got for this utterance
+            message["itemId"] = item_id
+        return await self.send(message)
+
+    async def send_partial_transcription(self, speaker, text, item_id):
+        """Interim text for an utterance that is still being spoken ("" withdraws it)"""
+        return await self.send({
+            "type": "partial_transcription",
+            "speaker": speaker,
+            "text": text,
+            "itemId": item_id,
+            "timestamp": datetime.now().isoformat()
+        })
+
+    async def send_status(self, speaker, status):
+        """Transcriber health (queue depth, drops) for one stream"""
+        return await self.send({
+            "type": "transcriber_status",
+            "speaker": speaker,
+            "status": status,
+            "timestamp": datetime.now().isoformat()
+        })
+
+    async def close(self):
+        if self._ws is not None:
+            try:
+                await self._ws.close()
+            except Exception:
+                pass
+            self._ws = None
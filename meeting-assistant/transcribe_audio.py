@@ -1,30 +1,43 @@
 #!/usr/bin/env python3
 """
-Real-time audio transcription using OpenAI Whisper API
+Real-time audio transcription using OpenAI Whisper API or a local Whisper model
 Receives audio chunks via stdin and transcribes them
 Supports separate mic and system audio streams
 """
 
 import sys
 import os
-import numpy as np
 import warnings
 from datetime import datetime
-from openai import OpenAI
-import io
-import wave
+from audio_frames import FrameReader, FrameError, parse_flag, parse_format_arg
+from vad import SpeechSegmenter
+from engines import create_engine, parse_engine_arg
+from startup import startup_ms
+from resample import InputConverter, parse_input_args
+from segment_processing import prepare_segment, filter_transcript, filter_summary
+from noise_suppression import SpectralNoiseSuppressor
+from hallucination_filter import HallucinationFilter
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
 # Get stream type from command line argument
 STREAM_TYPE = sys.argv[1] if len(sys.argv) > 1 else "mic"
 STREAM_ICON = "🎤" if STREAM_TYPE == "mic" else "🔊"
 STREAM_LABEL = "You" if STREAM_TYPE == "mic" else "Other"
 
+# Wire format sent by the capture side: csv (default), f32le or s16le
+AUDIO_FORMAT = parse_format_arg(sys.argv[2:])
+
+# Capture rate/channels (--input-rate / --channels), converted to the engine's rate
+INPUT_SAMPLE_RATE, INPUT_CHANNELS = parse_input_args(sys.argv[2:])
+
+# Transcription engine for this stream: whisper-api (default) or local
+ENGINE_NAME = parse_engine_arg(sys.argv[2:], STREAM_TYPE)
+
+# Longest segment before a forced cut: 8 s suits conversations, shorter cuts give earlier text
+MAX_SEGMENT_S = float(parse_flag(sys.argv[2:], "max-segment-s", os.environ.get("REMI_MAX_SEGMENT_S", "8")))
+
 def log_message(message, include_label=False):
     """Print timestamped log message with optional stream label"""
     timestamp = datetime.now().strftime('%H:%M:%S')
@@ -33,151 +46,76 @@ def log_message(message, include_label=False):
     else:
         print(f"[{timestamp}] {message}", flush=True)
 
-def reduce_noise(audio_array):
-    """Simple noise reduction using spectral gating"""
-    # Calculate noise floor (first 0.5 seconds assumed to be noise)
-    noise_sample_size = min(8000, len(audio_array) // 4)  # 0.5 seconds at 16kHz
-    noise_floor = np.mean(np.abs(audio_array[:noise_sample_size]))
-    
-    # Apply soft threshold
-    threshold = noise_floor * 2.0
-    mask = np.abs(audio_array) > threshold
-    audio_array = audio_array * mask
-    
-    return audio_array
-
-def detect_silence(audio_array, threshold=0.01):
-    """Check if audio chunk is mostly silence"""
-    rms = np.sqrt(np.mean(audio_array ** 2))
-    return rms < threshold
-
-def is_repetitive(text, max_repetition=8):
-    """Detect if text has excessive repetition (hallucination indicator)"""
-    if not text:
-        return False
-    
-    # Split into words or phrases
-    words = text.split()
-    if len(words) < 10:  # Need at least 10 words to be considered repetitive
-        return False
-    
-    # Check for consecutive repeated words (only catch extreme cases like "the the the the the")
-    consecutive_count = 1
-    for i in range(1, len(words)):
-        if words[i] == words[i-1]:
-            consecutive_count += 1
-            if consecutive_count >= 5:  # At least 5 consecutive same words
-                return True
-        else:
-            consecutive_count = 1
-    
-    # Check for repeated phrases (only longer phrases 3-6 words)
-    for phrase_len in range(3, 7):
-        phrases = [' '.join(words[i:i+phrase_len]) for i in range(len(words) - phrase_len + 1)]
-        # Count occurrences of each phrase
-        from collections import Counter
-        phrase_counts = Counter(phrases)
-        # If any phrase appears more than 8 times, it's definitely repetitive
-        if any(count > max_repetition for count in phrase_counts.values()):
-            return True
-    
-    return False
-
-def audio_to_wav_bytes(audio_array, sample_rate=16000):
-    """Convert numpy audio array to WAV format bytes"""
-    # Convert float32 to int16
-    audio_int16 = (audio_array * 32767).astype(np.int16)
-    
-    # Create WAV file in memory
-    wav_io = io.BytesIO()
-    with wave.open(wav_io, 'wb') as wav_file:
-        wav_file.setnchannels(1)  # Mono
-        wav_file.setsampwidth(2)  # 2 bytes for int16
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(audio_int16.tobytes())
+def transcribe_segment(engine, audio_array, suppressor, hallucinations):
+    """Clean up one speech segment and transcribe it with the selected engine"""
+    # Noise reduction + normalization
+    audio_array = prepare_segment(audio_array, suppressor)
     
-    wav_io.seek(0)
-    return wav_io
+    try:
+        text, reason = filter_transcript(engine.transcribe(audio_array), hallucinations)
+        
+        # Filter out various hallucinations
+        if reason == "repetitive":
+            log_message("⚠️ Skipped repetitive hallucination (likely silence or unclear audio)")
+        elif reason == "duplicate":
+            log_message("⚠️ Skipped transcript repeating a recent segment")
+        elif text:
+            log_message(text, include_label=True)
+    except Exception as api_error:
+        log_message(f"❌ API Error: {api_error}")
 
 def main():
-    log_message(f"🎙️ Initializing OpenAI Whisper API ({STREAM_TYPE} stream)...")
+    log_message(f"🎙️ Initializing {ENGINE_NAME} engine ({STREAM_TYPE} stream)...")
+    
+    engine = create_engine(ENGINE_NAME)
+    if engine.streaming:
+        log_message(f"❌ {engine.describe()} streams audio; use transcribe_realtime.py instead")
+        sys.exit(1)
     
     # Check for API key
-    if not os.environ.get("OPENAI_API_KEY"):
+    if engine.requires_api_key and not os.environ.get("OPENAI_API_KEY"):
         log_message("❌ OPENAI_API_KEY environment variable not set!")
         log_message("💡 Set it with: export OPENAI_API_KEY='your-api-key'")
         sys.exit(1)
     
-    log_message(f"✅ OpenAI API ready for {STREAM_TYPE} audio")
-    log_message(f"{STREAM_ICON} Ready to transcribe {STREAM_LABEL}'s audio...")
+    log_message(f"✅ {engine.describe()} ready for {STREAM_TYPE} audio ({AUDIO_FORMAT} input)")
+    log_message(f"{STREAM_ICON} Ready to transcribe {STREAM_LABEL}'s audio... (started in {startup_ms():.0f} ms)")
     log_message("")
     
-    audio_buffer = []
-    chunk_duration = 8.0  # Process every 8 seconds - better for conversations
-    sample_rate = 16000
-    samples_per_chunk = int(sample_rate * chunk_duration)
+    sample_rate = engine.sample_rate
+    converter = InputConverter(INPUT_SAMPLE_RATE, INPUT_CHANNELS, sample_rate)
+    # Cut segments at pauses in speech; silence never reaches the API
+    segmenter = SpeechSegmenter(sample_rate, threshold=0.008, max_segment_s=MAX_SEGMENT_S)
+    # Noise profile and recent-chunk window belong to this stream
+    suppressor = SpectralNoiseSuppressor(sample_rate)
+    hallucinations = HallucinationFilter()
+    
+    reader = FrameReader(sys.stdin.buffer, AUDIO_FORMAT)
     
     try:
         # Read audio samples from stdin (sent by Swift)
         while True:
-            line = sys.stdin.readline()
-            if not line:
+            try:
+                samples = reader.read()
+            except FrameError as e:
+                log_message(f"❌ Audio stream out of sync: {e}")
                 break
-                
-            line = line.strip()
-            if not line:
+            except ValueError as e:
+                log_message(f"❌ Error processing audio: {e}")
+                continue
+            
+            if samples is None:
+                # Transcribe whatever was still being said when the stream closed
+                for segment in segmenter.flush():
+                    transcribe_segment(engine, segment.audio, suppressor, hallucinations)
+                break
+            if not samples.size:
                 continue
+            samples = converter.process(samples)
             
-            # Parse the audio samples (comma-separated floats)
             try:
-                samples = [float(x) for x in line.split(',') if x]
-                audio_buffer.extend(samples)
-                
-                # Process when we have enough samples
-                if len(audio_buffer) >= samples_per_chunk:
-                    # Convert to numpy array
-                    audio_array = np.array(audio_buffer[:samples_per_chunk], dtype=np.float32)
-                    
-                    # Skip silent chunks to save API calls and improve accuracy
-                    if detect_silence(audio_array, threshold=0.008):  # Less aggressive - keep more audio
-                        audio_buffer = audio_buffer[samples_per_chunk:]
-                        continue
-                    
-                    # Apply noise reduction
-                    audio_array = reduce_noise(audio_array)
-                    
-                    # Normalize audio
-                    if np.max(np.abs(audio_array)) > 0:
-                        audio_array = audio_array / np.max(np.abs(audio_array))
-                    
-                    # Convert to WAV format
-                    wav_bytes = audio_to_wav_bytes(audio_array, sample_rate)
-                    wav_bytes.name = "audio.wav"  # Required by OpenAI API
-                    
-                    # Transcribe using OpenAI API with improved parameters
-                    try:
-                        transcription = client.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=wav_bytes,
-                            language="en",
-                            temperature=0.2  # Lower temperature for more consistent output
-                        )
-                        
-                        text = transcription.text.strip()
-                        
-                        # Filter out various hallucinations
-                        if text and not text.startswith("This is a meeting"):
-                            # Check for repetitive hallucinations
-                            if is_repetitive(text):
-                                log_message(f"⚠️ Skipped repetitive hallucination (likely silence or unclear audio)")
-                            else:
-                                log_message(text, include_label=True)
-                    except Exception as api_error:
-                        log_message(f"❌ API Error: {api_error}")
-                    
-                    # Clear the processed audio (no overlap to avoid duplicates)
-                    audio_buffer = audio_buffer[samples_per_chunk:]
-                    
+                for segment in segmenter.push(samples):
+                    transcribe_segment(engine, segment.audio, suppressor, hallucinations)
             except Exception as e:
                 log_message(f"❌ Error processing audio: {e}")
                 continue
@@ -186,6 +124,8 @@ def main():
         log_message("🛑 Transcription stopped")
     except Exception as e:
         log_message(f"❌ Fatal error: {e}")
+    finally:
+        log_message(f"🧹 Hallucination filter: {filter_summary(hallucinations)}")
 
 if __name__ == "__main__":
     main()
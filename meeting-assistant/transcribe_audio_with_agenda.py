@@ -6,30 +6,43 @@ Extends transcribe_audio.py to send transcriptions to agenda tracker via WebSock
 
 import sys
 import os
-import numpy as np
 import warnings
 from datetime import datetime
-from openai import OpenAI
-import io
-import wave
 import asyncio
-import websockets
-import json
+from audio_frames import FrameReader, FrameError, parse_format_arg, parse_flag
+from vad import SpeechSegmenter
+from engines import create_engine, parse_engine_arg
+from pipeline import TranscriptionPipeline
+from segment_queue import parse_overload_args
+from startup import startup_ms
+from resample import InputConverter, parse_input_args
+from segment_processing import prepare_segment, filter_transcript, filter_summary
+from noise_suppression import SpectralNoiseSuppressor
+from hallucination_filter import HallucinationFilter
+from tracker_client import AgendaTrackerClient, AGENDA_TRACKER_URL
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
 # Get stream type from command line argument
 STREAM_TYPE = sys.argv[1] if len(sys.argv) > 1 else "mic"
 STREAM_ICON = "🎤" if STREAM_TYPE == "mic" else "🔊"
 STREAM_LABEL = "You" if STREAM_TYPE == "mic" else "Other"
 
-# WebSocket connection to agenda tracker
-AGENDA_TRACKER_URL = "ws://localhost:8765"
-ws_connection = None
+# Wire format sent by the capture side: csv (default), f32le or s16le
+AUDIO_FORMAT = parse_format_arg(sys.argv[2:])
+
+# Capture rate/channels (--input-rate / --channels), converted to the engine's rate
+INPUT_SAMPLE_RATE, INPUT_CHANNELS = parse_input_args(sys.argv[2:])
+
+# Transcription engine for this stream: whisper-api (default) or local
+ENGINE_NAME = parse_engine_arg(sys.argv[2:], STREAM_TYPE)
+
+# Number of Whisper requests allowed in flight while capture keeps running
+MAX_IN_FLIGHT = int(parse_flag(sys.argv[2:], "max-in-flight", os.environ.get("REMI_MAX_IN_FLIGHT", "3")))
+
+# What to give up when transcription falls behind capture (see segment_queue.py)
+OVERLOAD = parse_overload_args(sys.argv[2:])
 
 # For process identification
 PROCESS_ID = f"{STREAM_TYPE}_{os.getpid()}"
@@ -44,170 +57,111 @@ def log_message(message, include_label=False):
         print(f"[{timestamp}] {message}", flush=True)
 
 
-async def send_to_agenda_tracker(speaker: str, text: str):
-    """Send transcription to agenda tracker via WebSocket"""
-    global ws_connection
-    
-    try:
-        # Check if we need to create/recreate connection
-        if ws_connection is None:
-            ws_connection = await websockets.connect(AGENDA_TRACKER_URL)
-            log_message("🔌 Connected to agenda tracker")
-        
-        message = json.dumps({
-            "type": "transcription",
-            "speaker": speaker,
-            "text": text,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        await ws_connection.send(message)
-    except (websockets.exceptions.ConnectionClosed, AttributeError) as e:
-        # Connection was closed, reconnect and retry
-        try:
-            ws_connection = await websockets.connect(AGENDA_TRACKER_URL)
-            log_message("🔌 Reconnected to agenda tracker")
-            await ws_connection.send(message)
-        except Exception as retry_error:
-            log_message(f"⚠️ Could not send to agenda tracker: {retry_error}")
-            ws_connection = None
-    except Exception as e:
-        log_message(f"⚠️ Could not send to agenda tracker: {e}")
-        ws_connection = None
-
-
-def reduce_noise(audio_array):
-    """Simple noise reduction using spectral gating"""
-    noise_sample_size = min(8000, len(audio_array) // 4)
-    noise_floor = np.mean(np.abs(audio_array[:noise_sample_size]))
-    threshold = noise_floor * 2.0
-    mask = np.abs(audio_array) > threshold
-    audio_array = audio_array * mask
-    return audio_array
+# WebSocket connection to agenda tracker
+tracker = AgendaTrackerClient(AGENDA_TRACKER_URL, log=log_message)
 
 
-def detect_silence(audio_array, threshold=0.01):
-    """Check if audio chunk is mostly silence"""
-    rms = np.sqrt(np.mean(audio_array ** 2))
-    return rms < threshold
+async def send_to_agenda_tracker(speaker: str, text: str):
+    """Send transcription to agenda tracker via WebSocket"""
+    await tracker.send_transcription(speaker, text)
 
 
-def is_repetitive(text, max_repetition=8):
-    """Detect if text has excessive repetition (hallucination indicator)"""
-    if not text:
-        return False
+def transcribe_segment(engine, segment, suppressor):
+    """Clean up one speech segment and transcribe it (blocking, runs in a worker thread)"""
+    audio_array = prepare_segment(segment.audio, suppressor)
     
-    words = text.split()
-    if len(words) < 10:
-        return False
-    
-    consecutive_count = 1
-    for i in range(1, len(words)):
-        if words[i] == words[i-1]:
-            consecutive_count += 1
-            if consecutive_count >= 5:
-                return True
-        else:
-            consecutive_count = 1
-    
-    for phrase_len in range(3, 7):
-        phrases = [' '.join(words[i:i+phrase_len]) for i in range(len(words) - phrase_len + 1)]
-        from collections import Counter
-        phrase_counts = Counter(phrases)
-        if any(count > max_repetition for count in phrase_counts.values()):
-            return True
-    
-    return False
-
-
-def audio_to_wav_bytes(audio_array, sample_rate=16000):
-    """Convert numpy audio array to WAV format bytes"""
-    audio_int16 = (audio_array * 32767).astype(np.int16)
-    wav_io = io.BytesIO()
-    with wave.open(wav_io, 'wb') as wav_file:
-        wav_file.setnchannels(1)
-        wav_file.setsampwidth(2)
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(audio_int16.tobytes())
-    wav_io.seek(0)
-    return wav_io
+    try:
+        return engine.transcribe(audio_array)
+    except Exception as api_error:
+        log_message(f"❌ API Error: {api_error}")
+        return None
+
+
+async def deliver_transcription(segment, text, hallucinations):
+    """Filter, log and forward a transcription (called in segment order, on the loop)"""
+    # The duplicate window must see segments in order, not in API completion order
+    text, reason = filter_transcript(text, hallucinations)
+    if reason == "repetitive":
+        log_message("⚠️ Skipped repetitive hallucination")
+    elif reason == "duplicate":
+        log_message("⚠️ Skipped transcript repeating a recent segment")
+    if not text:
+        return
+    log_message(text, include_label=True)
+    # Send to agenda tracker
+    await send_to_agenda_tracker(STREAM_LABEL, text)
 
 
 async def process_audio_async():
     """Main async processing loop"""
-    log_message(f"🎙️ Initializing OpenAI Whisper API ({STREAM_TYPE} stream)...")
+    log_message(f"🎙️ Initializing {ENGINE_NAME} engine ({STREAM_TYPE} stream)...")
+    
+    engine = create_engine(ENGINE_NAME)
+    if engine.streaming:
+        log_message(f"❌ {engine.describe()} streams audio; use transcribe_realtime.py instead")
+        sys.exit(1)
     
-    if not os.environ.get("OPENAI_API_KEY"):
+    if engine.requires_api_key and not os.environ.get("OPENAI_API_KEY"):
         log_message("❌ OPENAI_API_KEY environment variable not set!")
         sys.exit(1)
     
-    log_message(f"✅ OpenAI API ready for {STREAM_TYPE} audio")
-    log_message(f"{STREAM_ICON} Ready to transcribe {STREAM_LABEL}'s audio...")
+    log_message(f"✅ {engine.describe()} ready for {STREAM_TYPE} audio ({AUDIO_FORMAT} input)")
+    log_message(f"{STREAM_ICON} Ready to transcribe {STREAM_LABEL}'s audio... (started in {startup_ms():.0f} ms)")
     log_message("🎯 Will send transcriptions to agenda tracker...")
     log_message("")
     
-    audio_buffer = []
-    chunk_duration = 8.0
-    sample_rate = 16000
-    samples_per_chunk = int(sample_rate * chunk_duration)
+    max_segment_duration = 8.0
+    sample_rate = engine.sample_rate
+    converter = InputConverter(INPUT_SAMPLE_RATE, INPUT_CHANNELS, sample_rate)
+    # Cut segments at pauses in speech so short utterances go out right away
+    segmenter = SpeechSegmenter(sample_rate, threshold=0.008, max_segment_s=max_segment_duration)
+    # Noise profile and recent-chunk window belong to this stream
+    suppressor = SpectralNoiseSuppressor(sample_rate)
+    hallucinations = HallucinationFilter()
+    
+    reader = FrameReader(sys.stdin.buffer, AUDIO_FORMAT)
+    pipeline = TranscriptionPipeline(
+        lambda segment: transcribe_segment(engine, segment, suppressor),
+        lambda segment, text: deliver_transcription(segment, text, hallucinations),
+        max_in_flight=MAX_IN_FLIGHT,
+        log=log_message,
+        overload=OVERLOAD,
+        sample_rate=sample_rate,
+        report=lambda status: tracker.send_status(STREAM_LABEL, status)
+    )
+    pipeline.start()
+    loop = asyncio.get_running_loop()
     
     try:
         while True:
-            line = sys.stdin.readline()
+            try:
+                # Read off the loop so in-flight requests and websocket sends keep going
+                samples = await loop.run_in_executor(None, reader.read)
+            except FrameError as e:
+                log_message(f"❌ Audio stream out of sync for {PROCESS_ID}: {e}")
+                break
+            except ValueError as e:
+                log_message(f"❌ Error processing audio: {e}")
+                continue
             
-            if not line:
+            if samples is None:
+                for segment in segmenter.flush():
+                    await pipeline.submit(segment)
                 log_message(f"⚠️ Stdin closed for {PROCESS_ID}, exiting...")
                 break
-            
-            line = line.strip()
-            if not line:
+            if not samples.size:
                 continue
+            samples = converter.process(samples)
             
             try:
-                samples = [float(x) for x in line.split(',') if x]
-                audio_buffer.extend(samples)
-                
-                if len(audio_buffer) >= samples_per_chunk:
-                    audio_array = np.array(audio_buffer[:samples_per_chunk], dtype=np.float32)
-                    
-                    if detect_silence(audio_array, threshold=0.008):
-                        audio_buffer = audio_buffer[samples_per_chunk:]
-                        continue
-                    
-                    audio_array = reduce_noise(audio_array)
-                    
-                    if np.max(np.abs(audio_array)) > 0:
-                        audio_array = audio_array / np.max(np.abs(audio_array))
-                    
-                    wav_bytes = audio_to_wav_bytes(audio_array, sample_rate)
-                    wav_bytes.name = "audio.wav"
-                    
-                    try:
-                        transcription = client.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=wav_bytes,
-                            language="en",
-                            temperature=0.2
-                        )
-                        
-                        text = transcription.text.strip()
-                        
-                        if text and not text.startswith("This is a meeting"):
-                            if is_repetitive(text):
-                                log_message(f"⚠️ Skipped repetitive hallucination")
-                            else:
-                                log_message(text, include_label=True)
-                                # Send to agenda tracker
-                                await send_to_agenda_tracker(STREAM_LABEL, text)
-                    
-                    except Exception as api_error:
-                        log_message(f"❌ API Error: {api_error}")
-                    
-                    audio_buffer = audio_buffer[samples_per_chunk:]
-                    
+                for segment in segmenter.push(samples):
+                    await pipeline.submit(segment)
             except Exception as e:
                 log_message(f"❌ Error processing audio: {e}")
                 continue
+        
+        # Let queued and in-flight segments finish before shutting down
+        await pipeline.close()
                 
     except KeyboardInterrupt:
         log_message(f"🛑 Transcription stopped ({PROCESS_ID})")
@@ -216,12 +170,10 @@ async def process_audio_async():
         import traceback
         log_message(traceback.format_exc())
     finally:
+        log_message(f"🧹 Hallucination filter: {filter_summary(hallucinations)}")
+        log_message(f"📦 Overload ({pipeline.queue.policy}): {pipeline.queue.summary()}")
         log_message(f"🔌 Closing WebSocket for {PROCESS_ID}")
-        if ws_connection:
-            try:
-                await ws_connection.close()
-            except:
-                pass
+        await tracker.close()
 
 
 def main():
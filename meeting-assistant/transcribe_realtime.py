@@ -10,139 +10,227 @@ import asyncio
 import websockets
 import json
 import base64
-import struct
 from datetime import datetime
 import random
 import string
 import atexit
+import time
+from collections import deque
 from pathlib import Path
+import numpy as np
+from audio_frames import FrameReader, FrameError, parse_format_arg, parse_flag
+from audio_buffer import AudioRingBuffer
+from vad import SilenceGate
+from engines import RealtimeAPIEngine
+from tracker_client import AgendaTrackerClient, AGENDA_TRACKER_URL
+from transcript_writer import TranscriptWriter, FSYNC_CLOSE, safe_session_id, transcript_name
+from audio_archive import AudioArchiver
+from segment_uploader import SegmentUploader
+from startup import startup_ms
+from resample import InputConverter, parse_input_args
 
 STREAM_TYPE = sys.argv[1] if len(sys.argv) > 1 else "mic"
 STREAM_ICON = "🎤" if STREAM_TYPE == "mic" else "🔊"
 STREAM_LABEL = "You" if STREAM_TYPE == "mic" else "Other"
 
+# Wire format sent by the capture side: csv (default), f32le or s16le
+AUDIO_FORMAT = parse_format_arg(sys.argv[2:])
+
+# Capture rate/channels (--input-rate / --channels); audio is converted to the
+# 24 kHz mono the Realtime API expects for pcm16 before anything else sees it
+INPUT_SAMPLE_RATE, INPUT_CHANNELS = parse_input_args(sys.argv[2:])
+UPLINK_SAMPLE_RATE = RealtimeAPIEngine.sample_rate
+
+# Coalesce stdin frames into appends of this many milliseconds of audio
+APPEND_MS = int(parse_flag(sys.argv[2:], "append-ms", os.environ.get("REMI_APPEND_MS", "100")))
+
+# Recent audio kept in memory and replayed after a Realtime socket reconnect
+REPLAY_SECONDS = float(parse_flag(sys.argv[2:], "replay-seconds", os.environ.get("REMI_REPLAY_SECONDS", "5")))
+
+# Local VAD gate in front of the uplink: silence isn't sent, utterances are committed by us
+UPLINK_VAD = parse_flag(sys.argv[2:], "uplink-vad", os.environ.get("REMI_UPLINK_VAD", "on")).lower() not in ("off", "0", "false", "no")
+
+# Minimum gap between interim transcript updates per utterance (0 disables them)
+PARTIAL_INTERVAL_MS = int(parse_flag(sys.argv[2:], "partial-interval-ms", os.environ.get("REMI_PARTIAL_INTERVAL_MS", "250")))
+
+
+def log_message(message, include_label=False):
+    """Print timestamped log message with optional stream label"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    if include_label:
+        print(f"[{timestamp}] {STREAM_ICON} {STREAM_LABEL}: {message}", flush=True)
+    else:
+        print(f"[{timestamp}] {message}", flush=True)
+
+
 # --- Transcript persistence setup ---
 def _random_id(n=6):
     return ''.join(random.choices(string.ascii_lowercase + string.digits, k=n))
 
+# Every stream of one meeting shares REMI_SESSION_ID (RemiController sets it); a stream
+# started on its own is a session of its own, named after its start time
+STARTED_AT = datetime.now().strftime('%Y%m%dT%H%M%S')
+SESSION_ID = safe_session_id(os.environ.get("REMI_SESSION_ID") or STARTED_AT)
+
 def _session_file():
-    ts = datetime.now().strftime('%Y%m%dT%H%M%S')
-    rid = _random_id()
-    fname = f"{ts}_{STREAM_TYPE}_{rid}.ndjson"
-    transcripts_dir = Path(__file__).parent / "transcripts"
+    fname = transcript_name(STARTED_AT, STREAM_TYPE, _random_id(), SESSION_ID)
+    transcripts_dir = Path(os.environ.get("REMI_TRANSCRIPTS_DIR", Path(__file__).parent / "transcripts"))
     transcripts_dir.mkdir(exist_ok=True)
     return transcripts_dir / fname
 
 TRANSCRIPT_FILE = _session_file()
-_transcript_fh = open(TRANSCRIPT_FILE, "a", encoding="utf-8")
+
+# Transcript lines are batched and written by a background thread:
+# fsync "never", after every "flush", or once at "close" (default)
+TRANSCRIPT_FSYNC = parse_flag(sys.argv[2:], "transcript-fsync", os.environ.get("REMI_TRANSCRIPT_FSYNC", FSYNC_CLOSE)).lower()
+TRANSCRIPT_FLUSH_MS = int(parse_flag(sys.argv[2:], "transcript-flush-ms", os.environ.get("REMI_TRANSCRIPT_FLUSH_MS", "1000")))
+transcript_writer = TranscriptWriter(
+    TRANSCRIPT_FILE, flush_interval_s=TRANSCRIPT_FLUSH_MS / 1000, fsync=TRANSCRIPT_FSYNC, log=log_message
+)
 
 def append_local(text, stream=STREAM_TYPE, speaker=STREAM_LABEL):
-    obj = {
+    record = {
         "ts": datetime.now().isoformat(),
         "stream": stream,
         "speaker": speaker,
         "text": text
     }
-    _transcript_fh.write(json.dumps(obj, ensure_ascii=False) + "\n")
-    _transcript_fh.flush()
+    line = transcript_writer.append(record)
+    if segment_uploader is not None:
+        segment_uploader.add(record, line)
+    return line
 
 def close_transcript_file():
     try:
-        _transcript_fh.close()
+        transcript_writer.close()
     except Exception:
         pass
 atexit.register(close_transcript_file)
 
-# --- transcript_chunks for fallback ---
-transcript_chunks = []
+# Live upload of transcript lines to Supabase (meeting_segments, under SESSION_ID) every N seconds; 0 disables it
+UPLOAD_WINDOW_S = float(parse_flag(sys.argv[2:], "upload-window-s", os.environ.get("REMI_UPLOAD_WINDOW_S", "10")))
+segment_uploader = None  # SegmentUploader, created in main() when enabled
 
-# WebSocket connection to agenda tracker
-AGENDA_TRACKER_URL = "ws://localhost:8765"
-agenda_ws = None
+# Optional raw-audio archive next to the transcript: flac, opus or off (default)
+ARCHIVE_CODEC = parse_flag(sys.argv[2:], "archive-audio", os.environ.get("REMI_ARCHIVE_AUDIO", "off")).lower()
+ARCHIVE_SEGMENT_SECONDS = float(parse_flag(sys.argv[2:], "archive-segment-s", os.environ.get("REMI_ARCHIVE_SEGMENT_S", "300")))
+ARCHIVE_DIR = TRANSCRIPT_FILE.parent / "audio" / TRANSCRIPT_FILE.stem
+archiver = None  # AudioArchiver, created in main() when enabled
 
 # OpenAI Realtime API
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-REALTIME_API_URL = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
-
 
-def log_message(message, include_label=False):
-    """Print timestamped log message with optional stream label"""
-    timestamp = datetime.now().strftime('%H:%M:%S')
-    if include_label:
-        print(f"[{timestamp}] {STREAM_ICON} {STREAM_LABEL}: {message}", flush=True)
-    else:
-        print(f"[{timestamp}] {message}", flush=True)
-
-
-async def connect_to_agenda_tracker():
-    """Connect to agenda tracker WebSocket"""
-    global agenda_ws
-    try:
-        agenda_ws = await websockets.connect(AGENDA_TRACKER_URL)
-        log_message("🔌 Connected to agenda tracker")
-    except Exception as e:
-        log_message(f"⚠️ Could not connect to agenda tracker: {e}")
+# "transcription" opens a transcription-only session (no model responses, cheaper);
+# "conversation" is the older full session that transcribes as a side effect
+SESSION_MODE = parse_flag(sys.argv[2:], "session", os.environ.get("REMI_REALTIME_SESSION", "transcription")).lower()
+if SESSION_MODE not in ("transcription", "conversation"):
+    raise ValueError(f"Unknown Realtime session mode '{SESSION_MODE}' (expected transcription or conversation)")
+TRANSCRIPTION_ONLY = SESSION_MODE == "transcription"
+REALTIME_API_URL = RealtimeAPIEngine.TRANSCRIPTION_URL if TRANSCRIPTION_ONLY else RealtimeAPIEngine.URL
+# Transcription model for transcription sessions (gpt-4o-transcribe streams deltas)
+TRANSCRIBE_MODEL = os.environ.get("REMI_TRANSCRIBE_MODEL", "gpt-4o-transcribe")
 
 
-async def send_to_agenda_tracker(speaker: str, text: str):
-    """Send transcription to agenda tracker via WebSocket"""
-    global agenda_ws
-    
-    try:
-        if agenda_ws is None:
-            await connect_to_agenda_tracker()
-        
-        message = json.dumps({
-            "type": "transcription",
-            "speaker": speaker,
-            "text": text,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        await agenda_ws.send(message)
-    except Exception as e:
-        log_message(f"⚠️ Could not send to agenda tracker: {e}")
-        agenda_ws = None
-
-
-async def handle_realtime_events(realtime_ws):
-    """Handle incoming events from Realtime API"""
+# WebSocket connection to agenda tracker
+tracker = AgendaTrackerClient(AGENDA_TRACKER_URL, log=log_message)
+
+
+class PartialTranscripts:
+    """Accumulates transcript deltas per item id and rate-limits interim updates"""
+
+    def __init__(self, min_interval_s=0.25):
+        self.min_interval_s = min_interval_s
+        self._text = {}
+        self._last_sent = {}
+
+    def add(self, item_id, delta):
+        """Append a delta; returns the accumulated text if an update is due, else None"""
+        text = self._text.get(item_id, "") + delta
+        self._text[item_id] = text
+        if self.min_interval_s <= 0:
+            return None
+        now = time.monotonic()
+        if now - self._last_sent.get(item_id, 0.0) < self.min_interval_s:
+            return None
+        self._last_sent[item_id] = now
+        return text
+
+    def finish(self, item_id):
+        """Final text arrived (or transcription failed): forget the interim state for this item"""
+        self._last_sent.pop(item_id, None)
+        return self._text.pop(item_id, "")
+
+
+partials = PartialTranscripts(PARTIAL_INTERVAL_MS / 1000)
+
+
+async def handle_transcript_delta(event):
+    """Forward interim text for an in-progress utterance (rate-limited)"""
+    delta = event.get("delta", "")
+    item_id = event.get("item_id")
+    if not delta or not item_id:
+        return
+    text = partials.add(item_id, delta)
+    if text and text.strip():
+        await tracker.send_partial_transcription(STREAM_LABEL, text.strip(), item_id)
+
+
+async def handle_transcript_done(event):
+    """Final text for an utterance: log, persist and replace the interim text"""
+    item_id = event.get("item_id")
+    if item_id:
+        partials.finish(item_id)
+    transcript = event.get("transcript", "")
+    if transcript and transcript.strip():
+        log_message(transcript, include_label=True)
+        await tracker.send_transcription(STREAM_LABEL, transcript, item_id)
+        line = append_local(transcript)
+        if archiver is not None:
+            archiver.mark_line(line, item_id)
+
+
+async def handle_transcript_failed(event):
+    """No final text will come for this utterance: drop its interim text here and at the tracker"""
+    item_id = event.get("item_id")
+    log_message(f"⚠️ Transcription failed: {event.get('error', {})}")
+    if item_id and partials.finish(item_id):
+        await tracker.send_partial_transcription(STREAM_LABEL, "", item_id)
+
+
+async def handle_realtime_events(realtime_ws, connection=None):
+    """Handle incoming events from Realtime API
+
+    connection (a RealtimeConnection) is told which audio the server has
+    committed and transcribed, so a reconnect only replays what is still open.
+    """
     async for message in realtime_ws:
         try:
             event = json.loads(message)
             event_type = event.get("type")
 
-            if event_type == "session.created":
-                log_message("✅ Realtime API session created")
+            if connection is not None:
+                connection.track_event(event)
 
-            elif event_type == "conversation.item.created":
-                # New conversation item (could be transcript)
-                pass
+            if event_type in ("session.created", "transcription_session.created"):
+                log_message("✅ Realtime API session created")
 
-            elif event_type == "response.audio_transcript.delta":
+            elif event_type == "conversation.item.input_audio_transcription.delta":
                 # Partial transcript chunk
-                transcript_delta = event.get("delta", "")
-                if transcript_delta:
-                    # Buffer these for complete sentences
-                    pass
-
-            elif event_type == "response.audio_transcript.done":
-                # Complete transcript available
-                transcript = event.get("transcript", "")
-                if transcript and transcript.strip():
-                    log_message(transcript, include_label=True)
-                    await send_to_agenda_tracker(STREAM_LABEL, transcript)
-                    append_local(transcript)
-                    transcript_chunks.append(transcript)
+                await handle_transcript_delta(event)
 
             elif event_type == "conversation.item.input_audio_transcription.completed":
                 # Input audio transcription complete (VAD detected end of speech)
-                transcript = event.get("transcript", "")
-                if transcript and transcript.strip():
-                    log_message(transcript, include_label=True)
-                    await send_to_agenda_tracker(STREAM_LABEL, transcript)
-                    append_local(transcript)
-                    transcript_chunks.append(transcript)
+                await handle_transcript_done(event)
+
+            elif event_type == "conversation.item.input_audio_transcription.failed":
+                await handle_transcript_failed(event)
+
+            elif not TRANSCRIPTION_ONLY and event_type == "response.audio_transcript.delta":
+                # Conversation sessions also transcribe the model's own replies
+                await handle_transcript_delta(event)
+
+            elif not TRANSCRIPTION_ONLY and event_type == "response.audio_transcript.done":
+                await handle_transcript_done(event)
 
             elif event_type == "error":
                 error_msg = event.get("error", {})
@@ -150,90 +238,403 @@ async def handle_realtime_events(realtime_ws):
 
         except json.JSONDecodeError:
             log_message(f"⚠️ Could not parse event: {message}")
-# --- Supabase upload logic ---
-def save_transcription_to_supabase():
-    """Read local transcript file, combine all text, and insert into meeting_notes."""
-    try:
-        with open(TRANSCRIPT_FILE, "r", encoding="utf-8") as f:
-            lines = [json.loads(line) for line in f if line.strip()]
-        all_text = "\n".join([obj["text"] for obj in lines])
-        created_at = lines[0]["ts"] if lines else datetime.now().isoformat()
-        stream_type = lines[0]["stream"] if lines else STREAM_TYPE
-        session_id = TRANSCRIPT_FILE.stem
-        source_file = str(TRANSCRIPT_FILE)
-    except Exception as e:
-        # Fallback to transcript_chunks
-        all_text = "\n".join(transcript_chunks)
-        created_at = datetime.now().isoformat()
-        stream_type = STREAM_TYPE
-        session_id = TRANSCRIPT_FILE.stem
-        source_file = str(TRANSCRIPT_FILE)
-
-    # Insert into Supabase (pseudo-code, replace with your actual client)
-    try:
-        from backend.core.supabase_client import insert_record
-        record = {
-            "transcription": all_text,
-            "created_at": created_at,
-            "stream_type": stream_type,
-            "session_id": session_id,
-            "source_file": source_file
-        }
-        insert_record("meeting_notes", record)
-    except Exception as e:
-        print(f"❌ Error uploading to Supabase: {e}")
+
+
+class PCM16Encoder:
+    """Vectorized float32 -> base64 PCM16 encoder with reusable scratch buffers"""
+
+    def __init__(self, capacity=4800):
+        self._scratch = np.empty(capacity, dtype=np.float32)
+        self._pcm = np.empty(capacity, dtype="<i2")
+
+    def _ensure_capacity(self, n):
+        if n > len(self._scratch):
+            self._scratch = np.empty(n, dtype=np.float32)
+            self._pcm = np.empty(n, dtype="<i2")
+
+    def encode(self, samples):
+        """Clamp to [-1, 1], scale to int16 and base64-encode"""
+        n = len(samples)
+        self._ensure_capacity(n)
+        scratch = self._scratch[:n]
+        pcm = self._pcm[:n]
+        np.clip(samples, -1.0, 1.0, out=scratch)
+        np.multiply(scratch, 32767, out=scratch)
+        # Truncates toward zero, same as int(sample * 32767)
+        np.copyto(pcm, scratch, casting="unsafe")
+        return base64.b64encode(pcm.data).decode('ascii')
+
+
+class FrameCoalescer:
+    """Collects incoming frames into fixed-size blocks (e.g. 100 ms) for sending
+
+    Blocks are views into an internal buffer and are only valid until the
+    next call to push()/flush(), so encode them straight away.
+    """
+
+    def __init__(self, block_samples):
+        self.block_samples = max(1, int(block_samples))
+        self._buffer = np.empty(self.block_samples, dtype=np.float32)
+        self._fill = 0
+
+    def push(self, samples):
+        """Add samples; yields each completed block"""
+        offset = 0
+        total = len(samples)
+        while offset < total:
+            take = min(self.block_samples - self._fill, total - offset)
+            self._buffer[self._fill:self._fill + take] = samples[offset:offset + take]
+            self._fill += take
+            offset += take
+            if self._fill == self.block_samples:
+                self._fill = 0
+                yield self._buffer
+
+    def flush(self):
+        """Return whatever is buffered (possibly empty) and reset"""
+        block = self._buffer[:self._fill]
+        self._fill = 0
+        return block
+
+
+_encoder = PCM16Encoder()
 
 
 def pcm_to_base64(samples):
     """Convert float32 samples to base64-encoded PCM16"""
-    # Convert float32 [-1, 1] to int16 [-32768, 32767]
-    pcm_data = bytearray()
-    for sample in samples:
-        # Clamp to [-1, 1]
-        sample = max(-1.0, min(1.0, sample))
-        # Convert to int16
-        pcm_value = int(sample * 32767)
-        pcm_data.extend(struct.pack('<h', pcm_value))
-    
-    return base64.b64encode(pcm_data).decode('utf-8')
+    return _encoder.encode(np.asarray(samples, dtype=np.float32))
+
+
+async def send_audio_append(realtime_ws, samples):
+    """Send one input_audio_buffer.append event"""
+    event = {
+        "type": "input_audio_buffer.append",
+        "audio": pcm_to_base64(samples)
+    }
+    await realtime_ws.send(json.dumps(event))
+
+
+def build_session_config():
+    """session.update payload, re-sent on every (re)connect"""
+    if UPLINK_VAD:
+        # The local gate sends input_audio_buffer.commit at the end of each utterance
+        turn_detection = None
+    else:
+        turn_detection = {
+            "type": "server_vad",  # Server-side Voice Activity Detection
+            "threshold": 0.5,
+            "prefix_padding_ms": 300,
+            "silence_duration_ms": 500
+        }
+    if TRANSCRIPTION_ONLY:
+        # Transcription events only; there is no model turn to pay for or discard
+        return {
+            "type": "transcription_session.update",
+            "session": {
+                "input_audio_format": "pcm16",
+                "input_audio_transcription": {
+                    "model": TRANSCRIBE_MODEL,
+                    "language": "en"
+                },
+                "turn_detection": turn_detection
+            }
+        }
+    return {
+        "type": "session.update",
+        "session": {
+            "modalities": ["text"],  # We only want transcripts, not audio responses
+            "instructions": f"You are a transcription assistant. Only transcribe the {STREAM_LABEL}'s speech accurately. Do not respond or add commentary.",
+            "voice": "alloy",  # Doesn't matter since we're not using audio output
+            "input_audio_format": "pcm16",
+            "output_audio_format": "pcm16",
+            "input_audio_transcription": {
+                "model": "whisper-1"
+            },
+            "turn_detection": turn_detection
+        }
+    }
+
+
+class RealtimeConnection:
+    """Supervises the Realtime socket: reconnects with backoff and replays recent audio
+
+    Audio always goes through send_audio(), which keeps the last REPLAY_SECONDS
+    in a ring buffer. While the socket is down audio is only buffered. After a
+    reconnect, audio is replayed from the end of the last utterance the server
+    both committed and transcribed (confirmed_until), with the same commits as
+    before, so nothing the old socket already transcribed is transcribed twice
+    and nothing it had not finished is lost.
+    """
+
+    def __init__(self, engine, replay_seconds=REPLAY_SECONDS, block_samples=1600):
+        self.engine = engine
+        self.block_samples = block_samples
+        self.replay = AudioRingBuffer(max(block_samples, int(UPLINK_SAMPLE_RATE * replay_seconds)))
+        self.ws = None
+        self.closing = False
+        self.sent_until = 0          # absolute sample position handed to the socket
+        self.confirmed_until = 0     # everything before this was committed and transcribed
+        self._socket_start = 0       # absolute position of the first sample on the current socket
+        self._commits = deque()      # positions of commits the server hasn't acknowledged yet
+        self._speech_end = None      # server VAD: end of the last detected utterance
+        self._items = {}             # committed item id -> [end position, transcribed], in commit order
+        self._down_since = None
+        self._ever_connected = False
+        # Metrics
+        self.reconnects = 0
+        self.downtime_s = 0.0
+        self.samples_replayed = 0
+        self.samples_lost = 0
+
+    async def send_audio(self, samples):
+        """Buffer samples for replay and send them if the socket is up"""
+        self.replay.write(samples)
+        if self.ws is None:
+            return
+        try:
+            await send_audio_append(self.ws, samples)
+            self.sent_until = self.replay.total_written
+        except websockets.exceptions.ConnectionClosed:
+            # The event loop in run() notices too; just stop sending until reconnected
+            self._mark_down()
+
+    async def commit(self):
+        """End of utterance: ask the server to transcribe what was appended"""
+        # Remembered either way: the replay after a reconnect re-sends it at the same point
+        self._commits.append(self.replay.total_written)
+        if self.ws is not None:
+            try:
+                await self.ws.send(json.dumps({"type": "input_audio_buffer.commit"}))
+            except websockets.exceptions.ConnectionClosed:
+                self._mark_down()
+
+    def track_event(self, event):
+        """Follow the server's progress through the audio it was sent"""
+        event_type = event.get("type")
+        if event_type == "input_audio_buffer.speech_stopped":
+            # Server VAD: audio_end_ms counts from the start of this socket's buffer
+            self._speech_end = self._socket_start + int(event.get("audio_end_ms", 0) * UPLINK_SAMPLE_RATE / 1000)
+        elif event_type == "input_audio_buffer.committed":
+            if self._commits:
+                end = self._commits.popleft()
+            elif self._speech_end is not None:
+                end = self._speech_end
+            else:
+                end = self.sent_until
+            self._items[event.get("item_id")] = [end, False]
+        elif event_type in ("conversation.item.input_audio_transcription.completed",
+                            "conversation.item.input_audio_transcription.failed"):
+            item = self._items.get(event.get("item_id"))
+            if item is not None:
+                item[1] = True
+            # Only a prefix of finished utterances is safe to skip on replay
+            while self._items:
+                item_id, (end, transcribed) = next(iter(self._items.items()))
+                if not transcribed:
+                    break
+                del self._items[item_id]
+                self.confirmed_until = max(self.confirmed_until, end)
+
+    def _mark_down(self):
+        self.ws = None
+        if self._down_since is None:
+            self._down_since = time.monotonic()
+
+    async def _replay_unconfirmed(self, ws):
+        """Send the audio the server hasn't transcribed yet, re-issuing its commits
+
+        The old socket's uncommitted buffer and unfinished transcriptions died with
+        it, so everything past confirmed_until is sent again; everything before it
+        already produced a transcript and is not.
+        """
+        # Every commit past confirmed_until, acknowledged or not, in order
+        boundaries = deque(sorted({end for end, _transcribed in self._items.values()} | set(self._commits)))
+        self._items.clear()
+        self._commits.clear()
+        self._speech_end = None
+        start = self.confirmed_until
+        self._socket_start = max(start, self.replay.total_written - len(self.replay))
+        replayed_commits = deque()
+        last_commit = start
+        while True:
+            # commit() calls made while we were awaiting sends
+            boundaries.extend(self._commits)
+            self._commits.clear()
+            if start >= self.replay.total_written and not boundaries:
+                break
+            oldest = self.replay.total_written - len(self.replay)
+            if start < oldest:
+                self.samples_lost += oldest - start
+                start = oldest
+            # Copy: the reader keeps writing into the ring while we await sends
+            audio = self.replay.peek(len(self.replay))[start - oldest:].copy()
+            end = start + len(audio)
+            position = start
+            while position < end or (boundaries and boundaries[0] <= end):
+                stop = min(end, position + self.block_samples)
+                if boundaries and boundaries[0] < stop:
+                    stop = max(position, boundaries[0])
+                if stop > position:
+                    await send_audio_append(ws, audio[position - start:stop - start])
+                    position = stop
+                if boundaries and boundaries[0] <= position:
+                    boundaries.popleft()
+                    if position > last_commit:  # lost audio can leave nothing to commit
+                        last_commit = position
+                        replayed_commits.append(position)
+                        await ws.send(json.dumps({"type": "input_audio_buffer.commit"}))
+            self.samples_replayed += len(audio)
+            start = end
+        self._commits = replayed_commits
+        self.sent_until = start
+
+    async def run(self):
+        """Connect, handle events until the socket drops, then reconnect with backoff"""
+        backoff = 0.5
+        while not self.closing:
+            try:
+                ws = await self.engine.connect()
+                await ws.send(json.dumps(build_session_config()))
+            except websockets.exceptions.InvalidStatus as e:
+                status = getattr(e.response, "status_code", None)
+                if status in (401, 403):
+                    log_message(f"❌ Realtime API rejected credentials ({status}); giving up")
+                    raise
+                log_message(f"⚠️ Realtime connect failed ({status}); retrying in {backoff:.1f}s")
+                await asyncio.sleep(backoff + random.uniform(0, backoff / 2))
+                backoff = min(backoff * 2, 30.0)
+                continue
+            except (OSError, websockets.exceptions.WebSocketException, asyncio.TimeoutError) as e:
+                log_message(f"⚠️ Realtime connect failed: {e}; retrying in {backoff:.1f}s")
+                await asyncio.sleep(backoff + random.uniform(0, backoff / 2))
+                backoff = min(backoff * 2, 30.0)
+                continue
+            backoff = 0.5
+
+            reconnect = self._ever_connected
+            try:
+                await self._replay_unconfirmed(ws)
+            except websockets.exceptions.ConnectionClosed:
+                continue
+            # No await between the last replay check and this: nothing can slip through
+            self.ws = ws
+            if reconnect:
+                self.reconnects += 1
+                if self._down_since is not None:
+                    self.downtime_s += time.monotonic() - self._down_since
+                    self._down_since = None
+                log_message(f"🔁 Reconnected to Realtime API ({self.metrics_summary()})")
+            else:
+                self._ever_connected = True
+                log_message("🔗 Connected to OpenAI Realtime API")
+                log_message("⚙️ Session configured for transcription")
+            self._down_since = None
+
+            try:
+                await handle_realtime_events(ws, self)
+            except websockets.exceptions.ConnectionClosed as e:
+                log_message(f"⚠️ Realtime socket closed: {e}")
+            finally:
+                self._mark_down()
+            if not self.closing:
+                log_message("⚠️ Realtime socket dropped; reconnecting and buffering audio...")
+
+    async def close(self, grace_s=2.0):
+        """Give the server a moment to finish transcribing, then close the socket"""
+        if self.ws is not None and grace_s > 0:
+            await asyncio.sleep(grace_s)
+        self.closing = True
+        if self.ws is not None:
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
 
+    def metrics(self):
+        downtime = self.downtime_s
+        if self._down_since is not None and self._ever_connected:
+            downtime += time.monotonic() - self._down_since
+        return {
+            "reconnects": self.reconnects,
+            "downtime_s": round(downtime, 2),
+            "replayed_s": round(self.samples_replayed / UPLINK_SAMPLE_RATE, 2),
+            "lost_s": round(self.samples_lost / UPLINK_SAMPLE_RATE, 2),
+        }
+
+    def metrics_summary(self):
+        m = self.metrics()
+        return (f"{m['reconnects']} reconnects, {m['downtime_s']}s down, "
+                f"{m['replayed_s']}s replayed, {m['lost_s']}s lost")
+
+
+async def send_gated(connection, gate, block):
+    """Send a block through the silence gate (or straight through if it's off)"""
+    if gate is None:
+        await connection.send_audio(block)
+        return
+    for action, samples in gate.process(block):
+        if action == "audio":
+            await connection.send_audio(samples)
+        else:
+            await connection.commit()
 
-async def stream_audio_to_realtime(realtime_ws):
+
+def log_gate_stats(gate):
+    """Per-session summary of what the uplink gate held back"""
+    saved_bytes = gate.samples_suppressed * 2  # pcm16
+    log_message(
+        f"🔇 Uplink gate: {gate.suppressed_pct:.1f}% of audio suppressed, "
+        f"{saved_bytes / 1024:.0f} KB PCM (~{saved_bytes * 4 / 3 / 1024:.0f} KB on the wire) saved, "
+        f"{gate.commits} utterances committed"
+    )
+
+
+async def stream_audio_to_realtime(connection):
     """Read audio samples from stdin and stream to Realtime API"""
-    log_message(f"🎙️ Ready to stream {STREAM_TYPE} audio to Realtime API...")
+    reader = FrameReader(sys.stdin.buffer, AUDIO_FORMAT)
+    converter = InputConverter(INPUT_SAMPLE_RATE, INPUT_CHANNELS, UPLINK_SAMPLE_RATE)
+    log_message(f"🎙️ Ready to stream {STREAM_TYPE} audio to Realtime API ({AUDIO_FORMAT} input, "
+                f"{converter.describe()})... (started in {startup_ms():.0f} ms)")
+    coalescer = FrameCoalescer(UPLINK_SAMPLE_RATE * APPEND_MS // 1000)
+    gate = SilenceGate(UPLINK_SAMPLE_RATE) if UPLINK_VAD else None
     
     try:
         loop = asyncio.get_event_loop()
         
         while True:
-            # Read line from stdin (non-blocking)
-            line = await loop.run_in_executor(None, sys.stdin.readline)
+            try:
+                # Read next frame from stdin (non-blocking)
+                samples = await loop.run_in_executor(None, reader.read)
+            except FrameError as e:
+                log_message(f"❌ Audio stream out of sync for {STREAM_TYPE}: {e}")
+                break
+            except ValueError as e:
+                log_message(f"⚠️ Invalid sample data: {e}")
+                continue
             
-            if not line:
+            if samples is not None:
+                samples = converter.process(samples)
+                if archiver is not None:
+                    archiver.write(samples)
+            
+            if samples is None:
+                # Send whatever is left over before shutting down
+                remainder = coalescer.flush()
+                if remainder.size:
+                    await send_gated(connection, gate, remainder)
+                if gate is not None:
+                    for _action, _samples in gate.flush():
+                        await connection.commit()
                 log_message(f"⚠️ Stdin closed for {STREAM_TYPE}, exiting...")
                 break
             
-            line = line.strip()
-            if not line:
-                continue
-            
             try:
-                # Parse comma-separated float samples
-                samples = [float(x) for x in line.split(',') if x]
-                
-                if not samples:
+                if not samples.size:
                     continue
                 
-                # Convert to PCM16 base64
-                audio_base64 = pcm_to_base64(samples)
-                
-                # Send to Realtime API
-                event = {
-                    "type": "input_audio_buffer.append",
-                    "audio": audio_base64
-                }
-                
-                await realtime_ws.send(json.dumps(event))
+                # Send to Realtime API in APPEND_MS-sized blocks
+                for block in coalescer.push(samples):
+                    await send_gated(connection, gate, block)
             
             except ValueError as e:
                 log_message(f"⚠️ Invalid sample data: {e}")
@@ -244,6 +645,32 @@ async def stream_audio_to_realtime(realtime_ws):
         log_message(f"🛑 Audio streaming cancelled for {STREAM_TYPE}")
     except Exception as e:
         log_message(f"❌ Fatal error streaming audio: {e}")
+    finally:
+        if gate is not None:
+            log_gate_stats(gate)
+
+
+def open_archive():
+    """Start the raw-audio archiver if --archive-audio is set; never fatal"""
+    global archiver
+    if ARCHIVE_CODEC in ("off", "0", "false", "no", ""):
+        return
+    try:
+        archiver = AudioArchiver(
+            ARCHIVE_DIR, UPLINK_SAMPLE_RATE, ARCHIVE_CODEC, ARCHIVE_SEGMENT_SECONDS, log=log_message
+        )
+        log_message(f"🗄️ Archiving {ARCHIVE_CODEC} audio to {ARCHIVE_DIR}")
+    except (ValueError, RuntimeError) as e:
+        log_message(f"⚠️ Audio archive disabled: {e}")
+
+
+def open_uploader():
+    """Start live transcript upload unless --upload-window-s is 0; Supabase setup is checked on its thread"""
+    global segment_uploader
+    if UPLOAD_WINDOW_S <= 0:
+        return
+    segment_uploader = SegmentUploader(SESSION_ID, STREAM_TYPE, window_s=UPLOAD_WINDOW_S, log=log_message)
+    log_message(f"☁️ Uploading transcript segments every {UPLOAD_WINDOW_S:g}s (session {SESSION_ID})")
 
 
 async def main():
@@ -254,47 +681,27 @@ async def main():
     
     log_message(f"🚀 Starting Realtime API transcription: {STREAM_TYPE}")
     
+    engine = RealtimeAPIEngine(REALTIME_API_URL, OPENAI_API_KEY, transcription_only=TRANSCRIPTION_ONLY)
+    log_message(f"🧭 Using {engine.describe()}")
+    open_archive()
+    open_uploader()
+    connection = RealtimeConnection(engine, REPLAY_SECONDS, UPLINK_SAMPLE_RATE * APPEND_MS // 1000)
+    
     try:
-        # Connect to OpenAI Realtime API
-        # Build headers as list of tuples for websockets library
-        headers = [
-            ("Authorization", f"Bearer {OPENAI_API_KEY}"),
-            ("OpenAI-Beta", "realtime=v1")
-        ]
+        # The supervisor keeps the socket alive; stdin keeps flowing even while it is down
+        supervisor = asyncio.create_task(connection.run())
+        audio_streamer = asyncio.create_task(stream_audio_to_realtime(connection))
         
-        async with websockets.connect(REALTIME_API_URL, additional_headers=headers) as realtime_ws:
-            log_message("🔗 Connected to OpenAI Realtime API")
-            
-            # Configure session for transcription only
-            session_config = {
-                "type": "session.update",
-                "session": {
-                    "modalities": ["text"],  # We only want transcripts, not audio responses
-                    "instructions": f"You are a transcription assistant. Only transcribe the {STREAM_LABEL}'s speech accurately. Do not respond or add commentary.",
-                    "voice": "alloy",  # Doesn't matter since we're not using audio output
-                    "input_audio_format": "pcm16",
-                    "output_audio_format": "pcm16",
-                    "input_audio_transcription": {
-                        "model": "whisper-1"
-                    },
-                    "turn_detection": {
-                        "type": "server_vad",  # Server-side Voice Activity Detection
-                        "threshold": 0.5,
-                        "prefix_padding_ms": 300,
-                        "silence_duration_ms": 500
-                    }
-                }
-            }
-            
-            await realtime_ws.send(json.dumps(session_config))
-            log_message("⚙️ Session configured for transcription")
-            
-            # Run both tasks concurrently
-            event_handler = asyncio.create_task(handle_realtime_events(realtime_ws))
-            audio_streamer = asyncio.create_task(stream_audio_to_realtime(realtime_ws))
-            
-            # Wait for both to complete (or one to fail)
-            await asyncio.gather(event_handler, audio_streamer)
+        done, _ = await asyncio.wait({supervisor, audio_streamer}, return_when=asyncio.FIRST_COMPLETED)
+        if supervisor in done:
+            # Only happens on a fatal error (e.g. bad credentials)
+            audio_streamer.cancel()
+            supervisor.result()
+        else:
+            await connection.close()
+            # Stops a supervisor that is still backing off between connect attempts
+            supervisor.cancel()
+            await asyncio.gather(supervisor, return_exceptions=True)
     
     except websockets.exceptions.WebSocketException as e:
         log_message(f"❌ Failed to connect to Realtime API: {e}")
@@ -303,9 +710,20 @@ async def main():
         import traceback
         log_message(traceback.format_exc())
     finally:
+        log_message(f"📊 Realtime link: {connection.metrics_summary()}")
         # Cleanup
-        if agenda_ws:
-            await agenda_ws.close()
+        await tracker.close()
+        await asyncio.to_thread(close_transcript_file)
+        if segment_uploader is not None:
+            # Only the tail of the meeting and one meeting_notes row are left to send
+            await asyncio.to_thread(segment_uploader.close)
+            log_message(f"☁️ Live upload ({SESSION_ID}): {segment_uploader.summary()}")
+        if archiver is not None:
+            await asyncio.to_thread(archiver.close)
+            log_message(f"🗄️ Audio archive: {archiver.summary()} ({ARCHIVE_DIR})")
+        stats = transcript_writer.stats()
+        log_message(f"📝 Transcript: {stats['records']} lines, {stats['bytes']} bytes in "
+                    f"{stats['flushes']} flushes, {stats['fsyncs']} fsyncs")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Append-only NDJSON transcript writer with a background flush thread
+Callers only append to an in-memory batch; serialization, write, flush and fsync
+happen on the writer thread
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+# fsync policies
+FSYNC_NEVER = "never"   # leave it to the OS
+FSYNC_FLUSH = "flush"   # fsync after every batch flush
+FSYNC_CLOSE = "close"   # fsync once when the session ends
+FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_FLUSH, FSYNC_CLOSE)
+
+# Transcript files are named {start}_{stream}_{id}--{session}.ndjson, so every stream of a
+# meeting can be found by its session id; files from before sessions have no "--" part
+SESSION_MARK = "--"
+
+
+def safe_session_id(session_id):
+    """Session id usable in a file name (anything but letters, digits, '.', '_' and '-' becomes '-')"""
+    return re.sub(r"-{2,}", "-", re.sub(r"[^A-Za-z0-9._-]", "-", session_id))
+
+
+def transcript_name(started_at, stream, file_id, session_id):
+    return f"{started_at}_{stream}_{file_id}{SESSION_MARK}{safe_session_id(session_id)}.ndjson"
+
+
+def session_of(path):
+    """Session id in a transcript file name, or None for files written before sessions"""
+    stem = os.path.basename(str(path))[:-len(".ndjson")]
+    _, mark, session_id = stem.partition(SESSION_MARK)
+    return session_id if mark and session_id else None
+
+
+class TranscriptWriter:
+    """Batched transcript writer; flushes every flush_interval_s or flush_bytes
+
+    records keeps every appended record in order (the in-memory index), so
+    end-of-session consumers never need to re-read and re-parse the file.
+    A batch that fails to write stays queued and is retried every interval;
+    offsets only advance for lines that are in the file.
+    """
+
+    def __init__(self, path, flush_interval_s=1.0, flush_bytes=64 * 1024, fsync=FSYNC_CLOSE, log=print):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}' (expected one of {', '.join(FSYNC_POLICIES)})")
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self.flush_bytes = flush_bytes
+        self.fsync = fsync
+        self.log = log
+        self.records = []
+        self.offsets = []           # byte offset of each record's line in the file
+        # Unbuffered, so a failed write can be cut back to the last complete batch
+        self._fh = open(path, "ab", buffering=0)
+        self._offset = self._fh.tell()
+        self._pending = []
+        self._pending_estimate = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._failing = False       # last write failed; its batch waits for the next interval
+        # Counters
+        self.records_written = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.fsyncs = 0
+        self.write_errors = 0
+        self._thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, record):
+        """Queue a record (dict); returns its line number within this session"""
+        with self._cond:
+            if self._closed:
+                raise ValueError("TranscriptWriter is closed")
+            self.records.append(record)
+            self._pending.append(record)
+            self._pending_estimate += len(record.get("text", "")) + 96
+            if self._pending_estimate >= self.flush_bytes:
+                self._cond.notify()
+            return len(self.records) - 1
+
+    def _write_batch(self, batch):
+        """Write one batch; returns False (file unchanged) if it has to be retried"""
+        lines = [
+            (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8") for obj in batch
+        ]
+        data = memoryview(b"".join(lines))
+        try:
+            written = 0
+            while written < len(data):
+                written += self._fh.write(data[written:])
+            if self.fsync == FSYNC_FLUSH:
+                os.fsync(self._fh.fileno())
+                self.fsyncs += 1
+        except OSError as e:
+            self.write_errors += 1
+            if not self._failing:
+                self.log(f"❌ Transcript write failed ({self.path}), will retry: {e}")
+            self._failing = True
+            try:
+                # Drop a partial line so offsets keep matching the file
+                os.ftruncate(self._fh.fileno(), self._offset)
+            except OSError:
+                pass
+            return False
+        if self._failing:
+            self._failing = False
+            self.log(f"✅ Transcript writes recovered after {self.write_errors} failed attempts")
+        # Offsets only move once the lines are really in the file
+        for line in lines:
+            self.offsets.append(self._offset)
+            self._offset += len(line)
+        self.records_written += len(batch)
+        self.bytes_written += len(data)
+        self.flushes += 1
+        return True
+
+    def _take_pending(self):
+        batch, self._pending = self._pending, []
+        self._pending_estimate = 0
+        return batch
+
+    def _run(self):
+        deadline = time.monotonic() + self.flush_interval_s
+        while True:
+            with self._cond:
+                # After a failure only the interval (or close) triggers the retry
+                while (not self._closed and (self._failing or self._pending_estimate < self.flush_bytes)
+                       and time.monotonic() < deadline):
+                    self._cond.wait(timeout=max(0.0, deadline - time.monotonic()))
+                batch = self._take_pending()
+                closed = self._closed
+            if batch and not self._write_batch(batch):
+                with self._cond:
+                    # Back in front of whatever was appended meanwhile, in order
+                    self._pending[:0] = batch
+                    self._pending_estimate += sum(len(record.get("text", "")) + 96 for record in batch)
+            deadline = time.monotonic() + self.flush_interval_s
+            if closed:
+                if self._failing:
+                    self.log(f"❌ {len(self._pending)} transcript lines could not be written to {self.path}")
+                return
+
+    def close(self):
+        """Flush everything, apply the fsync policy and close the file"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        try:
+            if self.fsync in (FSYNC_FLUSH, FSYNC_CLOSE):
+                os.fsync(self._fh.fileno())
+                self.fsyncs += 1
+        except OSError:
+            pass
+        self._fh.close()
+
+    def stats(self):
+        return {
+            "records": self.records_written,
+            "bytes": self.bytes_written,
+            "flushes": self.flushes,
+            "fsyncs": self.fsyncs,
+            "errors": self.write_errors,
+        }
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Single-process multi-stream transcription host
+Runs every labelled input stream (mic, system, ...) as a task on one event loop,
+sharing engines (and their HTTP connection pools) and one agenda tracker connection
+
+Usage:
+    python3 transcription_host.py --stream mic=/tmp/remi_mic.fifo \\
+                                  --stream system=unix:/tmp/remi_system.sock,engine=local
+
+Stream sources:
+    -                   stdin
+    <path>              named pipe / file (ends the stream at EOF)
+    unix:<path>         unix socket; accepts a new connection whenever the writer restarts
+    tcp:<host>:<port>   same, over TCP
+Per-stream options (comma-separated after the source): engine=<name>, format=<fmt>,
+rate=<capture Hz>, channels=<n> (defaults: --input-rate / --channels, i.e. 16000 mono)
+Backlog handling for every stream: --overload-policy drop-silence|downsample|spill,
+--max-buffered-s <seconds>, --spill-dir <path> (see segment_queue.py)
+"""
+
+import sys
+import os
+import asyncio
+import warnings
+from dataclasses import dataclass
+from datetime import datetime
+from audio_frames import (
+    FrameReader, AsyncFrameReader, FrameError, parse_format_arg, parse_flag, FORMATS
+)
+from vad import SpeechSegmenter
+from engines import create_engine, parse_engine_arg, ENGINES
+from pipeline import TranscriptionPipeline
+from segment_queue import parse_overload_args
+from segment_processing import prepare_segment, filter_transcript
+from noise_suppression import SpectralNoiseSuppressor
+from resample import InputConverter, parse_input_args
+from hallucination_filter import HallucinationFilter
+from tracker_client import AgendaTrackerClient, AGENDA_TRACKER_URL
+
+# Suppress warnings
+warnings.filterwarnings("ignore")
+
+SAMPLE_RATE = 16000
+MAX_SEGMENT_DURATION = 8.0
+
+
+def log_message(message):
+    """Print timestamped log message"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    print(f"[{timestamp}] {message}", flush=True)
+
+
+@dataclass
+class StreamSpec:
+    label: str
+    source: str
+    engine: str
+    format: str
+    input_rate: int = SAMPLE_RATE
+    channels: int = 1
+
+    @property
+    def icon(self):
+        return "🎤" if self.label == "mic" else "🔊"
+
+    @property
+    def speaker(self):
+        return "You" if self.label == "mic" else "Other"
+
+
+def parse_stream_specs(argv):
+    """Collect every --stream label=source[,engine=x][,format=y] from argv"""
+    default_format = parse_format_arg(argv)
+    default_rate, default_channels = parse_input_args(argv)
+    specs = []
+    for i, arg in enumerate(argv):
+        if arg == "--stream" and i + 1 < len(argv):
+            value = argv[i + 1]
+        elif arg.startswith("--stream="):
+            value = arg.split("=", 1)[1]
+        else:
+            continue
+        label, _, rest = value.partition("=")
+        if not label or not rest:
+            raise ValueError(f"Bad --stream '{value}' (expected label=source)")
+        source, *options = rest.split(",")
+        opts = dict(opt.split("=", 1) for opt in options if "=" in opt)
+        engine = opts.get("engine") or parse_engine_arg([], label)
+        fmt = opts.get("format", default_format)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}' for stream {label}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}' for stream {label}")
+        input_rate = int(opts.get("rate", default_rate))
+        channels = int(opts.get("channels", default_channels))
+        specs.append(StreamSpec(label, source, engine, fmt, input_rate, channels))
+    return specs
+
+
+class TranscriptionHost:
+    """Owns the shared resources and one task per input stream"""
+
+    def __init__(self, specs, tracker_url=AGENDA_TRACKER_URL, max_in_flight=3, overload=None):
+        self.specs = specs
+        self.max_in_flight = max_in_flight
+        self.overload = overload or {}
+        self.tracker = AgendaTrackerClient(tracker_url, log=log_message)
+        self.engines = {}
+        self.suppressors = {}   # noise profile per stream label, kept across reconnects
+        self.filters = {}       # hallucination filter window per stream label
+
+    def engine_for(self, spec):
+        """One engine instance per engine name, shared across streams"""
+        if spec.engine not in self.engines:
+            engine = create_engine(spec.engine)
+            if engine.streaming:
+                raise ValueError(f"{engine.describe()} streams audio; use transcribe_realtime.py for it")
+            self.engines[spec.engine] = engine
+            log_message(f"✅ {engine.describe()} ready")
+        return self.engines[spec.engine]
+
+    async def run_session(self, spec, read_frame, session_name):
+        """Segment and transcribe one connection/pipe until EOF"""
+        engine = self.engine_for(spec)
+        suppressor = self.suppressors.setdefault(spec.label, SpectralNoiseSuppressor(SAMPLE_RATE))
+        hallucinations = self.filters.setdefault(spec.label, HallucinationFilter())
+        segmenter = SpeechSegmenter(SAMPLE_RATE, threshold=0.008, max_segment_s=MAX_SEGMENT_DURATION)
+        converter = InputConverter(spec.input_rate, spec.channels, SAMPLE_RATE)
+
+        def transcribe(segment):
+            try:
+                return engine.transcribe(prepare_segment(segment.audio, suppressor))
+            except Exception as api_error:
+                log_message(f"❌ API Error ({spec.label}): {api_error}")
+                return None
+
+        async def deliver(segment, text):
+            # Filtered here, in segment order on the loop: the duplicate window must
+            # not depend on which request happens to come back first
+            text, reason = filter_transcript(text, hallucinations)
+            if reason == "repetitive":
+                log_message(f"⚠️ Skipped repetitive hallucination ({spec.label})")
+            elif reason == "duplicate":
+                log_message(f"⚠️ Skipped transcript repeating a recent segment ({spec.label})")
+            if not text:
+                return
+            log_message(f"{spec.icon} {spec.speaker}: {text}")
+            await self.tracker.send_transcription(spec.speaker, text)
+
+        async def report(status):
+            await self.tracker.send_status(spec.speaker, status)
+
+        def log(message):
+            log_message(f"{message} ({spec.label})")
+
+        pipeline = TranscriptionPipeline(
+            transcribe, deliver, max_in_flight=self.max_in_flight, log=log,
+            overload=self.overload, sample_rate=SAMPLE_RATE, report=report
+        )
+        pipeline.start()
+        log_message(f"{spec.icon} Ready to transcribe {spec.speaker}'s audio ({session_name}, {spec.format})")
+        try:
+            while True:
+                try:
+                    samples = await read_frame()
+                except FrameError as e:
+                    log_message(f"❌ Audio stream out of sync for {session_name}: {e}")
+                    break
+                except ValueError as e:
+                    log_message(f"❌ Error processing audio ({session_name}): {e}")
+                    continue
+                if samples is None:
+                    break
+                if not samples.size:
+                    continue
+                for segment in segmenter.push(converter.process(samples)):
+                    await pipeline.submit(segment)
+            for segment in segmenter.flush():
+                await pipeline.submit(segment)
+        finally:
+            await pipeline.close()
+            log_message(f"⚠️ {session_name} closed (hallucination filter: {hallucinations.summary()}; "
+                        f"overload: {pipeline.queue.summary()})")
+
+    async def run_pipe(self, spec):
+        """Stdin / named pipe: blocking reads go through the default executor"""
+        loop = asyncio.get_running_loop()
+        if spec.source == "-":
+            stream = sys.stdin.buffer
+        else:
+            # Opening a FIFO blocks until the writer shows up
+            stream = await loop.run_in_executor(None, open, spec.source, "rb")
+        reader = FrameReader(stream, spec.format)
+        try:
+            await self.run_session(
+                spec, lambda: loop.run_in_executor(None, reader.read), f"{spec.label} ({spec.source})"
+            )
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+    async def run_listener(self, spec):
+        """Socket source: every accepted connection is a new session for this stream"""
+        connections = 0
+
+        async def on_connect(stream_reader, stream_writer):
+            nonlocal connections
+            connections += 1
+            reader = AsyncFrameReader(stream_reader, spec.format)
+            try:
+                await self.run_session(spec, reader.read, f"{spec.label} #{connections}")
+            finally:
+                stream_writer.close()
+
+        if spec.source.startswith("unix:"):
+            path = spec.source[len("unix:"):]
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(on_connect, path)
+        else:
+            host, _, port = spec.source[len("tcp:"):].rpartition(":")
+            server = await asyncio.start_server(on_connect, host or "127.0.0.1", int(port))
+        log_message(f"🌐 Listening for {spec.label} audio on {spec.source}")
+        async with server:
+            await server.serve_forever()
+
+    async def run(self):
+        tasks = []
+        for spec in self.specs:
+            if spec.source.startswith(("unix:", "tcp:")):
+                tasks.append(asyncio.create_task(self.run_listener(spec)))
+            else:
+                tasks.append(asyncio.create_task(self.run_pipe(spec)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.tracker.close()
+            for engine in self.engines.values():
+                engine.close()
+
+
+def main():
+    argv = sys.argv[1:]
+    try:
+        specs = parse_stream_specs(argv)
+    except ValueError as e:
+        log_message(f"❌ {e}")
+        sys.exit(2)
+    if not specs:
+        log_message("❌ No streams given. Usage: transcription_host.py --stream mic=<source> [--stream system=<source>]")
+        sys.exit(2)
+
+    if any(ENGINES[s.engine].requires_api_key for s in specs) and not os.environ.get("OPENAI_API_KEY"):
+        log_message("❌ OPENAI_API_KEY environment variable not set!")
+        sys.exit(1)
+
+    max_in_flight = int(parse_flag(argv, "max-in-flight", os.environ.get("REMI_MAX_IN_FLIGHT", "3")))
+    try:
+        overload = parse_overload_args(argv)
+    except ValueError as e:
+        log_message(f"❌ {e}")
+        sys.exit(2)
+    log_message(f"🚀 Starting transcription host ({os.getpid()}): " +
+                ", ".join(f"{s.label}→{s.engine}" for s in specs))
+    host = TranscriptionHost(specs, max_in_flight=max_in_flight, overload=overload)
+    try:
+        asyncio.run(host.run())
+    except KeyboardInterrupt:
+        log_message("🛑 Transcription host stopped")
+
+
+if __name__ == "__main__":
+    main()
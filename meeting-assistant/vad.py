@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Streaming energy-based voice activity detection
+Cuts incoming audio into speech segments at natural pauses instead of fixed windows
+"""
+
+from dataclasses import dataclass
+import numpy as np
+from audio_buffer import AudioRingBuffer
+
+
+def rms(audio_array):
+    """Root-mean-square level of a chunk"""
+    if len(audio_array) == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(np.square(audio_array, dtype=np.float32))))
+
+
+def frame_rms(frames):
+    """Per-frame RMS for a 2-D (n_frames, frame_len) array"""
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+class NoiseFloor:
+    """Rolling noise-floor estimate; a frame is speech if it clears floor * ratio"""
+
+    def __init__(self, threshold=0.008, noise_ratio=3.0, noise_adapt=0.05):
+        self.threshold = threshold
+        self.noise_ratio = noise_ratio
+        self.noise_adapt = noise_adapt
+        self.level = None
+
+    def is_speech(self, level):
+        if self.level is None:
+            # Streams often open mid-sentence: never start the floor above the silence threshold,
+            # or the opening speech would become the floor and be classified as noise
+            self.level = min(level, self.threshold)
+        speech = level > max(self.threshold, self.level * self.noise_ratio)
+        if not speech:
+            # Follow the floor down quickly, up slowly
+            rate = 0.5 if level < self.level else self.noise_adapt
+            self.level += rate * (level - self.level)
+        return speech
+
+
+@dataclass
+class SpeechSegment:
+    index: int          # sequence number within the stream
+    start_sample: int   # offset of the first sample since the stream started
+    audio: np.ndarray   # float32 samples (owned copy, safe to hand to another thread)
+    forced: bool = False  # True if cut at max length rather than at a pause
+
+    @property
+    def end_sample(self):
+        return self.start_sample + len(self.audio)
+
+
+class SpeechSegmenter:
+    """Energy VAD with a rolling noise floor, hangover and min/max segment length
+
+    push() takes arbitrary-sized sample arrays and returns the segments that
+    were completed by them. Silence never leaves the segmenter, except for the
+    short pre-roll and hangover padding around each utterance.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=30, threshold=0.008, noise_ratio=3.0,
+                 noise_adapt=0.05, hangover_ms=500, preroll_ms=200, min_speech_ms=250,
+                 max_segment_s=8.0):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self._floor = NoiseFloor(threshold, noise_ratio, noise_adapt)
+        self.hangover_frames = max(1, int(hangover_ms / frame_ms))
+        self.preroll_samples = int(sample_rate * preroll_ms / 1000)
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.max_segment_samples = int(sample_rate * max_segment_s)
+
+        capacity = self.max_segment_samples + self.preroll_samples + self.frame_len
+        self._ring = AudioRingBuffer(capacity)
+        self._pending = np.empty(0, dtype=np.float32)
+        self._position = 0          # samples analysed so far
+        self._in_speech = False
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._segment_start = 0
+        self._next_index = 0
+
+        self.segments_emitted = 0
+        self.segments_discarded = 0
+        self.samples_suppressed = 0
+
+    @property
+    def in_speech(self):
+        return self._in_speech
+
+    @property
+    def noise_floor(self):
+        return self._floor.level
+
+    def _is_speech(self, level):
+        return self._floor.is_speech(level)
+
+    def _emit(self, length, forced=False):
+        """Cut the first `length` buffered samples into a segment (or drop it)"""
+        audio = self._ring.peek(length).copy()
+        self._ring.consume(length)
+        if self._speech_frames < self.min_speech_frames:
+            self.segments_discarded += 1
+            self.samples_suppressed += length
+            return None
+        segment = SpeechSegment(self._next_index, self._segment_start, audio, forced)
+        self._next_index += 1
+        self.segments_emitted += 1
+        return segment
+
+    def _process_frame(self, frame, level):
+        self._ring.write(frame)
+        self._position += len(frame)
+        segments = []
+
+        if not self._in_speech:
+            if self._is_speech(level):
+                self._in_speech = True
+                self._speech_frames = 1
+                self._silence_run = 0
+                self._segment_start = self._position - len(self._ring)
+            else:
+                # Only keep the pre-roll while idle
+                excess = len(self._ring) - self.preroll_samples
+                if excess > 0:
+                    self._ring.consume(excess)
+                    self.samples_suppressed += excess
+            return segments
+
+        if self._is_speech(level):
+            self._speech_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if self._silence_run >= self.hangover_frames:
+            segment = self._emit(len(self._ring))
+            if segment:
+                segments.append(segment)
+            self._in_speech = False
+        elif len(self._ring) >= self.max_segment_samples:
+            segment = self._emit(len(self._ring), forced=True)
+            if segment:
+                segments.append(segment)
+            # Still talking: the next segment starts right here
+            self._speech_frames = 0
+            self._segment_start = self._position
+        return segments
+
+    def push(self, samples):
+        """Feed samples; returns the list of completed SpeechSegments"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        n_frames = len(samples) // self.frame_len
+        used = n_frames * self.frame_len
+        self._pending = samples[used:].copy()
+        if not n_frames:
+            return []
+
+        frames = samples[:used].reshape(n_frames, self.frame_len)
+        levels = frame_rms(frames)
+        segments = []
+        for frame, level in zip(frames, levels):
+            segments.extend(self._process_frame(frame, float(level)))
+        return segments
+
+    def flush(self):
+        """End of stream: emit any in-progress utterance"""
+        if len(self._pending):
+            self._ring.write(self._pending)
+            self._position += len(self._pending)
+            self._pending = np.empty(0, dtype=np.float32)
+        segments = []
+        if self._in_speech and len(self._ring):
+            segment = self._emit(len(self._ring))
+            if segment:
+                segments.append(segment)
+        self._in_speech = False
+        self._ring.clear()
+        return segments
+
+
+class SilenceGate:
+    """Local VAD gate for a streaming uplink
+
+    process(block) returns a list of actions: ("audio", samples) to send and
+    ("commit", None) when an utterance ends. Silence is held back, except for
+    a short pre-roll replayed at speech onset so the first syllable isn't
+    clipped, and a hangover so trailing words make it out.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=20, threshold=0.008, noise_ratio=3.0,
+                 noise_adapt=0.05, preroll_ms=300, hangover_ms=600, max_utterance_s=15.0,
+                 min_commit_ms=100):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self._floor = NoiseFloor(threshold, noise_ratio, noise_adapt)
+        self._preroll = AudioRingBuffer(max(1, int(sample_rate * preroll_ms / 1000)))
+        self.hangover_samples = int(sample_rate * hangover_ms / 1000)
+        self.max_utterance_samples = int(sample_rate * max_utterance_s)
+        self.min_commit_samples = int(sample_rate * min_commit_ms / 1000)
+        self.active = False
+        self._silence_run = 0
+        self._utterance_samples = 0
+        # Stats
+        self.samples_in = 0
+        self.samples_sent = 0
+        self.commits = 0
+
+    @property
+    def samples_suppressed(self):
+        return self.samples_in - self.samples_sent
+
+    @property
+    def suppressed_pct(self):
+        return 100.0 * self.samples_suppressed / self.samples_in if self.samples_in else 0.0
+
+    def _block_has_speech(self, block):
+        n_frames = len(block) // self.frame_len
+        if not n_frames:
+            return self._floor.is_speech(rms(block))
+        levels = frame_rms(block[:n_frames * self.frame_len].reshape(n_frames, self.frame_len))
+        # Every frame updates the floor, so evaluate them all
+        return any([self._floor.is_speech(float(level)) for level in levels])
+
+    def _commit(self, actions):
+        if self._utterance_samples >= self.min_commit_samples:
+            actions.append(("commit", None))
+            self.commits += 1
+        self._utterance_samples = 0
+
+    def process(self, block):
+        block = np.asarray(block, dtype=np.float32)
+        self.samples_in += len(block)
+        speech = self._block_has_speech(block)
+        actions = []
+
+        if not self.active:
+            if not speech:
+                self._preroll.write(block)
+                return actions
+            # Speech onset: send the pre-roll first
+            self.active = True
+            self._silence_run = 0
+            if len(self._preroll):
+                preroll = self._preroll.peek(len(self._preroll)).copy()
+                self._preroll.clear()
+                self.samples_sent += len(preroll)
+                self._utterance_samples += len(preroll)
+                actions.append(("audio", preroll))
+
+        actions.append(("audio", block))
+        self.samples_sent += len(block)
+        self._utterance_samples += len(block)
+
+        if speech:
+            self._silence_run = 0
+        else:
+            self._silence_run += len(block)
+            if self._silence_run >= self.hangover_samples:
+                self.active = False
+                self._commit(actions)
+                return actions
+
+        if self._utterance_samples >= self.max_utterance_samples:
+            # Long monologue: commit so transcripts keep flowing
+            self._commit(actions)
+        return actions
+
+    def flush(self):
+        """End of stream: commit an utterance that is still open"""
+        actions = []
+        if self.active:
+            self.active = False
+            self._commit(actions)
+        return actions